@@ -1,5 +1,80 @@
+import re
+import json
 import google.generativeai as genai
+from concurrent.futures import Future, ThreadPoolExecutor
 from config import config
+from utils.llm_cache import llm_cache
+
+MODEL_NAME = 'gemini-2.5-flash'
+
+# Bump when a prompt changes so cached responses to the old prompt are not reused
+PROMPT_VERSION = 1
+
+# Background Gemini requests (hashtags run alongside script generation and TTS)
+_request_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="content-agent")
+
+# Shared by the script prompt and the combined script/hashtags/caption prompt
+SCRIPT_GUIDELINES = """Guidelines:
+        - Make it conversational, friendly, and engaging.
+        - Start with a strong hook in the first 3 seconds.
+        - Explain the key concept in simple, clear language.
+        - Use natural, flowing sentences—avoid choppy or robotic phrasing.
+        - Include a call-to-action at the end.
+        - The script should be 20-25 seconds when spoken at a normal pace (about 80-100 words).
+        - Be concise, but let the script sound like a real person talking, not a list of short statements.
+        - Focus on ONE key point only.
+        - IMPORTANT: Use ONLY plain text—NO hashtags, asterisks, underscores, or special formatting characters.
+        - The script will be converted to speech, so avoid any characters that would be read aloud."""
+
+# Fields of the combined (single request) response
+CONTENT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'script': {'type': 'string'},
+        'hashtags': {'type': 'array', 'items': {'type': 'string'}},
+        'caption': {'type': 'string'}
+    },
+    'required': ['script', 'hashtags', 'caption']
+}
+
+def parse_content_response(text, max_hashtags=None):
+    """Validate a combined response against CONTENT_SCHEMA.
+    
+    Returns {'script', 'hashtags', 'caption'} with hashtags as a space-separated
+    string (like generate_hashtags), or None if the response does not conform.
+    """
+    text = (text or "").strip()
+    # Tolerate a Markdown code fence around the JSON
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    
+    script, caption, hashtags = data.get('script'), data.get('caption'), data.get('hashtags')
+    if not isinstance(script, str) or not script.strip() or not isinstance(caption, str):
+        return None
+    if isinstance(hashtags, str):
+        hashtags = hashtags.split()
+    if not isinstance(hashtags, list) or not all(isinstance(tag, str) for tag in hashtags):
+        return None
+    
+    tags = []
+    for tag in hashtags:
+        tag = "#" + tag.strip().lstrip("#").replace(" ", "")
+        if len(tag) > 1 and tag not in tags:
+            tags.append(tag)
+    if not tags:
+        return None
+    return {
+        'script': script.strip(),
+        'hashtags': " ".join(tags[:max_hashtags or config.max_hashtags]),
+        'caption': caption.strip()
+    }
 
 class ContentAgent:
     def __init__(self):
@@ -7,10 +82,26 @@ class ContentAgent:
             print("Error: Gemini API key not configured")
             return
         genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model = genai.GenerativeModel(MODEL_NAME)
     
-    def generate_script(self, learning_content, duration=30):
-        """Generate a reel-friendly script from learning content"""
+    def cached_response(self, kind, *inputs, refresh=False):
+        """Cache key for a request and its cached response (None on a miss, when disabled or refreshing)"""
+        key = llm_cache.cache_key(PROMPT_VERSION, MODEL_NAME, kind, *inputs)
+        if refresh or not config.llm_cache_enabled:
+            return key, None
+        return key, llm_cache.get(key)
+    
+    def store_response(self, key, value):
+        """Remember a successful response"""
+        if config.llm_cache_enabled:
+            llm_cache.put(key, value)
+    
+    def generate_script(self, learning_content, duration=30, refresh=False):
+        """Generate a reel-friendly script from learning content (refresh=True bypasses the cache)"""
+        key, cached = self.cached_response('script', learning_content, duration, refresh=refresh)
+        if cached:
+            return cached
+        
         prompt = f"""
         You are a content creator who specializes in making engaging Instagram Reels about learning and education.
         
@@ -18,30 +109,26 @@ class ContentAgent:
         
         Learning Content: {learning_content}
         
-        Guidelines:
-        - Make it conversational, friendly, and engaging.
-        - Start with a strong hook in the first 3 seconds.
-        - Explain the key concept in simple, clear language.
-        - Use natural, flowing sentences—avoid choppy or robotic phrasing.
-        - Include a call-to-action at the end.
-        - The script should be 20-25 seconds when spoken at a normal pace (about 80-100 words).
-        - Be concise, but let the script sound like a real person talking, not a list of short statements.
-        - Focus on ONE key point only.
-        - IMPORTANT: Use ONLY plain text—NO hashtags, asterisks, underscores, or special formatting characters.
-        - The script will be converted to speech, so avoid any characters that would be read aloud.
+        {SCRIPT_GUIDELINES}
         
         Format your response as a single, clean script with no extra formatting or explanations.
         """
         
         try:
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            script = response.text.strip()
         except Exception as e:
             print(f"Error generating script: {e}")
             return None
+        self.store_response(key, script)
+        return script
     
-    def generate_hashtags(self, learning_content):
-        """Generate relevant hashtags for the reel"""
+    def generate_hashtags(self, learning_content, refresh=False):
+        """Generate relevant hashtags for the reel (refresh=True bypasses the cache)"""
+        key, cached = self.cached_response('hashtags', learning_content, refresh=refresh)
+        if cached:
+            return cached
+        
         prompt = f"""
         Generate 20 relevant Instagram hashtags for a learning reel about: {learning_content}
         
@@ -56,7 +143,83 @@ class ContentAgent:
         
         try:
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            hashtags = response.text.strip()
         except Exception as e:
+            # The generic fallback is not cached
             print(f"Error generating hashtags: {e}")
             return "#learning #education #tech #ai #coding #developer #student #knowledge #growth #tutorial"
+        self.store_response(key, hashtags)
+        return hashtags
+    
+    def start_hashtags(self, learning_content, refresh=False):
+        """Request hashtags in the background and return a Future.
+        
+        Hashtags depend only on the learning content, so they can be generated
+        while the script (and then the voiceover) is being produced.
+        """
+        return _request_executor.submit(self.generate_hashtags, learning_content, refresh)
+    
+    def generate_combined(self, learning_content, duration=30, refresh=False):
+        """Script, hashtags and caption from a single JSON-mode Gemini request.
+        
+        Returns None when the request fails or the response does not match
+        CONTENT_SCHEMA.
+        """
+        key, cached = self.cached_response('combined', learning_content, duration, config.max_hashtags, refresh=refresh)
+        if cached:
+            return cached
+        
+        prompt = f"""
+        You are a content creator who specializes in making engaging Instagram Reels about learning and education.
+        
+        For the following learning content, write an Instagram Reel script, {config.max_hashtags} relevant hashtags
+        (a mix of popular general, topic-specific, trending and community hashtags) and a one or two sentence caption.
+        
+        Learning Content: {learning_content}
+        
+        Script {SCRIPT_GUIDELINES}
+        
+        Respond with a JSON object only, matching this JSON schema:
+        {json.dumps(CONTENT_SCHEMA)}
+        """
+        
+        try:
+            response = self.model.generate_content(
+                prompt, generation_config={'response_mime_type': 'application/json'}
+            )
+            content = parse_content_response(response.text)
+        except Exception as e:
+            print(f"Error generating combined content: {e}")
+            return None
+        if content is None:
+            print("Combined content response did not match the schema")
+            return None
+        self.store_response(key, content)
+        return content
+    
+    def start_content(self, learning_content, duration=30, refresh=False):
+        """Script now, hashtags as a Future, and caption (None unless the combined request was used).
+        
+        With config.combined_content_request a single request returns everything;
+        otherwise (or when its response is invalid) the hashtag request runs in the
+        background while the script is generated, so the caller can start the
+        voiceover before the hashtags arrive. refresh=True ignores cached responses.
+        """
+        if config.combined_content_request:
+            content = self.generate_combined(learning_content, duration, refresh)
+            if content:
+                hashtags = Future()
+                hashtags.set_result(content['hashtags'])
+                return content['script'], hashtags, content['caption']
+            print("[DEBUG] Falling back to separate script and hashtag requests")
+        hashtags = self.start_hashtags(learning_content, refresh)
+        return self.generate_script(learning_content, duration, refresh), hashtags, None
+    
+    def generate_content(self, learning_content, duration=30, refresh=False):
+        """Generate script, hashtags and caption (see start_content)"""
+        script, hashtags, caption = self.start_content(learning_content, duration, refresh)
+        return {'script': script, 'hashtags': hashtags.result(), 'caption': caption}
+    
+    def default_caption(self, learning_content):
+        """Caption used when the model did not write one"""
+        return f"Today I learned: {learning_content[:100]}..."
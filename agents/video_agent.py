@@ -1,10 +1,25 @@
 import os
+import math
+import shutil
 import subprocess
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import numpy as np
 import re
 from config import config
+from utils.background_library import BackgroundLibrary
+from utils.media_cache import media_cache
+from utils.audio_info import read_audio_duration
+from utils.subtitle_compiler import SubtitleCompiler, slice_cues
+from utils.font_metrics import get_font_metrics
+from utils.voice_aligner import analyze_voiceover, align_chunks, align_chunks_to_sentences, load_sentence_timings
+
+FONT_PATH = "assets/Montserrat-SemiBold.ttf"
+
+# For 1080x1920 video, safe subtitle width is around 900-1000 pixels
+MAX_SAFE_TEXT_WIDTH = 900
 
 # Helper to escape FFmpeg drawtext special characters and remove emojis
 FFMPEG_SPECIAL_CHARS = [':', '%', '\\', "'", '"', '[', ']', '(', ')', ',', ';', '=', '#', '$', '&', '<', '>', '|', '{', '}', '^', '~', '`']
@@ -35,19 +50,43 @@ def clean_script_for_subtitles(script):
 
 def estimate_text_width(text, font_size=60):
     """Estimate text width in pixels for overflow detection"""
+    if os.path.exists(FONT_PATH):
+        # Glyph advances (and kerning) of the subtitle font, precomputed once
+        return get_font_metrics(FONT_PATH).measure(text, font_size)
     # Rough estimation: average character width is about 0.6 * font_size
-    # For 1080x1920 video, safe width is around 900-1000 pixels
     estimated_width = len(text) * font_size * 0.6
     return estimated_width
 
+def concat_list_entry(path):
+    """Concat demuxer 'file' line for a path (single quotes escaped as '\\'')"""
+    return "file '" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+def join_filter_chain(filters):
+    """Join filters into one chain; graph fragments starting with a label attach directly"""
+    chain = ""
+    for filter_str in filters:
+        if not filter_str:
+            continue
+        if filter_str.startswith('['):
+            # Fragment closes the chain so far with its own input label
+            chain = (chain or "null") + filter_str
+        else:
+            chain = f"{chain},{filter_str}" if chain else filter_str
+    return chain
+
 class VideoAgent:
     def __init__(self):
         self.output_dir = "output"
         self.assets_dir = "assets"
+        self.background_library = BackgroundLibrary(self.assets_dir)
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def create_reel(self, script, voiceover_path, output_path="output/final_reel.mp4"):
-        """Create Instagram reel from voiceover and random background video using FFmpeg"""
+    def create_reel(self, script, voiceover_path, output_path="output/final_reel.mp4", profile=None, background_path=None):
+        """Create Instagram reel from voiceover and random background video using FFmpeg.
+        
+        profile names an encode profile from config.ENCODE_PROFILES (config.encode_profile by default);
+        background_path pins the background (a random one is picked otherwise).
+        """
         
         try:
             # Check if voiceover exists
@@ -73,26 +112,63 @@ class VideoAgent:
             print(f"Using audio duration: {duration} seconds")
             
             # Select random background video (1-20)
-            bg_video_path = self.select_random_background()
+            bg_video_path = background_path or self.select_random_background()
             if not bg_video_path:
                 print("No background video found")
                 return None
             
-            # Combine video and audio
-            self.combine_video_audio(bg_video_path, voiceover_path, output_path, duration)
+            if not (config.subtitle_enabled or config.text_overlay_enabled):
+                # Nothing to burn in: mux only (stream copy for normalized backgrounds)
+                start = time.perf_counter()
+                self.combine_video_audio(bg_video_path, voiceover_path, output_path, duration, profile, final=True)
+                self.log_render_timing('mux_only', time.perf_counter() - start)
+                print(f"Reel created successfully: {output_path}")
+                return output_path
             
-            # Add subtitles if enabled
-            if config.subtitle_enabled:
-                final_output = output_path.replace('.mp4', '_with_subtitles.mp4')
-                cleaned_script = self.clean_text_for_overlay(script)
-                self.add_subtitles(output_path, cleaned_script, final_output, duration)
-                output_path = final_output
-            else:
-                # Fallback to simple text overlay
-                final_output = output_path.replace('.mp4', '_with_text.mp4')
-                cleaned_script = self.clean_text_for_overlay(script)
-                self.add_text_overlay(output_path, cleaned_script, final_output)
-                output_path = final_output
+            cleaned_script = self.clean_text_for_overlay(script)
+            suffix = '_with_subtitles.mp4' if config.subtitle_enabled else '_with_text.mp4'
+            final_output = output_path.replace('.mp4', suffix)
+            
+            rendered = False
+            if config.render_mode in ('single_pass', 'parallel'):
+                # Scale/pad, loop, subtitles and audio map in one encode (or one per segment)
+                render = self.render_parallel if config.render_mode == 'parallel' else self.render_single_pass
+                start = time.perf_counter()
+                try:
+                    render(bg_video_path, voiceover_path, cleaned_script, final_output, duration, profile)
+                    self.log_render_timing(config.render_mode, time.perf_counter() - start)
+                    rendered = True
+                except subprocess.CalledProcessError as e:
+                    print(f"{config.render_mode} render failed: {e}")
+                    print("[DEBUG] Falling back to two-pass render")
+            
+            if not rendered and config.pipe_two_pass:
+                # Combine stage streamed straight into the subtitle stage (no intermediate file)
+                start = time.perf_counter()
+                try:
+                    intermediate_path = output_path if config.keep_intermediate else None
+                    self.render_two_pass_piped(bg_video_path, voiceover_path, cleaned_script, final_output,
+                                               duration, profile, intermediate_path)
+                    self.log_render_timing('two_pass', time.perf_counter() - start)
+                    rendered = True
+                except subprocess.CalledProcessError as e:
+                    print(f"Piped two-pass render failed: {e}")
+                    print("[DEBUG] Falling back to two-pass render through an intermediate file")
+            
+            if not rendered:
+                start = time.perf_counter()
+                # Combine video and audio (stream copy when the background is already normalized)
+                self.combine_video_audio(bg_video_path, voiceover_path, output_path, duration, profile)
+                
+                # Add subtitles if enabled
+                if config.subtitle_enabled:
+                    self.add_subtitles(output_path, cleaned_script, final_output, duration, voiceover_path, profile)
+                else:
+                    # Fallback to simple text overlay
+                    self.add_text_overlay(output_path, cleaned_script, final_output, profile)
+                self.log_render_timing('two_pass', time.perf_counter() - start)
+            
+            output_path = final_output
             
             print(f"Reel created successfully: {output_path}")
             return output_path
@@ -103,6 +179,13 @@ class VideoAgent:
     
     def select_random_background(self):
         """Select a random background video from assets (1-20.mp4)"""
+        if config.use_normalized_backgrounds:
+            # Prefer the pre-normalized copy so the render does no scaling
+            video_path = self.background_library.select_random()
+            if video_path:
+                return video_path
+            print("[DEBUG] Normalized background unavailable, using original asset")
+        
         video_number = random.randint(1, 20)
         video_path = os.path.join(self.assets_dir, f"{video_number}.mp4")
         
@@ -116,182 +199,377 @@ class VideoAgent:
 
     
     def get_audio_duration(self, audio_path):
-        """Get audio duration using FFmpeg"""
-        try:
-            cmd = [
-                "ffprobe", "-v", "quiet", "-show_entries", 
-                "format=duration", "-of", "csv=p=0", audio_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except:
-            return None
+        """Get audio duration from the MP3/WAV headers, falling back to FFmpeg (cached)"""
+        duration = read_audio_duration(audio_path)
+        if duration is not None:
+            return duration
+        return media_cache.get_duration(audio_path)
     
     def get_video_duration(self, video_path):
-        """Get video duration using FFmpeg"""
-        try:
-            cmd = [
-                "ffprobe", "-v", "quiet", "-show_entries", 
-                "format=duration", "-of", "csv=p=0", video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except:
-            return None
+        """Get video duration using FFmpeg (cached by path, mtime and size)"""
+        return media_cache.get_duration(video_path)
     
     def analyze_voiceover_timing(self, voiceover_path, script):
-        """Analyze voiceover audio to get more accurate word timing (placeholder for future enhancement)"""
-        # This is a placeholder for future implementation
-        # In a real implementation, you could use:
-        # - Speech recognition with timestamps
-        # - Audio analysis to detect word boundaries
-        # - Whisper API with word-level timestamps
-        
+        """Analyze voiceover audio for speech segments and pauses (energy-based, runs offline)"""
         duration = self.get_audio_duration(voiceover_path)
         if duration is None:
             return None
         
-        # For now, return basic timing info
-        return {
+        words = len(script.split())
+        timing = {
             'duration': duration,
-            'words': len(script.split()),
-            'words_per_second': len(script.split()) / duration if duration > 0 else 0
+            'words': words,
+            'words_per_second': words / duration if duration > 0 else 0,
+            'speech_segments': [],
+            'pauses': []
         }
+        analysis = analyze_voiceover(voiceover_path)
+        if analysis:
+            timing['speech_segments'] = analysis['speech_segments']
+            timing['pauses'] = analysis['pauses']
+            speech_time = sum(end - start for start, end in analysis['speech_segments'])
+            if speech_time > 0:
+                timing['words_per_second'] = words / speech_time
+        return timing
+    
+    def probe_video_stream(self, video_path):
+        """Probe codec, geometry, pixel format and frame rate of the first video stream (cached)"""
+        return media_cache.get_video_stream(video_path)
+    
+    def needs_video_transform(self, video_path):
+        """Check whether a background must be scaled/re-timed to match the reel format"""
+        info = self.probe_video_stream(video_path)
+        if info is None:
+            # No probe available: trust clips produced by the background library
+            return not self.background_library.is_normalized(video_path)
+        return not (
+            info['codec'] == 'h264'
+            and info['width'] == config.video_width
+            and info['height'] == config.video_height
+            and info['pix_fmt'] == 'yuv420p'
+            and abs(info['fps'] - config.video_fps) < 0.01
+        )
     
-    def combine_video_audio(self, video_path, audio_path, output_path, duration):
+    def combine_video_audio(self, video_path, audio_path, output_path, duration, profile=None, final=False):
         """Combine video and audio using FFmpeg, ensuring video matches audio duration"""
+        cmd = self.build_combine_command(video_path, audio_path, duration, profile, final)
+        cmd.append(output_path)
+        
+        subprocess.run(cmd, check=True)
+        print(f"Video combined with audio. Final duration: {duration} seconds")
+    
+    def build_combine_command(self, video_path, audio_path, duration, profile=None, final=False):
+        """FFmpeg combine command without its output, so the caller can pick a file or a pipe.
+        
+        With final, the output is the reel itself (no subtitle stage follows), so the
+        profile's downscale and rate control are applied here.
+        """
         # Get video duration to check if we need to loop it
         video_duration = self.get_video_duration(video_path)
         
+        cmd = ["ffmpeg", "-y"]
         if video_duration and video_duration < duration:
             # If video is shorter than audio, loop it
             print(f"Video duration ({video_duration}s) is shorter than audio ({duration}s). Looping video...")
-            cmd = [
-                "ffmpeg", "-y",
-                "-stream_loop", "-1",  # Loop the video input
-                "-i", video_path,
-                "-i", audio_path,
-                "-c:v", "libx264",
-                "-c:a", "aac",
-                "-map", "0:v:0",  # Use video from first input (background video)
-                "-map", "1:a:0",  # Use audio from second input (voiceover)
-                "-shortest",  # This ensures the output duration matches the shorter of video/audio
-                "-vf", "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2",
-                "-r", "24",
-                output_path
-            ]
+            cmd += ["-stream_loop", "-1"]  # Loop the video input
+        cmd += [
+            "-i", video_path,
+            "-i", audio_path,
+            "-map", "0:v:0",  # Use video from first input (background video)
+            "-map", "1:a:0",  # Use audio from second input (voiceover)
+        ]
+        scale_filter = self.build_scale_filter(video_path)
+        if final:
+            scale_filter = join_filter_chain([scale_filter, self.build_profile_scale_filter(profile)])
+        if scale_filter or (final and not self.profile_allows_stream_copy(profile)):
+            if scale_filter:
+                cmd += ["-vf", scale_filter]
+            cmd += self.build_encode_args(profile) + self.build_audio_encode_args(profile)
+            cmd.append("-shortest")  # This ensures the output duration matches the shorter of video/audio
+        else:
+            # Background already matches the reel format: copy the video track as-is
+            print("[DEBUG] Background needs no transform, stream-copying video")
+            cmd += ["-c:v", "copy"] + self.build_audio_encode_args(profile)
+            cmd += ["-t", str(duration)]  # Trim the (looped) video to the voiceover length
+        return cmd
+    
+    def render_two_pass_piped(self, video_path, audio_path, script, output_path, duration, profile=None,
+                              intermediate_path=None):
+        """Two-pass render with the combine stage piped (NUT over stdout) into the subtitle stage.
+        
+        With intermediate_path, the combined reel is also written there (tee) for debugging.
+        """
+        text_filters = self.build_text_filters(script, duration, os.path.splitext(output_path)[0], audio_path)
+        filter_str = join_filter_chain(text_filters + [self.build_profile_scale_filter(profile)])
+        
+        combine_cmd = self.build_combine_command(video_path, audio_path, duration, profile)
+        if intermediate_path:
+            combine_cmd += ["-f", "tee", f"[f=nut]pipe:1|[f=mp4]{intermediate_path}"]
         else:
-            # Normal case - video is longer than or equal to audio
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", video_path,
-                "-i", audio_path,
-                "-c:v", "libx264",
-                "-c:a", "aac",
-                "-map", "0:v:0",  # Use video from first input (background video)
-                "-map", "1:a:0",  # Use audio from second input (voiceover)
-                "-shortest",  # This ensures the output duration matches the shorter of video/audio
-                "-vf", "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2",
-                "-r", "24",
-                output_path
-            ]
+            combine_cmd += ["-f", "nut", "pipe:1"]
         
-        subprocess.run(cmd, check=True)
-        print(f"Video combined with audio. Final duration: {duration} seconds")
+        subtitle_cmd = [
+            "ffmpeg", "-y",
+            "-f", "nut", "-i", "pipe:0",
+            "-vf", filter_str,
+        ] + self.build_encode_args(profile) + [
+            "-c:a", "copy",  # Preserve original audio
+            output_path
+        ]
+        
+        print(f"[DEBUG] Running FFmpeg pipeline: {' '.join(combine_cmd)} | {' '.join(subtitle_cmd)}")
+        combine = subprocess.Popen(combine_cmd, stdout=subprocess.PIPE)
+        try:
+            subtitles = subprocess.run(subtitle_cmd, stdin=combine.stdout)
+        finally:
+            # Let the combine stage see a broken pipe if the subtitle stage exits early
+            combine.stdout.close()
+            combine.wait()
+        if combine.returncode != 0:
+            raise subprocess.CalledProcessError(combine.returncode, combine_cmd)
+        if subtitles.returncode != 0:
+            raise subprocess.CalledProcessError(subtitles.returncode, subtitle_cmd)
+        print(f"Piped two-pass render complete. Final duration: {duration} seconds")
     
-    def add_subtitles(self, input_path, script, output_path, duration):
-        """Add synchronized subtitles to video using FFmpeg"""
-        # Split script into subtitle chunks (5-6 words per chunk)
-        subtitle_chunks = self.split_script_for_subtitles(script, duration)
+    def build_encode_args(self, profile=None, threads=None):
+        """libx264 output options for an encode profile"""
+        settings = config.get_encode_profile(profile)
+        args = ["-c:v", "libx264", "-preset", settings['preset'], "-crf", str(settings['crf'])]
+        if settings.get('tune'):
+            args += ["-tune", settings['tune']]
+        if settings.get('maxrate'):
+            args += ["-maxrate", settings['maxrate'], "-bufsize", settings['bufsize']]
+        args += ["-threads", str(settings['threads'] if threads is None else threads)]
+        if settings.get('faststart'):
+            args += ["-movflags", "+faststart"]
+        return args
+    
+    def build_audio_encode_args(self, profile=None):
+        """AAC output options for an encode profile"""
+        return ["-c:a", "aac", "-b:a", config.get_encode_profile(profile)['audio_bitrate']]
+    
+    def profile_allows_stream_copy(self, profile=None):
+        """Whether a profile keeps full resolution without rate control, so a matching background can be copied"""
+        settings = config.get_encode_profile(profile)
+        return settings.get('scale', 1.0) >= 1.0 and not settings.get('maxrate')
+    
+    def build_profile_scale_filter(self, profile=None):
+        """Final downscale for low-resolution profiles (empty at full size)"""
+        scale = config.get_encode_profile(profile).get('scale', 1.0)
+        if scale >= 1.0:
+            return ""
+        # libx264 needs even dimensions
+        width = int(config.video_width * scale) // 2 * 2
+        height = int(config.video_height * scale) // 2 * 2
+        return f"scale={width}:{height}"
+    
+    def build_scale_filter(self, video_path=None):
+        """Build the filter that fits the background into the reel frame (empty when no transform is needed)"""
+        if video_path and not self.needs_video_transform(video_path):
+            return ""
+        width, height = config.video_width, config.video_height
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={config.video_fps}"
+        )
+    
+    def build_text_filters(self, script, duration, sidecar_base, voiceover_path=None):
+        """Subtitle filters, or the whole-script text overlay when there are none"""
+        if config.subtitle_enabled:
+            text_filters, _ = self.build_subtitle_filters(script, duration, sidecar_base, voiceover_path=voiceover_path)
+        else:
+            text_filters = []
+        if not text_filters:
+            # Same fallback as the two-pass path: burn in the whole script
+            text_filters = [self.build_text_overlay_filter(script)]
+        return text_filters
+    
+    def render_single_pass(self, video_path, audio_path, script, output_path, duration, profile=None):
+        """Render the final reel (background, voiceover and subtitles) with a single FFmpeg encode"""
+        text_filters = self.build_text_filters(script, duration, os.path.splitext(output_path)[0], audio_path)
         
-        if not subtitle_chunks:
-            # Fallback to simple text overlay if subtitle splitting fails
-            self.add_text_overlay(input_path, script, output_path)
-            return
+        video_filters = [self.build_scale_filter(video_path)] + text_filters + [self.build_profile_scale_filter(profile)]
+        graph = f"[0:v]{join_filter_chain(video_filters)}[v]"
         
-        # Create subtitle filter (multi-chunk, timed) with custom font
-        filter_parts = []
-        font_path = "assets/Montserrat-SemiBold.ttf"
+        cmd = ["ffmpeg", "-y"]
+        video_duration = self.get_video_duration(video_path)
+        if video_duration and video_duration < duration:
+            print(f"Video duration ({video_duration}s) is shorter than audio ({duration}s). Looping video...")
+            cmd += ["-stream_loop", "-1"]  # Loop the video input
+        cmd += [
+            "-i", video_path,
+            "-i", audio_path,
+            "-filter_complex", graph,
+            "-map", "[v]",  # Filtered background with subtitles
+            "-map", "1:a:0",  # Use audio from second input (voiceover)
+        ]
+        cmd += self.build_encode_args(profile) + self.build_audio_encode_args(profile)
+        cmd += [
+            "-shortest",  # Output duration follows the voiceover
+            output_path
+        ]
         
-        # Check if font file exists
-        if not os.path.exists(font_path):
-            print(f"[WARNING] Font file not found: {font_path}")
-            print("[DEBUG] Using default font")
-            font_path = ""  # Use default font
+        print(f"[DEBUG] Running FFmpeg command: {' '.join(cmd)}")
+        subprocess.run(cmd, check=True)
+        print(f"Single-pass render complete. Final duration: {duration} seconds")
+    
+    def get_background_keyframes(self, video_path):
+        """Keyframe times of the background (1s GOP assumed for normalized clips when probing fails)"""
+        keyframes = media_cache.get_keyframes(video_path)
+        if keyframes:
+            return keyframes
+        video_duration = self.get_video_duration(video_path)
+        if video_duration and self.background_library.is_normalized(video_path):
+            return [float(t) for t in range(int(math.ceil(video_duration)))]
+        return None
+    
+    def plan_segments(self, video_path, duration, workers):
+        """Split the reel into up to `workers` frame ranges that start on background keyframes.
+        
+        Returns (start_frame, end_frame, source_offset) tuples, where source_offset is the
+        keyframe in the (looped) background the segment starts from. Empty if the reel
+        should not be split.
+        """
+        count = min(workers, int(duration // config.parallel_min_segment_duration))
+        video_duration = self.get_video_duration(video_path)
+        keyframes = self.get_background_keyframes(video_path)
+        if count < 2 or not video_duration or not keyframes:
+            return []
         
-        for chunk in subtitle_chunks:
-            text = chunk['text']
-            if not text or not text.strip():
-                continue
+        # Keyframes on the looped background timeline
+        fps = config.video_fps
+        loops = int(duration // video_duration) + 1
+        candidates = sorted(k + n * video_duration for n in range(loops) for k in keyframes if k < video_duration)
+        
+        total_frames = int(math.ceil(duration * fps))
+        starts = [0]
+        for idx in range(1, count):
+            target = duration * idx / count
+            nearest = min(candidates, key=lambda t: abs(t - target))
+            frame = int(round(nearest * fps))
+            if starts[-1] < frame < total_frames:
+                starts.append(frame)
+        if len(starts) < 2:
+            return []
+        
+        ends = starts[1:] + [total_frames]
+        return [(start, end, (start / fps) % video_duration) for start, end in zip(starts, ends)]
+    
+    def write_segment_input(self, video_path, list_path, source_offset, length):
+        """Concat list that plays the background from source_offset, looping for `length` seconds"""
+        video_duration = self.get_video_duration(video_path)
+        repeats = int(math.ceil((source_offset + length) / video_duration)) + 1
+        entry = concat_list_entry(video_path)
+        lines = [entry]
+        if source_offset > 0:
+            lines.append(f"inpoint {source_offset:.6f}")
+        lines += [entry] * (repeats - 1)
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    
+    def render_parallel(self, video_path, audio_path, script, output_path, duration, profile=None):
+        """Render the reel as keyframe-aligned segments encoded in parallel, then concat with -c copy"""
+        workers = config.parallel_workers or os.cpu_count() or 1
+        segments = self.plan_segments(video_path, duration, workers)
+        if not segments:
+            print("[DEBUG] Reel not split into segments, rendering in a single pass")
+            self.render_single_pass(video_path, audio_path, script, output_path, duration, profile)
+            return
+        
+        segment_dir = os.path.splitext(output_path)[0] + "_segments"
+        os.makedirs(segment_dir, exist_ok=True)
+        
+        cues = []
+        if config.subtitle_enabled:
+            cues, _ = self.build_subtitle_cues(script, duration, audio_path)
+        scale_filter = self.build_scale_filter(video_path)
+        output_scale_filter = self.build_profile_scale_filter(profile)
+        # Share the cores between the concurrent encoders
+        threads = max(1, (os.cpu_count() or 1) // len(segments))
+        fps = config.video_fps
+        
+        commands = []
+        segment_paths = []
+        for idx, (start_frame, end_frame, source_offset) in enumerate(segments):
+            start, end = start_frame / fps, end_frame / fps
+            list_path = os.path.join(segment_dir, f"input{idx:02d}.txt")
+            self.write_segment_input(video_path, list_path, source_offset, end - start)
             
-            # Check if text needs to be split into multiple lines
-            estimated_width = estimate_text_width(text, config.subtitle_font_size)
-            if estimated_width > 900:
-                # Split long text into multiple lines
-                lines = self.split_text_into_lines(text)
-                for line_idx, line in enumerate(lines):
-                    if not line.strip():
-                        continue
-                    escaped_text = line.replace("'", "\\'")
-                    y_offset = line_idx * (config.subtitle_font_size + 10)
-                                    # Build filter with or without custom font
-                if font_path:
-                    subtitle_filter = (
-                        f"drawtext=fontfile='{font_path}':text='{escaped_text}':"
-                        f"fontcolor=white:"
-                        f"fontsize={config.subtitle_font_size}:"
-                        f"x=(w-text_w)/2:"
-                        f"y=(h/4)+{y_offset}:"
-                        f"borderw=2:bordercolor=black:"
-                        f"enable='between(t,{chunk['start_time']},{chunk['end_time']})'"
-                    )
-                else:
-                    subtitle_filter = (
-                        f"drawtext=text='{escaped_text}':"
-                        f"fontcolor=white:"
-                        f"fontsize={config.subtitle_font_size}:"
-                        f"x=(w-text_w)/2:"
-                        f"y=(h/4)+{y_offset}:"
-                        f"borderw=2:bordercolor=black:"
-                        f"enable='between(t,{chunk['start_time']},{chunk['end_time']})'"
-                    )
-                    filter_parts.append(subtitle_filter)
+            if cues:
+                # Subtitle chunks overlapping this segment, on the segment's own clock
+                text_filters = self.build_cue_filters(
+                    slice_cues(cues, start, end), os.path.join(segment_dir, f"subs{idx:02d}")
+                )
             else:
-                # Single line subtitle
-                escaped_text = text.replace("'", "\\'")
-                # Build filter with or without custom font
-                if font_path:
-                    subtitle_filter = (
-                        f"drawtext=fontfile='{font_path}':text='{escaped_text}':"
-                        f"fontcolor=white:"
-                        f"fontsize={config.subtitle_font_size}:"
-                        f"x=(w-text_w)/2:"
-                        f"y=h/4:"
-                        f"borderw=2:bordercolor=black:"
-                        f"enable='between(t,{chunk['start_time']},{chunk['end_time']})'"
-                    )
-                else:
-                    subtitle_filter = (
-                        f"drawtext=text='{escaped_text}':"
-                        f"fontcolor=white:"
-                        f"fontsize={config.subtitle_font_size}:"
-                        f"x=(w-text_w)/2:"
-                        f"y=h/4:"
-                        f"borderw=2:bordercolor=black:"
-                        f"enable='between(t,{chunk['start_time']},{chunk['end_time']})'"
-                    )
-                filter_parts.append(subtitle_filter)
+                text_filters = [self.build_text_overlay_filter(script)]
+            
+            segment_path = os.path.join(segment_dir, f"segment{idx:02d}.mp4")
+            segment_paths.append(segment_path)
+            video_filters = [scale_filter] + text_filters + [output_scale_filter]
+            commands.append([
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-filter_complex", f"[0:v]{join_filter_chain(video_filters)}[v]",
+                "-map", "[v]",
+                "-frames:v", str(end_frame - start_frame),
+            ] + self.build_encode_args(profile, threads=threads) + [
+                "-an",
+                segment_path
+            ])
+        
+        print(f"[DEBUG] Encoding {len(segments)} segments with {workers} workers")
+        # Each worker waits on its own ffmpeg process, so threads are enough to keep the encoders busy
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda cmd: subprocess.run(cmd, capture_output=True, text=True), commands))
+        for cmd, result in zip(commands, results):
+            if result.returncode != 0:
+                print(f"[DEBUG] Segment encode failed: {result.stderr.strip()}")
+                shutil.rmtree(segment_dir, ignore_errors=True)
+                raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+        
+        concat_list = os.path.join(segment_dir, "segments.txt")
+        with open(concat_list, 'w', encoding='utf-8') as f:
+            f.writelines(concat_list_entry(path) + "\n" for path in segment_paths)
+        
+        cmd = [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0", "-i", concat_list,
+            "-i", audio_path,
+            "-map", "0:v",
+            "-map", "1:a:0",  # Use audio from second input (voiceover)
+            "-c:v", "copy",  # Segments are joined without re-encoding
+        ] + self.build_audio_encode_args(profile)
+        if config.get_encode_profile(profile).get('faststart'):
+            cmd += ["-movflags", "+faststart"]
+        cmd += [
+            "-shortest",
+            output_path
+        ]
+        try:
+            print(f"[DEBUG] Running FFmpeg command: {' '.join(cmd)}")
+            subprocess.run(cmd, check=True)
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+        print(f"Parallel render complete ({len(segments)} segments). Final duration: {duration} seconds")
+    
+    def log_render_timing(self, mode, elapsed):
+        """Log render wall-clock time (benchmarks/benchmark_render_modes.py compares the modes)"""
+        print(f"[TIMING] {mode} render took {elapsed:.2f}s")
+    
+    def add_subtitles(self, input_path, script, output_path, duration, voiceover_path=None, profile=None):
+        """Add synchronized subtitles to video using FFmpeg"""
+        # The combined video carries the voiceover, so it can be aligned against directly
+        filter_parts, subtitle_chunks = self.build_subtitle_filters(
+            script, duration, os.path.splitext(output_path)[0], voiceover_path=voiceover_path or input_path
+        )
         
         # Combine all subtitle filters
         if filter_parts:
-            filter_str = ",".join(filter_parts)
-            print(f"[DEBUG] Using {len(filter_parts)} subtitle filters")
-            print("[DEBUG] Subtitle chunks:")
-            for i, chunk in enumerate(subtitle_chunks):
-                print(f"  Chunk {i}: '{chunk['text']}' ({chunk['start_time']:.2f}s - {chunk['end_time']:.2f}s)")
+            filter_str = join_filter_chain(filter_parts + [self.build_profile_scale_filter(profile)])
         else:
             print("[DEBUG] No subtitle filters generated, using fallback")
-            self.add_text_overlay(input_path, script, output_path)
+            self.add_text_overlay(input_path, script, output_path, profile)
             return
         
         # Apply subtitles using FFmpeg
@@ -299,7 +577,7 @@ class VideoAgent:
             "ffmpeg", "-y",
             "-i", input_path,
             "-vf", filter_str,
-            "-c:v", "libx264",
+        ] + self.build_encode_args(profile) + [
             "-c:a", "copy",  # Preserve original audio
             output_path
         ]
@@ -312,10 +590,100 @@ class VideoAgent:
             print(f"Error adding subtitles: {e}")
             print("[DEBUG] Falling back to simple text overlay")
             # Fallback to simple text overlay
-            self.add_text_overlay(input_path, script, output_path)
+            self.add_text_overlay(input_path, script, output_path, profile)
+    
+    def build_subtitle_filters(self, script, duration, sidecar_base=None, voiceover_path=None):
+        """Build the subtitle filters for the script (per-line drawtext, or one compiled sendcmd/ASS filter)"""
+        cues, subtitle_chunks = self.build_subtitle_cues(script, duration, voiceover_path)
+        filter_parts = self.build_cue_filters(cues, sidecar_base)
+        
+        if filter_parts:
+            print(f"[DEBUG] Using {len(filter_parts)} subtitle filters ({config.subtitle_renderer})")
+            print("[DEBUG] Subtitle chunks:")
+            for i, chunk in enumerate(subtitle_chunks):
+                print(f"  Chunk {i}: '{chunk['text']}' ({chunk['start_time']:.2f}s - {chunk['end_time']:.2f}s)")
+        
+        return filter_parts, subtitle_chunks
     
-    def split_script_for_subtitles(self, script, duration, words_per_chunk=5):
-        """Split script into timed subtitle chunks of N words each (default 5), synced with voiceover timing."""
+    def build_subtitle_cues(self, script, duration, voiceover_path=None):
+        """Timed subtitle cues (start, end and wrapped lines) for the script"""
+        # Split script into subtitle chunks (5-6 words per chunk)
+        subtitle_chunks = self.split_script_for_subtitles(script, duration, voiceover_path=voiceover_path)
+        
+        cues = []
+        for chunk in subtitle_chunks:
+            text = chunk['text']
+            if not text or not text.strip():
+                continue
+            
+            # Check if text needs to be split into multiple lines
+            estimated_width = estimate_text_width(text, config.subtitle_font_size)
+            if estimated_width > MAX_SAFE_TEXT_WIDTH:
+                # Split long text into multiple lines
+                lines = self.split_text_into_lines(text)
+            else:
+                lines = [text]
+            cues.append({
+                'start_time': chunk['start_time'],
+                'end_time': chunk['end_time'],
+                'lines': [line for line in lines if line.strip()]
+            })
+        return cues, subtitle_chunks
+    
+    def build_cue_filters(self, cues, sidecar_base=None):
+        """Filters burning in the cues with the configured subtitle renderer"""
+        if not cues:
+            return []
+        
+        font_path = FONT_PATH
+        
+        # Check if font file exists
+        if not os.path.exists(font_path):
+            print(f"[WARNING] Font file not found: {font_path}")
+            print("[DEBUG] Using default font")
+            font_path = ""  # Use default font
+        
+        filter_parts = []
+        if config.subtitle_renderer in ('sendcmd', 'ass', 'overlay'):
+            # One filter (or overlay fragment) for the whole script; cue data goes to sidecar files
+            if sidecar_base is None:
+                sidecar_base = os.path.join(self.output_dir, "subtitles")
+            compiler = SubtitleCompiler(font_path)
+            compiled = compiler.compile(cues, config.subtitle_renderer, sidecar_base)
+            if compiled:
+                filter_parts.append(compiled)
+        else:
+            for cue in cues:
+                for line_idx, line in enumerate(cue['lines']):
+                    y_offset = line_idx * (config.subtitle_font_size + 10)
+                    y_expr = f"(h/4)+{y_offset}" if y_offset else "h/4"
+                    filter_parts.append(
+                        self.build_drawtext_filter(line, y_expr, cue['start_time'], cue['end_time'], font_path)
+                    )
+        return filter_parts
+    
+    def build_drawtext_filter(self, text, y_expr, start_time, end_time, font_path=FONT_PATH):
+        """Build a single drawtext filter shown between start_time and end_time"""
+        escaped_text = text.replace("'", "\\'")
+        # Build filter with or without custom font
+        font_option = f"fontfile='{font_path}':" if font_path else ""
+        return (
+            f"drawtext={font_option}text='{escaped_text}':"
+            f"fontcolor=white:"
+            f"fontsize={config.subtitle_font_size}:"
+            f"x=(w-text_w)/2:"
+            f"y={y_expr}:"
+            f"borderw=2:bordercolor=black:"
+            f"enable='between(t,{start_time},{end_time})'"
+        )
+    
+    def split_script_for_subtitles(self, script, duration, words_per_chunk=5, voiceover_path=None):
+        """Split script into timed subtitle chunks of N words each (default 5), synced with voiceover timing.
+        
+        With a voiceover_path, chunks follow the voiceover's measured sentence timings when it was
+        synthesized sentence by sentence, or are aligned to the pauses detected in the audio;
+        otherwise timing is proportional to word position.
+        """
         # Clean the script first to remove all special characters
         cleaned_script = clean_script_for_subtitles(script)
         cleaned_script = cleaned_script.strip()
@@ -346,7 +714,7 @@ class VideoAgent:
             
             # Check if text would overflow using width estimation
             estimated_width = estimate_text_width(chunk_text, config.subtitle_font_size)
-            max_safe_width = 900  # For 1080x1920 video
+            max_safe_width = MAX_SAFE_TEXT_WIDTH
             
             if estimated_width > max_safe_width:
                 # Reduce chunk size to prevent overflow
@@ -359,6 +727,19 @@ class VideoAgent:
             if chunk_text.strip():
                 chunks.append(chunk_text)
         
+        # Align chunk boundaries to the pauses in the voiceover when available
+        aligned = []
+        if voiceover_path and config.subtitle_alignment:
+            # Measured sentence timings (sentence-parallel TTS) beat pause detection
+            sentences = load_sentence_timings(voiceover_path)
+            if sentences:
+                aligned = align_chunks_to_sentences([chunk.split() for chunk in chunks], sentences)
+                print(f"[DEBUG] Aligned subtitles to {len(sentences)} measured sentence timings")
+            analysis = None if aligned else analyze_voiceover(voiceover_path)
+            if analysis and analysis['speech_segments']:
+                aligned = align_chunks([chunk.split() for chunk in chunks], analysis['speech_segments'])
+                print(f"[DEBUG] Aligned subtitles to {len(analysis['pauses'])} pauses in the voiceover")
+        
         # Calculate timing for each chunk with improved synchronization
         subtitle_chunks = []
         current_time = 0
@@ -375,6 +756,22 @@ class VideoAgent:
             start_word_index = total_processed_words
             end_word_index = start_word_index + chunk_word_count
             
+            if aligned:
+                # Real speech timing: only stretch short chunks, up to the next chunk's start
+                timing = aligned[len(subtitle_chunks)]
+                start_time = timing['start_time']
+                end_time = timing['end_time']
+                next_start = aligned[len(subtitle_chunks) + 1]['start_time'] if len(subtitle_chunks) + 1 < len(aligned) else duration
+                end_time = max(end_time, min(start_time + 1.0, next_start))
+                subtitle_chunks.append({
+                    'text': chunk_text,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'word_count': chunk_word_count
+                })
+                total_processed_words += chunk_word_count
+                continue
+            
             # Calculate start and end times based on word position
             start_time = (start_word_index / total_words) * duration
             end_time = (end_word_index / total_words) * duration
@@ -405,8 +802,10 @@ class VideoAgent:
         
         return subtitle_chunks
     
-    def split_text_into_lines(self, text, max_chars_per_line=25):
-        """Split text into multiple lines to prevent overflow"""
+    def split_text_into_lines(self, text, max_chars_per_line=25, max_width=None):
+        """Split text into multiple lines to prevent overflow (by measured width when the font is available)"""
+        if max_width is None and os.path.exists(FONT_PATH):
+            max_width = MAX_SAFE_TEXT_WIDTH
         words = text.split()
         lines = []
         current_line = []
@@ -414,7 +813,11 @@ class VideoAgent:
         
         for word in words:
             # Check if adding this word would exceed the line limit
-            if current_length + len(word) + 1 > max_chars_per_line and current_line:
+            if max_width:
+                too_long = estimate_text_width(' '.join(current_line + [word]), config.subtitle_font_size) > max_width
+            else:
+                too_long = current_length + len(word) + 1 > max_chars_per_line
+            if too_long and current_line:
                 # Start a new line
                 lines.append(' '.join(current_line))
                 current_line = [word]
@@ -477,24 +880,28 @@ class VideoAgent:
         print("[DEBUG] FFmpeg subtitle filter:", filter_str)
         return filter_str
     
-    def add_text_overlay(self, input_path, text, output_path):
+    def add_text_overlay(self, input_path, text, output_path, profile=None):
         """Add text overlay to video using FFmpeg (fallback method)"""
-        # Escape text for FFmpeg
-        escaped_text = escape_for_drawtext(text)
-        
-        # Create filter string with custom font
-        font_path = "assets/Montserrat-SemiBold.ttf"
-        filter_str = f"drawtext=fontfile='{font_path}':text='{escaped_text}':fontcolor=white:fontsize=60:x=(w-text_w)/2:y=h/4:borderw=2:bordercolor=black:shadowcolor=black:shadowx=2:shadowy=2"
+        filter_str = join_filter_chain([self.build_text_overlay_filter(text), self.build_profile_scale_filter(profile)])
         
         cmd = [
             "ffmpeg", "-y",
             "-i", input_path,
             "-vf", filter_str,
+        ] + self.build_encode_args(profile) + [
             "-c:a", "copy",
             output_path
         ]
         subprocess.run(cmd, check=True)
     
+    def build_text_overlay_filter(self, text):
+        """Build the drawtext filter for the static text overlay"""
+        # Escape text for FFmpeg
+        escaped_text = escape_for_drawtext(text)
+        
+        # Create filter string with custom font
+        return f"drawtext=fontfile='{FONT_PATH}':text='{escaped_text}':fontcolor=white:fontsize=60:x=(w-text_w)/2:y=h/4:borderw=2:bordercolor=black:shadowcolor=black:shadowx=2:shadowy=2"
+    
     def clean_text_for_overlay(self, text):
         """Clean text for video overlay by removing formatting characters and emojis"""
         # Remove hashtags, asterisks, and other formatting characters
@@ -1,19 +1,29 @@
 import os
+import re
+import shutil
+import subprocess
 import requests
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from config import config
+from utils.audio_cache import tts_cache
+from utils.tts_backends import get_tts_backend
+from utils.voice_aligner import decode_pcm, write_sentence_timings, remove_sentence_timings
+
+# Sample rate sentence audio is decoded to before it is joined into one voiceover
+VOICEOVER_SAMPLE_RATE = 44100
 
 class VoiceAgent:
-    def __init__(self):
-        self.api_key = config.elevenlabs_api_key
-        self.voice_id = config.elevenlabs_voice_id
-        self.base_url = "https://api.elevenlabs.io/v1"
+    def __init__(self, backend=None):
+        # Speech synthesizer named by config.tts_backend (ElevenLabs by default)
+        self.backend = backend or get_tts_backend()
     
     def generate_voiceover(self, script, output_path="output/voiceover.mp3"):
-        """Generate voiceover from script using ElevenLabs API"""
+        """Generate voiceover from script with the configured TTS backend"""
         
-        # Check if API key is available
-        if not self.api_key:
-            print("Error: ElevenLabs API key not configured")
+        # Check if the backend can run (API key configured, binary installed)
+        if not self.backend.available():
+            print(f"Error: TTS backend '{self.backend.name}' is not available (API key or engine missing)")
             return None
         
         # Clean the script text - remove formatting characters
@@ -22,39 +32,110 @@ class VoiceAgent:
         # Create output directory if it doesn't exist
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        url = f"{self.base_url}/text-to-speech/{self.voice_id}"
-        
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
-        }
-        
-        data = {
-            "text": cleaned_script,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-                "stability": config.voice_stability,
-                "similarity_boost": config.voice_similarity_boost,
-                "style": 0.0,
-                "use_speaker_boost": True
-            },
-            "optimization_level": 0  # Faster generation, shorter output
-        }
+        sentences = self.split_sentences(cleaned_script) if config.tts_sentence_parallel else []
+        if len(sentences) > 1:
+            return self.generate_sentence_parallel(sentences, output_path)
+        
+        # Timings left by an earlier sentence-by-sentence voiceover at this path no longer apply
+        remove_sentence_timings(output_path)
+        
+        cache_key = self.audio_cache_key(cleaned_script)
+        if config.tts_cache_enabled and tts_cache.get(cache_key, output_path):
+            print(f"Voiceover reused from cache: {output_path}")
+            return output_path
         
         try:
-            response = requests.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            self.synthesize(cleaned_script, output_path)
             
+            if config.tts_cache_enabled:
+                tts_cache.put(cache_key, output_path)
             print(f"Voiceover saved to: {output_path}")
             return output_path
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, subprocess.CalledProcessError, OSError) as e:
+            print(f"Error generating voiceover: {e}")
+            return None
+    
+    def split_sentences(self, text, min_words=3):
+        """Split cleaned text on sentence boundaries, merging fragments shorter than min_words"""
+        sentences = []
+        for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+            if sentences and len(sentence.split()) < min_words:
+                sentences[-1] = f"{sentences[-1]} {sentence}"
+            elif sentence:
+                sentences.append(sentence)
+        return sentences
+    
+    def generate_sentence_parallel(self, sentences, output_path):
+        """Synthesize sentences concurrently and stitch them into one voiceover.
+        
+        At most config.tts_concurrency requests run at once. Sentences are cached
+        individually, so after a partial script edit only the changed sentences are
+        synthesized. The per-sentence audio is decoded and joined in script order and
+        encoded once, and each sentence's decoded duration is written to a sentence timings
+        sidecar used for subtitle timing.
+        """
+        work_dir = f"{os.path.splitext(output_path)[0]}_sentences"
+        os.makedirs(work_dir, exist_ok=True)
+        paths = [os.path.join(work_dir, f"{index:03d}.mp3") for index in range(len(sentences))]
+        
+        try:
+            workers = max(1, min(config.tts_concurrency, len(sentences)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # sum() consumes every result, re-raising the first failed request before concat
+                reused = sum(executor.map(self.synthesize_cached, sentences, paths))
+            
+            durations = self.concat_audio(paths, output_path)
+            write_sentence_timings(output_path, sentences, durations)
+            
+            print(f"Voiceover saved to: {output_path} ({len(sentences)} sentences, "
+                  f"{reused} from cache, {workers} at a time)")
+            return output_path
+            
+        except (requests.exceptions.RequestException, subprocess.CalledProcessError, OSError, ValueError) as e:
             print(f"Error generating voiceover: {e}")
             return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def synthesize_cached(self, text, output_path):
+        """Synthesize one piece of text unless cached; returns True on a cache hit"""
+        cache_key = self.audio_cache_key(text)
+        if config.tts_cache_enabled and tts_cache.get(cache_key, output_path):
+            return True
+        self.synthesize(text, output_path)
+        if config.tts_cache_enabled:
+            tts_cache.put(cache_key, output_path)
+        return False
+    
+    def audio_cache_key(self, text):
+        """Identical text and voice settings always synthesize the same speech"""
+        return tts_cache.cache_key(text, *self.backend.cache_identity())
+    
+    def concat_audio(self, paths, output_path):
+        """Join audio files into one MP3, returning each file's duration within it.
+        
+        The files are decoded and their samples joined before a single encode, so
+        the encoder delay and padding of each MP3 do not add a gap at every joint.
+        Durations are counted from the decoded samples, so they match the output.
+        """
+        pieces = []
+        for path in paths:
+            decoded = decode_pcm(path, VOICEOVER_SAMPLE_RATE)
+            if decoded is None:
+                raise ValueError(f"could not decode sentence audio: {path}")
+            pieces.append(decoded[0])
+        samples = np.clip(np.concatenate(pieces) * 32768.0, -32768, 32767).astype('<i2')
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "s16le", "-ar", str(VOICEOVER_SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+            "-b:a", "128k", output_path
+        ], input=samples.tobytes(), check=True, capture_output=True)
+        return [len(piece) / VOICEOVER_SAMPLE_RATE for piece in pieces]
+    
+    def synthesize(self, text, output_path):
+        """Synthesize text to output_path with the backend; raises on failure"""
+        self.backend.synthesize(text, output_path)
     
     def clean_script_text(self, script):
         """Clean script text by removing formatting characters and special symbols"""
@@ -89,14 +170,9 @@ class VoiceAgent:
         return cleaned
     
     def get_available_voices(self):
-        """Get list of available voices from ElevenLabs"""
-        url = f"{self.base_url}/voices"
-        headers = {"xi-api-key": self.api_key}
-        
+        """Get list of available voices from the TTS backend"""
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+            return self.backend.list_voices()
         except Exception as e:
             print(f"Error fetching voices: {e}")
             return None
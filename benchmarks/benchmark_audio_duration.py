@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-process audio header parsing vs spawning ffprobe
+Usage: python benchmarks/benchmark_audio_duration.py [audio_file ...]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_info import read_audio_duration
+
+def ffprobe_duration(path):
+    """Uncached ffprobe call, as get_audio_duration used to do"""
+    cmd = [
+        "ffprobe", "-v", "quiet", "-show_entries",
+        "format=duration", "-of", "csv=p=0", path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def time_per_call(func, path, repeat):
+    """Average wall-clock seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = func(path)
+    return (time.perf_counter() - start) / repeat, value
+
+def main():
+    paths = sys.argv[1:] or ["output/voiceover.mp3"]
+    
+    print("⏱️ Audio Duration Benchmark")
+    print("=" * 70)
+    print(f"{'file':<30} {'parser':>12} {'ffprobe':>12} {'speedup':>8}  durations")
+    
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path:<30} not found")
+            continue
+        
+        parser_time, parser_value = time_per_call(read_audio_duration, path, 200)
+        try:
+            probe_time, probe_value = time_per_call(ffprobe_duration, path, 20)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            probe_time, probe_value = None, None
+        
+        parser_ms = f"{parser_time * 1000:.3f}ms"
+        if probe_time:
+            print(f"{os.path.basename(path):<30} {parser_ms:>12} {probe_time * 1000:>10.3f}ms "
+                  f"{probe_time / parser_time:>7.0f}x  {parser_value} / {probe_value}")
+        else:
+            print(f"{os.path.basename(path):<30} {parser_ms:>12} {'n/a':>12} {'':>8}  {parser_value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: render time and output size per encode profile
+Usage: python benchmarks/benchmark_encode_profiles.py [duration_seconds]
+
+Renders the same reel (synthetic 1080x1920 background, sine voiceover,
+subtitles) with render_single_pass once per profile in ENCODE_PROFILES.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config, ENCODE_PROFILES
+from agents.video_agent import VideoAgent
+
+SCRIPT = (
+    "Ever wondered how large language models actually remember facts? "
+    "They do not look anything up. Instead, billions of weights store patterns "
+    "learned from text, and retrieval augmented generation adds a search step "
+    "so the model can quote fresh documents instead of guessing."
+)
+
+def make_inputs(tmp, duration):
+    """Synthetic background and voiceover of the reel's length"""
+    background = os.path.join(tmp, "background.mp4")
+    voiceover = os.path.join(tmp, "voiceover.mp3")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+        "-i", f"testsrc2=s={config.video_width}x{config.video_height}:r={config.video_fps}:d={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", background
+    ], check=True)
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"sine=f=220:d={duration}",
+        "-b:a", "128k", voiceover
+    ], check=True)
+    return background, voiceover
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    video_agent = VideoAgent()
+    cleaned_script = video_agent.clean_text_for_overlay(SCRIPT)
+
+    print("⏱️ Encode Profile Benchmark")
+    print("=" * 60)
+    print(f"Reel: {duration:.0f}s at {config.video_width}x{config.video_height}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        background, voiceover = make_inputs(tmp, duration)
+        for profile, settings in ENCODE_PROFILES.items():
+            output = os.path.join(tmp, f"{profile}.mp4")
+            start = time.perf_counter()
+            video_agent.render_single_pass(background, voiceover, cleaned_script, output, duration, profile)
+            elapsed = time.perf_counter() - start
+            scale = video_agent.build_profile_scale_filter(profile).replace("scale=", "") or "full"
+            results.append((profile, settings, scale, elapsed, os.path.getsize(output)))
+
+    baseline = dict((profile, elapsed) for profile, _, _, elapsed, _ in results).get('standard')
+    print(f"\n{'profile':<10} {'preset':<10} {'crf':>4} {'scale':>10} {'time':>9} {'vs standard':>12} {'output':>9}")
+    for profile, settings, scale, elapsed, size in results:
+        relative = f"{baseline / elapsed:.2f}x" if baseline else "-"
+        print(f"{profile:<10} {settings['preset']:<10} {settings['crf']:>4} {scale:>10} "
+              f"{elapsed:>8.2f}s {relative:>12} {size / 1e6:>7.2f}MB")
+
+if __name__ == "__main__":
+    main()
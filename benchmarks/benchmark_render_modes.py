@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass vs two-pass render of the same reel
+Usage: python benchmarks/benchmark_render_modes.py [duration_seconds] [profile]
+
+Renders one reel (synthetic landscape background that needs scaling and
+looping, sine voiceover, subtitles) with render_single_pass, the two-pass
+path through an intermediate file, and the piped two-pass path, and
+reports the wall-clock time of each relative to single_pass.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from agents.video_agent import VideoAgent
+
+SCRIPT = (
+    "Ever wondered how large language models actually remember facts? "
+    "They do not look anything up. Instead, billions of weights store patterns "
+    "learned from text, and retrieval augmented generation adds a search step "
+    "so the model can quote fresh documents instead of guessing."
+)
+
+def make_inputs(tmp, duration):
+    """Synthetic 16:9 background (shorter than the reel, so it loops) and voiceover"""
+    background = os.path.join(tmp, "background.mp4")
+    voiceover = os.path.join(tmp, "voiceover.mp3")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+        "-i", f"testsrc2=s=1280x720:r=30:d={min(duration / 2, 15)}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", background
+    ], check=True)
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"sine=f=220:d={duration}",
+        "-b:a", "128k", voiceover
+    ], check=True)
+    return background, voiceover
+
+def render_two_pass(video_agent, background, voiceover, script, output, duration, profile):
+    """Combine to an intermediate file, then burn in the subtitles (create_reel's fallback)"""
+    intermediate = output.replace('.mp4', '_combined.mp4')
+    video_agent.combine_video_audio(background, voiceover, intermediate, duration, profile)
+    video_agent.add_subtitles(intermediate, script, output, duration, voiceover, profile)
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    profile = sys.argv[2] if len(sys.argv) > 2 else config.encode_profile
+    video_agent = VideoAgent()
+    cleaned_script = video_agent.clean_text_for_overlay(SCRIPT)
+
+    print("⏱️ Render Mode Benchmark")
+    print("=" * 60)
+    print(f"Reel: {duration:.0f}s at {config.video_width}x{config.video_height}, profile {profile}")
+
+    modes = (
+        ('single_pass', video_agent.render_single_pass),
+        ('two_pass', lambda *args: render_two_pass(video_agent, *args)),
+        ('two_pass_piped', video_agent.render_two_pass_piped),
+    )
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        background, voiceover = make_inputs(tmp, duration)
+        for mode, render in modes:
+            output = os.path.join(tmp, f"{mode}.mp4")
+            start = time.perf_counter()
+            render(background, voiceover, cleaned_script, output, duration, profile)
+            timings[mode] = time.perf_counter() - start
+            print(f"{mode}: {timings[mode]:.2f}s, {os.path.getsize(output) / 1e6:.1f} MB")
+
+    print(f"\n{'mode':<16} {'time':>9} {'vs single_pass':>15}")
+    for mode, elapsed in timings.items():
+        print(f"{mode:<16} {elapsed:>8.2f}s {elapsed / timings['single_pass']:>14.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-frame filter cost of the subtitle renderers on a 30-second reel
+Usage: python benchmarks/benchmark_subtitle_renderers.py [duration_seconds]
+
+Each renderer filters a synthetic 1080x1920 background to the null muxer
+(no encode), so the numbers isolate subtitle rendering cost.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from agents.video_agent import VideoAgent, join_filter_chain
+
+SCRIPT = (
+    "Ever wondered how large language models actually remember facts? "
+    "They do not look anything up. Instead, billions of weights store patterns "
+    "learned from text, and retrieval augmented generation adds a search step "
+    "so the model can quote fresh documents instead of guessing. That means "
+    "fewer hallucinations, up to date answers and sources you can check. "
+    "Next time an assistant cites a page, you will know a retriever found it first. "
+    "Follow for more bite sized AI explainers every single day."
+)
+
+def run_filter(video_filter, duration):
+    """Run the filter over a synthetic background and return wall-clock seconds"""
+    source = f"testsrc2=s={config.video_width}x{config.video_height}:r={config.video_fps}:d={duration}"
+    # Pin the reel pixel format so format conversion is part of the baseline
+    graph = join_filter_chain(["format=yuv420p", video_filter, "format=yuv420p"])
+    cmd = ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", source, "-vf", graph, "-f", "null", "-"]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    frames = int(duration * config.video_fps)
+    video_agent = VideoAgent()
+    cleaned_script = video_agent.clean_text_for_overlay(SCRIPT)
+    
+    print("⏱️ Subtitle Renderer Benchmark")
+    print("=" * 60)
+    print(f"Reel: {duration:.0f}s, {frames} frames, {len(SCRIPT.split())} words")
+    
+    baseline = run_filter("", duration)
+    print(f"\n{'renderer':<10} {'filters':>8} {'total':>9} {'ms/frame':>10} {'subtitle ms/frame':>18}")
+    print(f"{'none':<10} {0:>8} {baseline:>8.2f}s {baseline / frames * 1000:>10.3f} {'-':>18}")
+    
+    original_renderer = config.subtitle_renderer
+    with tempfile.TemporaryDirectory() as tmp:
+        for renderer in ('drawtext', 'sendcmd', 'ass', 'overlay'):
+            config.subtitle_renderer = renderer
+            filters, _ = video_agent.build_subtitle_filters(cleaned_script, duration, os.path.join(tmp, renderer))
+            try:
+                elapsed = run_filter(join_filter_chain(filters), duration)
+            except subprocess.CalledProcessError as e:
+                error = e.stderr.decode(errors='ignore').strip().splitlines()[0]
+                print(f"{renderer:<10} {len(filters):>8}   failed: {error[:60]}")
+                continue
+            overhead = (elapsed - baseline) / frames * 1000
+            print(f"{renderer:<10} {len(filters):>8} {elapsed:>8.2f}s {elapsed / frames * 1000:>10.3f} {overhead:>18.3f}")
+    config.subtitle_renderer = original_renderer
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cached glyph-metric text measurement vs Pillow getlength
+Usage: python benchmarks/benchmark_text_width.py
+"""
+
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import ImageFont
+
+from config import config
+from agents.video_agent import FONT_PATH
+from utils.font_metrics import FontMetrics
+
+SAMPLES = [
+    "Ever wondered how large",
+    "language models remember facts",
+    "WWW MMM wide glyphs here",
+    "tiny illicit little lines",
+    "Retrieval augmented generation",
+    "café naïve résumé déjà vu",
+]
+
+def time_per_call(func, repeat=2000):
+    """Average microseconds per call over all samples"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in SAMPLES:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(SAMPLES)) * 1e6
+
+def main():
+    font_size = config.subtitle_font_size
+    
+    start = time.perf_counter()
+    metrics = FontMetrics(FONT_PATH)
+    load_ms = (time.perf_counter() - start) * 1000
+    pillow_font = ImageFont.truetype(FONT_PATH, font_size)
+    
+    print("⏱️ Text Width Benchmark")
+    print("=" * 60)
+    print(f"Font: {FONT_PATH} @ {font_size}px (tables built in {load_ms:.0f}ms, kerning: {metrics.has_kerning})")
+    
+    print(f"\n{'text':<32} {'metrics':>9} {'pillow':>9} {'old est.':>9}")
+    for text in SAMPLES:
+        print(f"{text:<32} {metrics.measure(text, font_size):>9.1f} "
+              f"{pillow_font.getlength(text):>9.1f} {len(text) * font_size * 0.6:>9.1f}")
+    
+    metrics_us = time_per_call(lambda text: metrics.measure(text, font_size))
+    pillow_us = time_per_call(pillow_font.getlength)
+    print(f"\nmetrics.measure:  {metrics_us:.2f} µs/call")
+    print(f"Pillow getlength: {pillow_us:.2f} µs/call ({pillow_us / metrics_us:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: speech synthesis throughput per TTS backend
+Usage: python benchmarks/benchmark_tts_backends.py [repeats]
+
+Synthesizes the same script with every available backend in TTS_BACKENDS
+(ElevenLabs needs an API key, espeak needs espeak-ng installed) and reports
+seconds of audio produced per wall-clock second. The TTS cache is bypassed.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_info import read_audio_duration
+from utils.tts_backends import TTS_BACKENDS
+
+SCRIPT = (
+    "Ever wondered how large language models actually remember facts? "
+    "They do not look anything up. Instead, billions of weights store patterns "
+    "learned from text, and retrieval augmented generation adds a search step "
+    "so the model can quote fresh documents instead of guessing."
+)
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print("⏱️ TTS Backend Benchmark")
+    print("=" * 60)
+    print(f"Script: {len(SCRIPT.split())} words, {len(SCRIPT)} chars, {repeats} runs per backend")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend_class in TTS_BACKENDS.items():
+            backend = backend_class()
+            if not backend.available():
+                print(f"{name}: skipped (not available)")
+                continue
+            output = os.path.join(tmp, f"{name}.mp3")
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                backend.synthesize(SCRIPT, output)
+                timings.append(time.perf_counter() - start)
+            results.append((name, min(timings), sum(timings) / len(timings), read_audio_duration(output) or 0.0))
+
+    print(f"\n{'backend':<12} {'best':>8} {'mean':>8} {'audio':>8} {'audio s/s':>10} {'chars/s':>9}")
+    for name, best, mean, audio in results:
+        print(f"{name:<12} {best:>7.2f}s {mean:>7.2f}s {audio:>7.2f}s {audio / mean:>9.1f}x {len(SCRIPT) / mean:>9.0f}")
+
+if __name__ == "__main__":
+    main()
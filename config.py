@@ -4,6 +4,24 @@ from dataclasses import dataclass, asdict
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+# Named libx264/AAC encode settings. 'scale' shrinks the burned-in render (draft previews);
+# 'publish' stays inside Instagram's upload limits (H.264 up to 25 Mbps, AAC 128 kbps, moov first).
+ENCODE_PROFILES: Dict[str, Dict[str, Any]] = {
+    'draft': {
+        'preset': 'ultrafast', 'crf': 32, 'tune': 'fastdecode', 'threads': 0,
+        'scale': 1 / 3, 'audio_bitrate': '96k'
+    },
+    'standard': {
+        'preset': 'medium', 'crf': 23, 'tune': None, 'threads': 0,
+        'scale': 1.0, 'audio_bitrate': '128k'
+    },
+    'publish': {
+        'preset': 'slow', 'crf': 20, 'tune': 'film', 'threads': 0,
+        'scale': 1.0, 'audio_bitrate': '128k',
+        'maxrate': '25M', 'bufsize': '50M', 'faststart': True
+    },
+}
+
 @dataclass
 class Config:
     # API Keys
@@ -18,22 +36,67 @@ class Config:
     # Paths
     output_dir: str = 'output'
     assets_dir: str = 'assets'
+    jobs_dir: str = 'output/jobs'  # One directory per reel job (staged under .work/ until complete)
+    media_cache_file: str = 'cache/media_metadata.json'
+    media_cache_max_entries: int = 512
+    llm_cache_enabled: bool = True  # Reuse Gemini responses for identical requests
+    llm_cache_file: str = 'cache/llm_responses.json'
+    llm_cache_max_entries: int = 256
+    llm_cache_ttl_hours: float = 168.0  # Cached responses older than this are regenerated (0 = never expire)
+    tts_cache_enabled: bool = True  # Reuse synthesized voiceovers for identical text and voice settings
+    tts_cache_dir: str = 'cache/tts'
+    tts_cache_max_mb: float = 500.0
+    font_cache_dir: str = 'cache/fonts'  # Subtitle font staged for libass (a directory holding only fonts)
     
     # Video settings
     video_width: int = 1080
     video_height: int = 1920
     video_fps: int = 24
     
+    # Background library (backgrounds pre-normalized to the video settings above)
+    use_normalized_backgrounds: bool = True
+    background_cache_dir: str = 'assets/normalized'
+    
+    # Render settings
+    render_mode: str = 'single_pass'  # 'single_pass' (one encode), 'two_pass' (combine, then subtitles) or 'parallel' (segments)
+    parallel_workers: int = 0  # Segment encodes run at once in 'parallel' mode (0 = CPU count)
+    parallel_min_segment_duration: float = 8.0  # Shorter reels are not split
+    pipe_two_pass: bool = True  # Two-pass renders stream the combined reel into the subtitle stage
+    keep_intermediate: bool = False  # Also write the combined reel (output/final_reel.mp4) for debugging
+    encode_profile: str = 'standard'  # 'draft' (fast low-res preview), 'standard' or 'publish' (see ENCODE_PROFILES)
+    
+    # Batch pipeline settings (scripts/batch_reels.py): workers per stage and queue size between stages
+    pipeline_queue_size: int = 2  # Items waiting between two stages before the upstream stage blocks
+    pipeline_content_workers: int = 2
+    pipeline_voiceover_workers: int = 2
+    pipeline_video_workers: int = 0  # 0 = one encode per 4 CPU cores
+    pipeline_upload_workers: int = 1
+    
+    # HTTP settings (API calls share one pooled session)
+    http_pool_size: int = 10  # Keep-alive connections kept per host
+    http_max_retries: int = 3  # Retries on connection errors, 429 and 5xx
+    http_backoff_factor: float = 0.5  # Exponential backoff base in seconds (Retry-After takes precedence)
+    http_connect_timeout: float = 10.0
+    http_read_timeout: float = 120.0
+    
     # Voice settings
     voice_stability: float = 0.5
     voice_similarity_boost: float = 0.75
+    tts_backend: str = 'elevenlabs'  # 'elevenlabs', 'espeak' (local espeak-ng, offline) or 'synthetic' (placeholder audio for CI/load tests)
+    espeak_voice: str = 'en-us'
+    espeak_words_per_minute: int = 165
+    tts_streaming: bool = True  # Use the streaming TTS endpoint (audio is written to disk as it arrives)
+    tts_sentence_parallel: bool = False  # Synthesize sentences concurrently and stitch them (exact sentence timings)
+    tts_concurrency: int = 4  # Sentence requests in flight at once
     
     # Content settings
     default_reel_duration: int = 30
     max_hashtags: int = 20
+    combined_content_request: bool = False  # One JSON-mode Gemini request for script, hashtags and caption
     
     # Subtitle settings
     subtitle_enabled: bool = True
+    subtitle_renderer: str = 'drawtext'  # 'drawtext' (filter per line), 'sendcmd' (one drawtext), 'ass' (libass) or 'overlay' (PNG sprites)
     subtitle_font_size: int = 50
     subtitle_font_color: str = 'white'
     subtitle_background_color: str = 'black@0.7'
@@ -41,6 +104,8 @@ class Config:
     subtitle_min_duration: float = 1.0
     subtitle_max_duration: float = 4.0
     subtitle_gap: float = 0.2
+    subtitle_alignment: bool = True  # Snap subtitle timing to pauses detected in the voiceover
+    text_overlay_enabled: bool = True  # Burn in the whole script when subtitles are disabled (both off = stream-copy mux)
     
     # Configuration file path
     config_file: str = 'learn2reel_config.json'
@@ -52,7 +117,11 @@ class Config:
         if not self.gemini_api_key:
             errors.append("GEMINI_API_KEY is required")
         
-        if not self.elevenlabs_api_key:
+        if self.tts_backend not in ('elevenlabs', 'espeak', 'synthetic'):
+            errors.append("TTS backend must be 'elevenlabs', 'espeak' or 'synthetic'")
+        
+        # Offline backends need no API key
+        if self.tts_backend == 'elevenlabs' and not self.elevenlabs_api_key:
             errors.append("ELEVENLABS_API_KEY is required")
         
         # Instagram credentials are optional
@@ -68,6 +137,37 @@ class Config:
         if self.video_fps <= 0:
             errors.append("Video FPS must be positive")
         
+        if self.render_mode not in ('single_pass', 'two_pass', 'parallel'):
+            errors.append("Render mode must be 'single_pass', 'two_pass' or 'parallel'")
+        
+        if self.parallel_workers < 0 or self.parallel_min_segment_duration <= 0:
+            errors.append("Parallel render settings must be positive")
+        
+        if self.pipeline_queue_size <= 0 or min(self.pipeline_content_workers, self.pipeline_voiceover_workers,
+                                                 self.pipeline_upload_workers) <= 0 or self.pipeline_video_workers < 0:
+            errors.append("Batch pipeline settings must be positive")
+        
+        if self.llm_cache_max_entries <= 0 or self.llm_cache_ttl_hours < 0:
+            errors.append("LLM cache settings must be positive")
+        
+        if self.http_pool_size <= 0 or self.http_max_retries < 0 or self.http_backoff_factor < 0:
+            errors.append("HTTP pool size must be positive and retry settings non-negative")
+        
+        if self.http_connect_timeout <= 0 or self.http_read_timeout <= 0:
+            errors.append("HTTP timeouts must be positive")
+        
+        if self.tts_concurrency <= 0:
+            errors.append("TTS concurrency must be positive")
+        
+        if self.tts_cache_max_mb <= 0:
+            errors.append("TTS cache size must be positive")
+        
+        if self.encode_profile not in ENCODE_PROFILES:
+            errors.append(f"Encode profile must be one of: {', '.join(ENCODE_PROFILES)}")
+        
+        if self.subtitle_renderer not in ('drawtext', 'sendcmd', 'ass', 'overlay'):
+            errors.append("Subtitle renderer must be 'drawtext', 'sendcmd', 'ass' or 'overlay'")
+        
         if self.subtitle_font_size <= 0:
             errors.append("Subtitle font size must be positive")
         
@@ -79,6 +179,10 @@ class Config:
         
         return errors
     
+    def get_encode_profile(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """Encode settings for a named profile (the configured one by default)"""
+        return ENCODE_PROFILES[name or self.encode_profile]
+    
     def save_config(self) -> bool:
         """Save configuration to JSON file"""
         try:
@@ -171,6 +275,11 @@ class Config:
         if subtitle_enabled in ['n', 'no']:
             config.subtitle_enabled = False
         
+        if not config.subtitle_enabled:
+            text_overlay = input("Burn in the whole script as text instead? (y/n, default: y): ").strip().lower()
+            # With neither subtitles nor text the reel is muxed without re-encoding
+            config.text_overlay_enabled = text_overlay not in ['n', 'no']
+        
         if config.subtitle_enabled:
             try:
                 font_size = input(f"Subtitle font size (default: {config.subtitle_font_size}): ").strip()
@@ -15,6 +15,7 @@ from agents.voice_agent import VoiceAgent
 from agents.video_agent import VideoAgent
 from agents.instagram_agent import InstagramAgent
 from config import config
+from utils.job_workspace import JobWorkspace
 
 # Configure logging
 logging.basicConfig(
@@ -75,8 +76,9 @@ def main():
         print("❌ Please provide some learning content")
         return
     
-    print("\n🧠 Generating script...")
-    script = content_agent.generate_script(learning_content)
+    # Hashtags only need the learning content: request them alongside the script
+    print("\n🧠 Generating script and hashtags...")
+    script, hashtags_future, caption = content_agent.start_content(learning_content)
     
     if not script:
         print("❌ Failed to generate script")
@@ -84,29 +86,37 @@ def main():
     
     print(f"✅ Script generated:\n{script[:100]}...")
     
-    # Generate hashtags
-    print("\n🏷️ Generating hashtags...")
-    hashtags = content_agent.generate_hashtags(learning_content)
-    print(f"✅ Hashtags: {hashtags}")
+    # All files of this run go to their own job directory
+    job = JobWorkspace()
     
     # Generate voiceover
     print("\n🎙️ Generating voiceover...")
-    voiceover_path = voice_agent.generate_voiceover(script)
+    voiceover_path = voice_agent.generate_voiceover(script, job.path("voiceover.mp3"))
     
     if not voiceover_path:
         print("❌ Failed to generate voiceover")
+        job.fail("voiceover generation failed")
         return
     
     print(f"✅ Voiceover generated: {voiceover_path}")
     
+    hashtags = hashtags_future.result()
+    print(f"✅ Hashtags: {hashtags}")
+    
     # Create video
     print("\n🎬 Creating video...")
-    video_path = video_agent.create_reel(script, voiceover_path)
+    video_path = video_agent.create_reel(script, voiceover_path, job.path("reel.mp4"))
     
     if not video_path:
         print("❌ Failed to create video")
+        job.fail("video creation failed")
         return
     
+    # Use the model's caption when the combined request wrote one
+    caption = caption or content_agent.default_caption(learning_content)
+    job.commit(learning_content=learning_content, script=script, hashtags=hashtags, caption=caption)
+    voiceover_path = job.final_path(voiceover_path)
+    video_path = job.final_path(video_path)
     print(f"✅ Video created: {video_path}")
     
     # Ask if user wants to upload to Instagram
@@ -115,9 +125,6 @@ def main():
     if upload_choice == 'y':
         print("\n📤 Uploading to Instagram...")
         
-        # Create caption
-        caption = f"Today I learned: {learning_content[:100]}..."
-        
         success = instagram_agent.upload_reel(video_path, caption, hashtags)
         
         if success:
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Learn2Reel Batch Generation
+Generate one reel per line of a JSONL queue, resuming after interruptions
+
+Each line is a JSON object with the learning content under "learning_content"
+(or "content"/"body") and an optional "id" and "duration". Progress is
+checkpointed per stage in <queue>.progress.jsonl; rerunning the same command
+skips finished items and continues unfinished ones where they stopped.
+Stages of different items run concurrently (see config.pipeline_*) unless
+--sequential is given.
+"""
+
+import os
+import sys
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from utils.batch_journal import BatchJournal, load_batch_items, default_journal_path
+from utils.batch_runner import BatchRunner
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reels for every item of a JSONL queue")
+    parser.add_argument("items", help="JSONL file with one learning-content item per line")
+    parser.add_argument("--journal", help="Progress journal (default: <items>.progress.jsonl)")
+    parser.add_argument("--upload", action="store_true", help="Upload each finished reel to Instagram")
+    parser.add_argument("--duration", type=int, default=config.default_reel_duration, help="Target reel duration in seconds")
+    parser.add_argument("--limit", type=int, help="Process at most this many items")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry items that failed in an earlier run")
+    parser.add_argument("--refresh-content", action="store_true", help="Ask Gemini again instead of reusing cached scripts and hashtags")
+    parser.add_argument("--sequential", action="store_true", help="Finish each reel before starting the next (no stage overlap)")
+    args = parser.parse_args()
+    
+    errors = config.validate()
+    if errors:
+        print("❌ Configuration errors found:")
+        for error in errors:
+            print(f"  - {error}")
+        return False
+    
+    items = load_batch_items(args.items)
+    if args.limit:
+        items = items[:args.limit]
+    journal = BatchJournal(args.journal or default_journal_path(args.items))
+    finished = sum(1 for item in items if journal.completed(item['id'], 'done'))
+    
+    print("📦 Batch Reel Generation")
+    print("=" * 30)
+    print(f"Queue: {args.items} ({len(items)} items, {finished} already done)")
+    print(f"Journal: {journal.path}")
+    print(f"Jobs: {config.jobs_dir}")
+    
+    runner = BatchRunner(journal, upload=args.upload, duration=args.duration, refresh_content=args.refresh_content)
+    if args.sequential:
+        runner.run(items, skip_failed=args.skip_failed)
+    else:
+        runner.run_pipelined(items, skip_failed=args.skip_failed)
+        print(f"\n⏱️ Pipeline: {runner.pipeline.elapsed:.1f}s")
+        utilization = runner.pipeline.utilization()
+        for stage, stats in runner.pipeline.stats.items():
+            print(f"  {stage:<10} {stats['items']:>3} ok {stats['failed']:>3} failed, "
+                  f"busy {stats['busy']:.1f}s ({utilization.get(stage, 0):.0%} of its workers)")
+    
+    done = [item for item in items if journal.completed(item['id'], 'done')]
+    failed = [item for item in items if journal.get(item['id']).get('stage') == 'failed']
+    print(f"\n✅ {len(done)}/{len(items)} reels done")
+    for item in failed:
+        state = journal.get(item['id'])
+        print(f"  ❌ {item['id']}: {state.get('failed_stage')} - {state.get('error')}")
+    return len(done) == len(items)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
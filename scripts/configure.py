@@ -30,6 +30,7 @@ def show_current_config():
     # Settings
     print(f"\n🎬 Subtitle Settings:")
     print(f"  Enabled: {config.subtitle_enabled}")
+    print(f"  Text Overlay (when disabled): {config.text_overlay_enabled}")
     print(f"  Font Size: {config.subtitle_font_size}")
     print(f"  Font Color: {config.subtitle_font_color}")
     
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Learn2Reel Background Ingest
+Normalize assets/1..20.mp4 once to the configured reel geometry
+"""
+
+import os
+import sys
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from utils.background_library import BackgroundLibrary
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-normalize background videos")
+    parser.add_argument("--force", action="store_true", help="Re-transcode clips that are already cached")
+    args = parser.parse_args()
+    
+    library = BackgroundLibrary(config.assets_dir)
+    sources = library.source_paths()
+    
+    print("🎞️ Background Ingest")
+    print("=" * 30)
+    print(f"Target: {config.video_width}x{config.video_height} @ {config.video_fps}fps")
+    print(f"Cache: {library.cache_dir}")
+    print(f"Sources found: {len(sources)}")
+    
+    normalized = library.ingest(force=args.force)
+    
+    print(f"\n✅ {len(normalized)}/{len(sources)} backgrounds normalized")
+    return len(normalized) == len(sources)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
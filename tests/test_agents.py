@@ -2,14 +2,17 @@ import unittest
 from unittest.mock import Mock, patch
 import os
 import sys
+import tempfile
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents.content_agent import ContentAgent
+from agents.content_agent import ContentAgent, parse_content_response
 from agents.voice_agent import VoiceAgent
 from agents.video_agent import VideoAgent
 from agents.instagram_agent import InstagramAgent
+from utils.llm_cache import LLMResponseCache
+from utils.audio_cache import AudioCache
 
 class TestContentAgent(unittest.TestCase):
     def setUp(self):
@@ -35,23 +38,101 @@ class TestContentAgent(unittest.TestCase):
         hashtags = self.content_agent.generate_hashtags("AI learning")
         self.assertIsInstance(hashtags, str)
         self.assertIn("#", hashtags)
+    
+    def test_generate_content_runs_both_requests(self):
+        self.content_agent.generate_script = Mock(return_value="Today I learned about AI")
+        self.content_agent.generate_hashtags = Mock(return_value="#AI #learning")
+        
+        content = self.content_agent.generate_content("AI learning", 30)
+        self.assertEqual(content['script'], "Today I learned about AI")
+        self.assertEqual(content['hashtags'], "#AI #learning")
+        self.content_agent.generate_hashtags.assert_called_once_with("AI learning", False)
+    
+    @patch('agents.content_agent.config')
+    def test_combined_request_makes_one_call(self, mock_config):
+        mock_config.combined_content_request = True
+        mock_config.llm_cache_enabled = False
+        mock_config.max_hashtags = 20
+        self.content_agent.model = Mock()
+        self.content_agent.model.generate_content.return_value = Mock(
+            text='{"script": "Today I learned about AI", "hashtags": ["AI", "#learning"], "caption": "AI in 30s"}'
+        )
+        self.content_agent.generate_hashtags = Mock()
+        
+        content = self.content_agent.generate_content("AI learning")
+        self.assertEqual(content, {'script': "Today I learned about AI", 'hashtags': "#AI #learning", 'caption': "AI in 30s"})
+        self.assertEqual(self.content_agent.model.generate_content.call_count, 1)
+        self.content_agent.generate_hashtags.assert_not_called()
+    
+    @patch('agents.content_agent.config')
+    def test_invalid_combined_response_falls_back(self, mock_config):
+        mock_config.combined_content_request = True
+        mock_config.llm_cache_enabled = False
+        mock_config.max_hashtags = 20
+        self.content_agent.model = Mock()
+        self.content_agent.model.generate_content.return_value = Mock(text='{"script": "missing fields"}')
+        self.content_agent.generate_script = Mock(return_value="Today I learned about AI")
+        self.content_agent.generate_hashtags = Mock(return_value="#AI")
+        
+        content = self.content_agent.generate_content("AI learning")
+        self.assertEqual(content, {'script': "Today I learned about AI", 'hashtags': "#AI", 'caption': None})
+    
+    def test_cached_script_skips_request(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch('agents.content_agent.llm_cache', LLMResponseCache(os.path.join(tmp, "llm.json"))):
+                self.content_agent.model = Mock()
+                self.content_agent.model.generate_content.return_value = Mock(text="Today I learned about AI")
+                
+                first = self.content_agent.generate_script("AI is cool", 30)
+                second = self.content_agent.generate_script("AI is cool", 30)
+                self.assertEqual(first, second)
+                self.assertEqual(self.content_agent.model.generate_content.call_count, 1)
+                
+                self.content_agent.generate_script("AI is cool", 30, refresh=True)
+                self.assertEqual(self.content_agent.model.generate_content.call_count, 2)
+    
+    def test_parse_content_response(self):
+        fenced = '```json\n{"script": " Hi ", "hashtags": "#a b #a", "caption": "c"}\n```'
+        self.assertEqual(parse_content_response(fenced), {'script': "Hi", 'hashtags': "#a #b", 'caption': "c"})
+        self.assertEqual(parse_content_response('{"script": "s", "hashtags": ["a", "b", "c"], "caption": ""}', max_hashtags=2)['hashtags'], "#a #b")
+        self.assertIsNone(parse_content_response("not json"))
+        self.assertIsNone(parse_content_response('["script"]'))
+        self.assertIsNone(parse_content_response('{"script": "", "hashtags": ["a"], "caption": "c"}'))
+        self.assertIsNone(parse_content_response('{"script": "s", "hashtags": [1], "caption": "c"}'))
 
 class TestVoiceAgent(unittest.TestCase):
     def setUp(self):
         self.voice_agent = VoiceAgent()
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_voiceover(self, mock_post):
         # Mock successful API response
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.content = b"fake_audio_data"
+        mock_response.iter_content.return_value = [b"fake_audio_data"]
         mock_post.return_value = mock_response
         
         with patch('builtins.open', mock_open()):
             result = self.voice_agent.generate_voiceover("Test script")
             self.assertIsNotNone(result)
 
+    @patch('requests.Session.post')
+    def test_identical_voiceover_synthesized_once(self, mock_post):
+        mock_post.return_value = Mock(status_code=200, iter_content=Mock(return_value=[b"fake_", b"audio_data"]))
+        self.voice_agent.backend.api_key = "test-key"
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch('agents.voice_agent.tts_cache', AudioCache(os.path.join(tmp, "tts"))):
+                first = self.voice_agent.generate_voiceover("Test script.", os.path.join(tmp, "a.mp3"))
+                second = self.voice_agent.generate_voiceover("Test script.", os.path.join(tmp, "b.mp3"))
+                self.assertEqual(mock_post.call_count, 1)
+                with open(first, 'rb') as a, open(second, 'rb') as b:
+                    self.assertEqual(a.read(), b.read())
+                
+                self.voice_agent.generate_voiceover("Another script.", os.path.join(tmp, "c.mp3"))
+                self.assertEqual(mock_post.call_count, 2)
+
 class TestVideoAgent(unittest.TestCase):
     def setUp(self):
         self.video_agent = VideoAgent()
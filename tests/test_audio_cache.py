@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_cache import AudioCache
+
+class TestAudioCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "tts")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write_audio(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(b"\xff" * size)
+        return path
+    
+    def test_key_depends_on_text_and_voice_settings(self):
+        settings = {"stability": 0.5, "similarity_boost": 0.75}
+        key = AudioCache.cache_key("Hello there.", "voice", "model", settings)
+        self.assertEqual(key, AudioCache.cache_key("Hello there.", "voice", "model", dict(settings)))
+        self.assertNotEqual(key, AudioCache.cache_key("Hello there!", "voice", "model", settings))
+        self.assertNotEqual(key, AudioCache.cache_key("Hello there.", "other", "model", settings))
+        self.assertNotEqual(key, AudioCache.cache_key("Hello there.", "voice", "model", {**settings, "stability": 0.6}))
+    
+    def test_hit_copies_audio_and_persists(self):
+        cache = AudioCache(self.cache_dir, max_mb=1)
+        output = os.path.join(self.tmp.name, "out.mp3")
+        self.assertFalse(cache.get("a", output))
+        cache.put("a", self.write_audio("a.mp3", 100))
+        
+        reloaded = AudioCache(self.cache_dir, max_mb=1)
+        self.assertTrue(reloaded.get("a", output))
+        self.assertEqual(os.path.getsize(output), 100)
+        self.assertEqual(reloaded.stats(), {'hits': 1, 'misses': 0, 'entries': 1, 'bytes': 100})
+        self.assertEqual(cache.stats()['misses'], 1)
+    
+    def test_least_recently_used_evicted_over_budget(self):
+        cache = AudioCache(self.cache_dir, max_mb=1)
+        megabyte_third = 1024 * 1024 // 3 - 1
+        for name in ("a", "b", "c"):
+            cache.put(name, self.write_audio(f"{name}.mp3", megabyte_third))
+        output = os.path.join(self.tmp.name, "out.mp3")
+        cache.get("a", output)
+        cache.put("d", self.write_audio("d.mp3", megabyte_third))
+        
+        self.assertTrue(cache.get("a", output))
+        self.assertFalse(cache.get("b", output))
+        self.assertFalse(os.path.exists(cache.file_path("b")))
+        self.assertLessEqual(cache.stats()['bytes'], 1024 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
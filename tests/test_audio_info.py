@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import struct
+import tempfile
+import wave
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_info import read_audio_duration, parse_mp3_frame_header
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, no padding
+STEREO_HEADER = b'\xff\xfb\x90\x00'
+MONO_HEADER = b'\xff\xfb\x90\xc0'
+FRAME_LENGTH = 417
+SAMPLES_PER_FRAME = 1152
+
+def cbr_frames(count, header=MONO_HEADER):
+    frame = header + b'\x00' * (FRAME_LENGTH - 4)
+    return frame * count
+
+class TestAudioInfo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_frame_header(self):
+        frame_length, samples, sample_rate, channels, is_mpeg1 = parse_mp3_frame_header(MONO_HEADER)
+        self.assertEqual((frame_length, samples, sample_rate, channels, is_mpeg1),
+                         (FRAME_LENGTH, SAMPLES_PER_FRAME, 44100, 1, True))
+        self.assertIsNone(parse_mp3_frame_header(b'\x00\x00\x00\x00'))
+    
+    def test_mp3_frame_scan(self):
+        path = self.write("cbr.mp3", cbr_frames(50))
+        self.assertAlmostEqual(read_audio_duration(path), 50 * SAMPLES_PER_FRAME / 44100)
+    
+    def test_mp3_with_id3_tag(self):
+        id3 = b'ID3\x04\x00\x00' + bytes([0, 0, 0, 20]) + b'\x00' * 20
+        path = self.write("tagged.mp3", id3 + cbr_frames(10))
+        self.assertAlmostEqual(read_audio_duration(path), 10 * SAMPLES_PER_FRAME / 44100)
+    
+    def test_mp3_xing_header(self):
+        # Xing tag follows the 32-byte side info of a stereo MPEG1 frame
+        body = b'\x00' * 32 + b'Xing' + struct.pack('>II', 0x01, 1000)
+        first = STEREO_HEADER + body + b'\x00' * (FRAME_LENGTH - 4 - len(body))
+        path = self.write("vbr.mp3", first + cbr_frames(3, STEREO_HEADER))
+        self.assertAlmostEqual(read_audio_duration(path), 1000 * SAMPLES_PER_FRAME / 44100)
+    
+    def test_wav(self):
+        path = os.path.join(self.tmp.name, "voice.wav")
+        with wave.open(path, 'wb') as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(22050)
+            w.writeframes(b'\x00' * 4 * 22050 * 3)
+        self.assertAlmostEqual(read_audio_duration(path), 3.0)
+    
+    def test_unsupported(self):
+        path = self.write("clip.mp4", b'\x00\x00\x00\x18ftypisom' + b'\x00' * 100)
+        self.assertIsNone(read_audio_duration(path))
+        self.assertIsNone(read_audio_duration(os.path.join(self.tmp.name, "missing.mp3")))
+
+if __name__ == '__main__':
+    unittest.main()
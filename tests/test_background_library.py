@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import time
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from utils.background_library import BackgroundLibrary
+
+class TestBackgroundLibrary(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.assets_dir = os.path.join(self.tmp.name, "assets")
+        os.makedirs(self.assets_dir)
+        self.source = os.path.join(self.assets_dir, "1.mp4")
+        with open(self.source, 'wb') as f:
+            f.write(b"not really a video")
+        self.library = BackgroundLibrary(self.assets_dir, os.path.join(self.tmp.name, "cache"))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_cache_key_includes_geometry(self):
+        key = self.library.cache_key(self.source)
+        self.assertTrue(key.endswith(f"_{config.video_width}x{config.video_height}_{config.video_fps}"))
+    
+    def test_cache_key_changes_with_content(self):
+        key = self.library.cache_key(self.source)
+        with open(self.source, 'wb') as f:
+            f.write(b"different bytes")
+        self.assertNotEqual(key, self.library.cache_key(self.source))
+    
+    def test_source_paths_skips_missing(self):
+        self.assertEqual(self.library.source_paths(), [self.source])
+    
+    def test_is_normalized(self):
+        self.assertFalse(self.library.is_normalized(self.source))
+        normalized = self.library.normalized_path(self.source)
+        os.makedirs(os.path.dirname(normalized))
+        open(normalized, 'wb').close()
+        self.assertTrue(self.library.is_normalized(normalized))
+
+    def fake_transcode(self, calls):
+        """subprocess.run stand-in that writes the output file after a short delay"""
+        def run(cmd, **kwargs):
+            calls.append(cmd[-1])
+            time.sleep(0.05)
+            with open(cmd[-1], 'wb') as f:
+                f.write(b"normalized")
+        return run
+    
+    def test_concurrent_normalize_transcodes_once(self):
+        calls = []
+        results = []
+        with patch('utils.background_library.subprocess.run', side_effect=self.fake_transcode(calls)):
+            threads = [
+                threading.Thread(target=lambda: results.append(
+                    BackgroundLibrary(self.assets_dir, self.library.cache_dir).normalize(self.source)))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        normalized = self.library.normalized_path(self.source)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [normalized] * 4)
+        self.assertEqual(os.listdir(self.library.cache_dir).count(os.path.basename(normalized)), 1)
+        self.assertFalse([name for name in os.listdir(self.library.cache_dir) if 'partial' in name or 'tmp' in name])
+        self.assertIn(self.source, BackgroundLibrary(self.assets_dir, self.library.cache_dir).manifest)
+    
+    def test_manifest_write_failure_keeps_clip(self):
+        with patch('utils.background_library.subprocess.run', side_effect=self.fake_transcode([])), \
+             patch.object(BackgroundLibrary, '_save_manifest', side_effect=OSError("disk full")):
+            self.assertEqual(self.library.normalize(self.source), self.library.normalized_path(self.source))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_journal import BatchJournal, load_batch_items, item_id, learning_content_of, default_journal_path
+from utils.job_workspace import JobWorkspace
+
+class TestBatchJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp.name, "queue.progress.jsonl")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_progress_survives_reopen(self):
+        journal = BatchJournal(self.journal_path)
+        journal.record("a", "content", script="hello", hashtags="#ai")
+        journal.record("a", "voiceover", job_id="job1", voiceover_path="v.mp3")
+        
+        reopened = BatchJournal(self.journal_path)
+        self.assertTrue(reopened.completed("a", "content"))
+        self.assertTrue(reopened.completed("a", "voiceover"))
+        self.assertFalse(reopened.completed("a", "video"))
+        self.assertEqual(reopened.get("a")["script"], "hello")
+        self.assertEqual(reopened.get("a")["job_id"], "job1")
+    
+    def test_torn_last_line_is_ignored(self):
+        BatchJournal(self.journal_path).record("a", "content", script="hello", hashtags="")
+        with open(self.journal_path, 'a') as f:
+            f.write('{"id": "a", "stage": "voice')
+        
+        journal = BatchJournal(self.journal_path)
+        self.assertTrue(journal.completed("a", "content"))
+        self.assertFalse(journal.completed("a", "voiceover"))
+    
+    def test_failure_keeps_completed_stages(self):
+        journal = BatchJournal(self.journal_path)
+        journal.record("a", "content", script="hello", hashtags="")
+        journal.record("a", "failed", failed_stage="voiceover", error="quota")
+        
+        state = BatchJournal(self.journal_path).get("a")
+        self.assertEqual(state["stage"], "failed")
+        self.assertEqual(state["completed_stages"], ["content"])
+        
+        journal.record("a", "voiceover", job_id="job1", voiceover_path="v.mp3")
+        self.assertNotIn("error", journal.get("a"))
+        self.assertEqual(journal.summary(), {"voiceover": 1})
+    
+    def test_item_ids_and_content_keys(self):
+        self.assertEqual(item_id({"id": 7, "content": "x"}), "7")
+        # Only 'id' names an item; other keys are not treated as ids
+        self.assertEqual(item_id({"request_id": "r1", "body": "x"}), item_id({"content": "x"}))
+        self.assertEqual(item_id({"learning_content": "x"}), item_id({"content": "x"}))
+        self.assertNotEqual(item_id({"content": "x"}), item_id({"content": "y"}))
+        self.assertEqual(learning_content_of({"body": "about RAG"}), "about RAG")
+    
+    def test_load_batch_items_skips_bad_lines(self):
+        items_path = os.path.join(self.tmp.name, "queue.jsonl")
+        with open(items_path, 'w') as f:
+            f.write('{"learning_content": "first"}\n\nnot json\n{"id": "b", "content": "second"}\n{"id": "c"}\n')
+        
+        items = load_batch_items(items_path)
+        self.assertEqual([item["id"] for item in items], [item_id({"content": "first"}), "b"])
+        self.assertEqual(default_journal_path(items_path), os.path.join(self.tmp.name, "queue.progress.jsonl"))
+    
+    def test_load_batch_items_skips_duplicate_ids(self):
+        items_path = os.path.join(self.tmp.name, "queue.jsonl")
+        with open(items_path, 'w') as f:
+            f.write('{"id": "a", "content": "first"}\n{"id": "a", "content": "other"}\n'
+                    '{"content": "same"}\n{"body": "same"}\n')
+        
+        items = load_batch_items(items_path)
+        self.assertEqual([learning_content_of(item) for item in items], ["first", "same"])
+    
+    def test_resumed_workspace_keeps_artifacts(self):
+        jobs_dir = os.path.join(self.tmp.name, "jobs")
+        job = JobWorkspace(jobs_dir)
+        with open(job.path("voiceover.mp3"), 'wb') as f:
+            f.write(b"audio")
+        
+        resumed = JobWorkspace(jobs_dir, job_id=job.job_id, resume=True)
+        self.assertTrue(os.path.exists(resumed.path("voiceover.mp3")))
+        self.assertEqual(resumed.metadata["created_at"], job.metadata["created_at"])
+
+if __name__ == '__main__':
+    unittest.main()
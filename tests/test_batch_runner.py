@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from utils.batch_journal import BatchJournal
+from utils.batch_runner import BatchRunner
+
+class TestBatchRunnerStageFailure(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jobs_dir = os.path.join(self.tmp.name, "jobs")
+        patches = [
+            patch.object(config, 'jobs_dir', self.jobs_dir),
+            patch('utils.batch_runner.ContentAgent'),
+            patch('utils.batch_runner.VoiceAgent'),
+            patch('utils.batch_runner.VideoAgent'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.journal = BatchJournal(os.path.join(self.tmp.name, "queue.progress.jsonl"))
+        self.runner = BatchRunner(self.journal)
+        self.item = {'id': 'a', 'learning_content': "RAG"}
+        self.journal.record('a', 'content', script="Hello there.", hashtags="#ai")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def job_metadata(self, job_id):
+        with open(os.path.join(self.jobs_dir, ".work", job_id, "metadata.json")) as f:
+            return json.load(f)
+
+    def test_raising_stage_marks_job_failed_and_retry_reuses_it(self):
+        self.runner.voice_agent.generate_voiceover.side_effect = RuntimeError("tts down")
+        self.assertFalse(self.runner.run_stage(self.item, 'voiceover'))
+
+        state = self.journal.get('a')
+        self.assertEqual(state['stage'], 'failed')
+        self.assertEqual(state['failed_stage'], 'voiceover')
+        metadata = self.job_metadata(state['job_id'])
+        self.assertEqual(metadata['status'], 'failed')
+        self.assertIn("tts down", metadata['error'])
+
+        # The retry resumes the same staging directory instead of leaving it behind
+        self.runner.voice_agent.generate_voiceover.side_effect = lambda script, path: path
+        self.assertTrue(self.runner.run_stage(self.item, 'voiceover'))
+        self.assertEqual(os.listdir(os.path.join(self.jobs_dir, ".work")), [state['job_id']])
+        self.assertEqual(self.journal.get('a')['job_id'], state['job_id'])
+
+    def test_empty_video_result_marks_job_failed(self):
+        self.runner.voice_agent.generate_voiceover.side_effect = lambda script, path: path
+        self.assertTrue(self.runner.run_stage(self.item, 'voiceover'))
+        self.runner.video_agent.create_reel.return_value = None
+        self.assertFalse(self.runner.run_stage(self.item, 'video'))
+
+        state = self.journal.get('a')
+        self.assertEqual(state['failed_stage'], 'video')
+        self.assertEqual(self.job_metadata(state['job_id'])['status'], 'failed')
+
+if __name__ == '__main__':
+    unittest.main()
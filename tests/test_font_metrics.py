@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import ImageFont
+
+from utils.font_metrics import FontMetrics, get_font_metrics, REFERENCE_SIZE
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "assets", "Montserrat-SemiBold.ttf")
+
+class TestFontMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = get_font_metrics(FONT_PATH)
+        self.pillow_font = ImageFont.truetype(FONT_PATH, REFERENCE_SIZE)
+    
+    def test_matches_pillow_at_reference_size(self):
+        for text in ["Hello there friend", "WWW MMM", "illicit", "café déjà vu"]:
+            self.assertAlmostEqual(self.metrics.measure(text, REFERENCE_SIZE),
+                                   self.pillow_font.getlength(text), delta=1.0)
+    
+    def test_scales_with_font_size(self):
+        width = self.metrics.measure("subtitle", 100)
+        self.assertAlmostEqual(self.metrics.measure("subtitle", 50), width / 2)
+    
+    def test_glyphs_outside_table(self):
+        text = "Łódź"
+        self.assertAlmostEqual(self.metrics.measure(text, REFERENCE_SIZE),
+                               self.pillow_font.getlength(text), delta=1.0)
+    
+    def test_empty(self):
+        self.assertEqual(self.metrics.measure("", 50), 0.0)
+    
+    def test_cached_instance(self):
+        self.assertIs(get_font_metrics(FONT_PATH), self.metrics)
+
+    def test_pair_table_skipped_without_kerning(self):
+        getlength = ImageFont.FreeTypeFont.getlength
+        with patch.object(ImageFont.FreeTypeFont, 'getlength', autospec=True, side_effect=getlength) as mock_getlength:
+            metrics = FontMetrics(FONT_PATH)
+        self.assertFalse(metrics.has_kerning)
+        # One call per table glyph plus the probe pairs, not one per ASCII pair
+        self.assertLess(mock_getlength.call_count, 300)
+    
+    def test_pair_table_built_when_layout_kerns(self):
+        getlength = ImageFont.FreeTypeFont.getlength
+        def kerned(font, text, *args, **kwargs):
+            width = getlength(font, text, *args, **kwargs)
+            return width - 50 if text == "AV" else width
+        with patch.object(ImageFont.FreeTypeFont, 'getlength', autospec=True, side_effect=kerned):
+            metrics = FontMetrics(FONT_PATH)
+        self.assertTrue(metrics.has_kerning)
+        self.assertAlmostEqual(metrics.kerning[ord("A"), ord("V")], -50)
+
+if __name__ == '__main__':
+    unittest.main()
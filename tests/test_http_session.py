@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_session import create_session
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stand-in API: replies from a queue of (status, headers) and records client ports"""
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.requests += 1
+            status, headers = server.replies.pop(0) if server.replies else (200, {})
+        time.sleep(server.latency)
+        body = b"audio" if status == 200 else b"error"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+class TestHTTPSession(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.client_ports = set()
+        self.server.requests = 0
+        self.server.replies = []
+        self.server.latency = 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/text-to-speech/voice"
+    
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def test_connections_are_reused(self):
+        self.server.latency = 0.01
+        session = create_session(pool_size=2, max_retries=0)
+        for _ in range(5):
+            self.assertEqual(session.post(self.url, json={"text": "hi"}, timeout=5).content, b"audio")
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(len(self.server.client_ports), 1)
+    
+    def test_rate_limit_honors_retry_after(self):
+        self.server.replies = [(429, {"Retry-After": "1"})]
+        session = create_session(max_retries=3, backoff_factor=0)
+        start = time.perf_counter()
+        response = session.post(self.url, json={"text": "hi"}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.server.requests, 2)
+    
+    def test_server_errors_are_retried_then_reported(self):
+        self.server.replies = [(503, {}), (502, {})]
+        session = create_session(max_retries=3, backoff_factor=0.01)
+        self.assertEqual(session.post(self.url, json={}, timeout=5).status_code, 200)
+        
+        self.server.replies = [(500, {})] * 5
+        response = session.post(self.url, json={}, timeout=5)
+        self.assertEqual(response.status_code, 500)
+        # One attempt plus three retries
+        self.assertEqual(self.server.requests, 3 + 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.job_workspace import JobWorkspace, load_job, new_job_id
+
+class TestJobWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jobs_dir = self.tmp.name
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_job_ids_are_unique(self):
+        self.assertEqual(len({new_job_id() for _ in range(100)}), 100)
+    
+    def test_jobs_do_not_share_paths(self):
+        first, second = JobWorkspace(self.jobs_dir), JobWorkspace(self.jobs_dir)
+        self.assertNotEqual(first.path("reel.mp4"), second.path("reel.mp4"))
+    
+    def test_commit_publishes_directory(self):
+        job = JobWorkspace(self.jobs_dir)
+        with open(job.path("reel.mp4"), 'wb') as f:
+            f.write(b"video")
+        with open(job.temp_path("scratch.png"), 'wb') as f:
+            f.write(b"tmp")
+        # Nothing is visible under the job id until the job is committed
+        self.assertFalse(os.path.exists(os.path.join(self.jobs_dir, job.job_id)))
+        
+        final_dir = job.commit(script="hello")
+        self.assertFalse(os.path.exists(job.work_dir))
+        self.assertEqual(sorted(os.listdir(final_dir)), ["metadata.json", "reel.mp4"])
+        self.assertEqual(job.final_path(job.path("reel.mp4")), os.path.join(final_dir, "reel.mp4"))
+        
+        metadata = load_job(self.jobs_dir, job.job_id)
+        self.assertEqual(metadata['status'], 'completed')
+        self.assertEqual(metadata['script'], "hello")
+        self.assertEqual(metadata['artifacts'], {"reel.mp4": 5})
+    
+    def test_fail_keeps_staging_directory(self):
+        job = JobWorkspace(self.jobs_dir)
+        job.fail("render failed")
+        with open(job.path("metadata.json")) as f:
+            self.assertEqual(json.load(f)['status'], 'failed')
+        self.assertIsNone(load_job(self.jobs_dir, job.job_id))
+        job.discard()
+        self.assertFalse(os.path.exists(job.work_dir))
+    
+    def test_final_path_outside_workspace(self):
+        job = JobWorkspace(self.jobs_dir)
+        self.assertEqual(job.final_path("/elsewhere/file.mp3"), "/elsewhere/file.mp3")
+        self.assertIsNone(job.final_path(None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_cache import LLMResponseCache
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp.name, "llm.json")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_key_depends_on_every_part(self):
+        key = LLMResponseCache.cache_key(1, "gemini-2.5-flash", "script", "RAG", 30)
+        self.assertEqual(key, LLMResponseCache.cache_key(1, "gemini-2.5-flash", "script", "RAG", 30))
+        self.assertNotEqual(key, LLMResponseCache.cache_key(2, "gemini-2.5-flash", "script", "RAG", 30))
+        self.assertNotEqual(key, LLMResponseCache.cache_key(1, "gemini-2.5-flash", "script", "RAG", 25))
+        self.assertNotEqual(key, LLMResponseCache.cache_key(1, "gemini-2.5-flash", "hashtags", "RAG", 30))
+    
+    def test_responses_persist(self):
+        cache = LLMResponseCache(self.cache_file, max_entries=8, ttl_hours=1)
+        cache.put("a", {"script": "hello"})
+        
+        reloaded = LLMResponseCache(self.cache_file, max_entries=8, ttl_hours=1)
+        self.assertEqual(reloaded.get("a"), {"script": "hello"})
+        self.assertIsNone(reloaded.get("b"))
+        self.assertEqual(reloaded.stats(), {'hits': 1, 'misses': 1, 'entries': 1})
+    
+    def test_expired_responses_are_dropped(self):
+        cache = LLMResponseCache(self.cache_file, max_entries=8, ttl_hours=1)
+        with patch('utils.llm_cache.time.time', return_value=1000.0):
+            cache.put("a", "old")
+        with patch('utils.llm_cache.time.time', return_value=1000.0 + 3599):
+            self.assertEqual(cache.get("a"), "old")
+        with patch('utils.llm_cache.time.time', return_value=1000.0 + 3601):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()['entries'], 0)
+    
+    def test_least_recently_used_is_evicted(self):
+        cache = LLMResponseCache(self.cache_file, max_entries=2, ttl_hours=0)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+if __name__ == '__main__':
+    unittest.main()
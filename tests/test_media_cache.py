@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.media_cache import MediaMetadataCache, parse_frame_rate
+
+FAKE_PROBE = {
+    'duration': 12.5,
+    'format': 'mov,mp4,m4a,3gp,3g2,mj2',
+    'streams': [{'index': 0, 'type': 'video', 'codec': 'h264', 'duration': 12.5,
+                 'width': 1080, 'height': 1920, 'pix_fmt': 'yuv420p', 'fps': 24.0}]
+}
+
+class TestMediaMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp.name, "media.json")
+        self.media = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f"{i}.mp4")
+            with open(path, 'wb') as f:
+                f.write(b"x" * (i + 1))
+            self.media.append(path)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_repeated_lookup_probes_once(self):
+        cache = MediaMetadataCache(self.cache_file, max_entries=8)
+        with patch.object(cache, 'probe', return_value=FAKE_PROBE) as mock_probe:
+            self.assertEqual(cache.get_duration(self.media[0]), 12.5)
+            self.assertEqual(cache.get_video_stream(self.media[0])['width'], 1080)
+            self.assertEqual(mock_probe.call_count, 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+    
+    def test_persisted_between_instances(self):
+        cache = MediaMetadataCache(self.cache_file, max_entries=8)
+        with patch.object(cache, 'probe', return_value=FAKE_PROBE):
+            cache.get(self.media[0])
+        reloaded = MediaMetadataCache(self.cache_file, max_entries=8)
+        with patch.object(reloaded, 'probe') as mock_probe:
+            self.assertEqual(reloaded.get_duration(self.media[0]), 12.5)
+            mock_probe.assert_not_called()
+    
+    def test_modified_file_is_reprobed(self):
+        cache = MediaMetadataCache(self.cache_file, max_entries=8)
+        with patch.object(cache, 'probe', return_value=FAKE_PROBE) as mock_probe:
+            cache.get(self.media[0])
+            with open(self.media[0], 'ab') as f:
+                f.write(b"more")
+            cache.get(self.media[0])
+            self.assertEqual(mock_probe.call_count, 2)
+    
+    def test_lru_eviction(self):
+        cache = MediaMetadataCache(self.cache_file, max_entries=2)
+        with patch.object(cache, 'probe', return_value=FAKE_PROBE) as mock_probe:
+            cache.get(self.media[0])
+            cache.get(self.media[1])
+            cache.get(self.media[0])  # Refresh 0 so 1 is the oldest
+            cache.get(self.media[2])
+            self.assertEqual(len(cache.entries), 2)
+            cache.get(self.media[0])
+            self.assertEqual(mock_probe.call_count, 3)
+            cache.get(self.media[1])
+            self.assertEqual(mock_probe.call_count, 4)
+    
+    def test_missing_file(self):
+        cache = MediaMetadataCache(self.cache_file)
+        self.assertIsNone(cache.get_duration(os.path.join(self.tmp.name, "missing.mp3")))
+    
+    def test_parse_frame_rate(self):
+        self.assertEqual(parse_frame_rate("24/1"), 24.0)
+        self.assertAlmostEqual(parse_frame_rate("30000/1001"), 29.97, places=2)
+        self.assertEqual(parse_frame_rate("0/0"), 0.0)
+        self.assertEqual(parse_frame_rate(None), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
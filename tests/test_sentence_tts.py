@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.voice_agent import VoiceAgent
+from utils.audio_cache import AudioCache
+from utils.voice_aligner import load_sentence_timings, decode_pcm
+
+SCRIPT = "Retrieval augmented generation is neat. It looks things up first. Then the model writes an answer."
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+class TestSentenceParallelTTS(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_patch = patch.multiple('agents.voice_agent.config', tts_sentence_parallel=True,
+                                           tts_concurrency=2, tts_cache_enabled=False)
+        self.config_patch.start()
+        self.voice_agent = VoiceAgent()
+        self.voice_agent.backend.api_key = "test-key"
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.texts = []
+    
+    def tearDown(self):
+        self.config_patch.stop()
+        self.tmp.cleanup()
+    
+    def fake_synthesize(self, text, output_path):
+        """A tone 0.25s per word instead of speech"""
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.texts.append(text)
+        subprocess.run([
+            "ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"sine=f=300:d={0.25 * len(text.split())}",
+            "-ar", "44100", "-b:a", "128k", output_path
+        ], check=True)
+        with self.lock:
+            self.active -= 1
+    
+    def test_sentences_are_stitched_with_timings(self):
+        output = os.path.join(self.tmp.name, "voiceover.mp3")
+        with patch.object(self.voice_agent, 'synthesize', side_effect=self.fake_synthesize):
+            self.assertEqual(self.voice_agent.generate_voiceover(SCRIPT, output), output)
+        
+        self.assertEqual(sorted(self.texts), sorted(self.voice_agent.split_sentences(SCRIPT)))
+        self.assertEqual(self.peak, 2)
+        timings = load_sentence_timings(output)
+        self.assertEqual([t['text'] for t in timings], self.voice_agent.split_sentences(SCRIPT))
+        for previous, current in zip(timings, timings[1:]):
+            self.assertEqual(previous['end_time'], current['start_time'])
+        # No encoder delay/padding gap accumulates at the joints: timings add up to the decoded voiceover
+        samples, sample_rate = decode_pcm(output, 44100)
+        self.assertAlmostEqual(timings[-1]['end_time'], len(samples) / sample_rate, delta=0.002)
+        for timing, text in zip(timings, self.voice_agent.split_sentences(SCRIPT)):
+            self.assertAlmostEqual(timing['end_time'] - timing['start_time'], 0.25 * len(text.split()), delta=0.002)
+        # Per-sentence files are cleaned up
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["voiceover.mp3", "voiceover.sentences.json"])
+    
+    def test_failed_sentence_fails_voiceover(self):
+        def failing(text, output_path):
+            if text.startswith("It"):
+                raise OSError("synthesis failed")
+            self.fake_synthesize(text, output_path)
+        output = os.path.join(self.tmp.name, "voiceover.mp3")
+        with patch.object(self.voice_agent, 'synthesize', side_effect=failing), \
+                patch.object(self.voice_agent, 'concat_audio') as mock_concat:
+            self.assertIsNone(self.voice_agent.generate_voiceover(SCRIPT, output))
+        mock_concat.assert_not_called()
+        self.assertEqual(os.listdir(self.tmp.name), [])
+    
+    def test_edited_script_only_synthesizes_changed_sentences(self):
+        edited = SCRIPT.replace("It looks things up first.", "It searches your documents first.")
+        first, second = os.path.join(self.tmp.name, "first.mp3"), os.path.join(self.tmp.name, "second.mp3")
+        with patch('agents.voice_agent.config.tts_cache_enabled', True), \
+                patch('agents.voice_agent.tts_cache', AudioCache(os.path.join(self.tmp.name, "tts"))), \
+                patch.object(self.voice_agent, 'synthesize', side_effect=self.fake_synthesize):
+            self.voice_agent.generate_voiceover(SCRIPT, first)
+            self.texts = []
+            self.assertEqual(self.voice_agent.generate_voiceover(edited, second), second)
+        
+        self.assertEqual(self.texts, ["It searches your documents first."])
+        self.assertEqual([t['text'] for t in load_sentence_timings(second)], self.voice_agent.split_sentences(edited))
+        # Unchanged sentences keep their exact audio and timing
+        first_timings, second_timings = load_sentence_timings(first), load_sentence_timings(second)
+        self.assertEqual(first_timings[0], second_timings[0])
+        self.assertAlmostEqual(first_timings[2]['end_time'] - first_timings[2]['start_time'],
+                               second_timings[2]['end_time'] - second_timings[2]['start_time'])
+    
+    def test_paths_with_quotes(self):
+        directory = os.path.join(self.tmp.name, "it's here")
+        os.makedirs(directory)
+        output = os.path.join(directory, "voiceover.mp3")
+        with patch.object(self.voice_agent, 'synthesize', side_effect=self.fake_synthesize):
+            self.assertEqual(self.voice_agent.generate_voiceover(SCRIPT, output), output)
+        self.assertIsNotNone(load_sentence_timings(output))
+    
+    def test_whole_script_voiceover_drops_stale_timings(self):
+        output = os.path.join(self.tmp.name, "voiceover.mp3")
+        with patch.object(self.voice_agent, 'synthesize', side_effect=self.fake_synthesize):
+            self.voice_agent.generate_voiceover(SCRIPT, output)
+            self.assertIsNotNone(load_sentence_timings(output))
+            with patch('agents.voice_agent.config.tts_sentence_parallel', False):
+                self.assertEqual(self.voice_agent.generate_voiceover(SCRIPT, output), output)
+        self.assertEqual(os.listdir(self.tmp.name), ["voiceover.mp3"])
+    
+    def test_short_fragments_are_merged(self):
+        self.assertEqual(self.voice_agent.split_sentences("Hello world again. Yes! Next sentence here."),
+                         ["Hello world again. Yes!", "Next sentence here."])
+
+if __name__ == '__main__':
+    unittest.main()
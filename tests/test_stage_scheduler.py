@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.stage_scheduler import StagePipeline
+
+class TestStagePipeline(unittest.TestCase):
+    def test_all_items_pass_every_stage(self):
+        seen = {'a': [], 'b': []}
+        done = []
+        pipeline = StagePipeline([
+            ('a', lambda item: seen['a'].append(item) or True, 2),
+            ('b', lambda item: seen['b'].append(item) or True, 3),
+        ])
+        pipeline.run(range(20), on_done=done.append)
+        self.assertEqual(sorted(seen['a']), list(range(20)))
+        self.assertEqual(sorted(seen['b']), list(range(20)))
+        self.assertEqual(sorted(done), list(range(20)))
+        self.assertEqual(pipeline.stats['b']['items'], 20)
+    
+    def test_failed_items_leave_the_pipeline(self):
+        def first(item):
+            if item == 3:
+                raise RuntimeError("boom")
+            return item % 2 == 0
+        done = []
+        pipeline = StagePipeline([('first', first, 1), ('second', lambda item: True, 1)])
+        pipeline.run(range(6), on_done=done.append)
+        self.assertEqual(sorted(done), [0, 2, 4])
+        self.assertEqual(pipeline.stats['first']['failed'], 3)
+    
+    def test_stages_overlap(self):
+        def slow(item):
+            time.sleep(0.05)
+            return True
+        pipeline = StagePipeline([('io', slow, 1), ('cpu', slow, 1)])
+        start = time.perf_counter()
+        pipeline.run(range(6))
+        # Serial would take 12 x 0.05s; pipelined is about (6 + 1) x 0.05s
+        self.assertLess(time.perf_counter() - start, 0.5)
+    
+    def test_backpressure_bounds_items_in_flight(self):
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0}
+        def enter(item):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            return True
+        def slow_exit(item):
+            time.sleep(0.01)
+            with lock:
+                state['in_flight'] -= 1
+            return True
+        StagePipeline([('fast', enter, 1), ('slow', slow_exit, 1)], queue_size=2).run(range(30))
+        # One item in each worker plus a full queue (and one blocked put)
+        self.assertLessEqual(state['peak'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.subtitle_compiler import SubtitleCompiler, format_ass_time, escape_sendcmd_arg, slice_cues
+
+def ffmpeg_has_filter(name):
+    """Whether the installed ffmpeg build provides a filter"""
+    if not shutil.which("ffmpeg"):
+        return False
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True)
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+def ink_width(pixels):
+    """Horizontal extent of the white text fill in a grayscale frame"""
+    columns = np.where((pixels > 128).any(axis=0))[0]
+    return columns[-1] - columns[0] + 1 if len(columns) else 0
+
+CUES = [
+    {'start_time': 0.0, 'end_time': 1.5, 'lines': ['Hello there friend']},
+    {'start_time': 1.7, 'end_time': 3.25, 'lines': ['a wrapped chunk', 'on two lines']},
+]
+
+class TestSubtitleCompiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp.name, "reel")
+        self.fonts_dir = os.path.join(self.tmp.name, "fonts")
+        self.compiler = SubtitleCompiler("assets/Montserrat-SemiBold.ttf", 1080, 1920, self.fonts_dir)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_format_ass_time(self):
+        self.assertEqual(format_ass_time(0), "0:00:00.00")
+        self.assertEqual(format_ass_time(3.256), "0:00:03.26")
+        self.assertEqual(format_ass_time(3725.5), "1:02:05.50")
+    
+    def test_ass_filter_and_document(self):
+        filter_str = self.compiler.compile(CUES, 'ass', self.base)
+        self.assertTrue(filter_str.startswith(f"ass=filename='{self.base}.ass'"))
+        self.assertIn(f"fontsdir='{self.fonts_dir}'", filter_str)
+        self.assertEqual(os.listdir(self.fonts_dir), ["Montserrat-SemiBold.ttf"])
+        # Nothing besides the subtitle file is written next to the reel
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["fonts", "reel.ass"])
+        with open(f"{self.base}.ass", encoding='utf-8') as f:
+            document = f.read()
+        self.assertIn("PlayResY: 1920", document)
+        self.assertIn("Dialogue: 0,0:00:00.00,0:00:01.50,Default,,0,0,0,,Hello there friend", document)
+        self.assertIn("a wrapped chunk\\Non two lines", document)
+    
+    def test_sendcmd_filter_is_single_drawtext(self):
+        filter_str = self.compiler.compile(CUES, 'sendcmd', self.base)
+        self.assertEqual(filter_str.count("drawtext"), 1)
+        self.assertIn(f"sendcmd=f='{self.base}.cmd'", filter_str)
+        with open(f"{self.base}.cmd", encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines[0].startswith("0.000-1.500 [enter] drawtext@subs reinit text=Hello\\ there\\ friend,"))
+        self.assertIn("[leave] drawtext@subs enable 0;", lines[0])
+    
+    def test_sendcmd_escaping(self):
+        self.assertEqual(escape_sendcmd_arg("a b,c;d"), r"a\ b\,c\;d")
+    
+    def test_overlay_sprites(self):
+        fragment = self.compiler.compile(CUES, 'overlay', self.base)
+        self.assertTrue(fragment.startswith("[subs_in];"))
+        self.assertEqual(fragment.count("overlay="), 2)
+        self.assertIn("enable='between(t,1.7,3.25)'", fragment)
+        for idx in range(2):
+            self.assertTrue(os.path.exists(f"{self.base}_sub{idx:03d}.png"))
+        # Last overlay is left unlabeled so the caller can continue the chain
+        self.assertFalse(fragment.endswith("]"))
+    
+    def test_empty_cues(self):
+        self.assertEqual(self.compiler.compile([{'start_time': 0, 'end_time': 1, 'lines': [' ']}], 'ass', self.base), "")
+    
+    def test_slice_cues(self):
+        sliced = slice_cues(CUES, 1.0, 2.0)
+        self.assertEqual([(cue['start_time'], cue['end_time']) for cue in sliced], [(0.0, 0.5), (0.7, 1.0)])
+        self.assertEqual(sliced[1]['lines'], CUES[1]['lines'])
+        self.assertEqual(slice_cues(CUES, 3.25, 5.0), [])
+    
+    def test_unknown_renderer(self):
+        with self.assertRaises(ValueError):
+            self.compiler.compile(CUES, 'srt', self.base)
+
+@unittest.skipUnless(ffmpeg_has_filter("ass"), "ffmpeg without libass")
+class TestAssTextSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp.name, "subs")
+        self.width, self.height = 1080, 1920
+        self.compiler = SubtitleCompiler("assets/Montserrat-SemiBold.ttf", self.width, self.height,
+                                         os.path.join(self.tmp.name, "fonts"))
+        self.text = "code Use them for logging"
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def render_frame(self, filter_str):
+        """First frame of a black clip with the filter applied, as grayscale pixels"""
+        result = subprocess.run([
+            "ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"color=c=black:s={self.width}x{self.height}:d=1",
+            "-vf", f"{filter_str},format=gray", "-frames:v", "1", "-f", "rawvideo", "pipe:1"
+        ], capture_output=True, check=True)
+        return np.frombuffer(result.stdout, dtype=np.uint8).reshape(self.height, self.width)
+    
+    def reference_width(self):
+        """Width drawtext gives the line (Pillow, which sizes fonts the same way, without drawtext)"""
+        if ffmpeg_has_filter("drawtext"):
+            drawtext = (f"drawtext=fontfile='{self.compiler.font_path}':text='{self.text}':"
+                        f"fontsize={self.compiler.font_size}:fontcolor=white:x=0:y=0")
+            return ink_width(self.render_frame(drawtext))
+        image = Image.new('L', (self.width, self.height), 0)
+        ImageDraw.Draw(image).text((0, 0), self.text, font=self.compiler.load_font(), fill=255)
+        return ink_width(np.asarray(image))
+    
+    def test_ass_text_matches_drawtext_width(self):
+        cues = [{'start_time': 0.0, 'end_time': 1.0, 'lines': [self.text]}]
+        ass_width = ink_width(self.render_frame(self.compiler.compile(cues, 'ass', self.base)))
+        reference = self.reference_width()
+        self.assertGreater(reference, 0)
+        self.assertAlmostEqual(ass_width / reference, 1.0, delta=0.03)
+
+if __name__ == '__main__':
+    unittest.main()
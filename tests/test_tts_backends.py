@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from agents.voice_agent import VoiceAgent
+from utils.audio_cache import AudioCache
+from utils.audio_info import read_audio_duration
+from utils.voice_aligner import analyze_voiceover
+from utils.tts_backends import get_tts_backend, ElevenLabsBackend, EspeakBackend, SyntheticBackend
+
+SCRIPT = "Retrieval augmented generation is neat. It looks things up first, then answers."
+
+class TestTTSBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "voiceover.mp3")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_backend_selection(self):
+        self.assertIsInstance(get_tts_backend('synthetic'), SyntheticBackend)
+        self.assertIsInstance(get_tts_backend('espeak'), EspeakBackend)
+        self.assertIsInstance(get_tts_backend('elevenlabs'), ElevenLabsBackend)
+        with patch('utils.tts_backends.config.tts_backend', 'synthetic'):
+            self.assertIsInstance(VoiceAgent().backend, SyntheticBackend)
+    
+    def test_cache_identity_differs_per_backend(self):
+        identities = {repr(get_tts_backend(name).cache_identity()) for name in ('elevenlabs', 'espeak', 'synthetic')}
+        self.assertEqual(len(identities), 3)
+    
+    def test_offline_backends_need_no_api_key(self):
+        settings = Config(gemini_api_key="key", elevenlabs_api_key="", tts_backend='synthetic')
+        self.assertEqual(settings.validate(), [])
+        settings.tts_backend = 'elevenlabs'
+        self.assertIn("ELEVENLABS_API_KEY is required", settings.validate())
+    
+    def test_synthetic_audio_has_speech_and_pauses(self):
+        samples = SyntheticBackend().render(SCRIPT)
+        duration = len(samples) / SyntheticBackend.sample_rate
+        # Roughly a normal speaking rate
+        self.assertTrue(2.0 < len(SCRIPT.split()) / duration < 4.0)
+    
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+    def test_synthetic_voiceover_runs_offline(self):
+        with patch('agents.voice_agent.tts_cache', AudioCache(os.path.join(self.tmp.name, "tts"))):
+            voice_agent = VoiceAgent(SyntheticBackend())
+            self.assertEqual(voice_agent.generate_voiceover(SCRIPT, self.output), self.output)
+        
+        self.assertGreater(read_audio_duration(self.output), 3.0)
+        analysis = analyze_voiceover(self.output)
+        # Sentence and comma pauses are detected like in real speech
+        self.assertGreaterEqual(len(analysis['pauses']), 2)
+    
+    def test_espeak_passes_text_on_stdin(self):
+        backend = EspeakBackend()
+        backend.binary = "/usr/bin/espeak-ng"
+        with patch('utils.tts_backends.subprocess.run') as mock_run, \
+             patch('utils.tts_backends.encode_mp3'):
+            backend.synthesize("- Today I learned about embeddings", self.output)
+        args, kwargs = mock_run.call_args
+        self.assertEqual(args[0][-1], "--stdin")
+        self.assertNotIn("- Today I learned about embeddings", args[0])
+        self.assertEqual(kwargs['input'], "- Today I learned about embeddings".encode('utf-8'))
+    
+    @unittest.skipUnless(EspeakBackend().available() and shutil.which("ffmpeg"), "espeak-ng not installed")
+    def test_espeak_voiceover(self):
+        EspeakBackend().synthesize(SCRIPT, self.output)
+        self.assertGreater(read_audio_duration(self.output), 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
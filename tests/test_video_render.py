@@ -0,0 +1,343 @@
+import unittest
+from unittest.mock import patch
+import os
+import re
+import math
+import sys
+import shutil
+import tempfile
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from agents.video_agent import VideoAgent, concat_list_entry
+
+MATCHING_STREAM = {'codec': 'h264', 'width': config.video_width, 'height': config.video_height,
+                   'pix_fmt': 'yuv420p', 'fps': float(config.video_fps)}
+
+class TestStreamCopyDecision(unittest.TestCase):
+    def setUp(self):
+        self.agent = VideoAgent()
+        self.media_cache = patch('agents.video_agent.media_cache').start()
+        self.media_cache.get_video_stream.return_value = dict(MATCHING_STREAM)
+        self.media_cache.get_duration.return_value = 20.0
+    
+    def tearDown(self):
+        patch.stopall()
+    
+    def test_matching_background_is_copied_and_trimmed(self):
+        self.assertFalse(self.agent.needs_video_transform("bg.mp4"))
+        cmd = self.agent.build_combine_command("bg.mp4", "voice.mp3", 12.5)
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertEqual(cmd[cmd.index("-t") + 1], "12.5")
+        self.assertNotIn("-stream_loop", cmd)
+        self.assertNotIn("-vf", cmd)
+    
+    def test_mismatched_background_is_reencoded(self):
+        for field, value in (('width', 1920), ('height', 1080), ('codec', 'hevc'),
+                             ('pix_fmt', 'yuv444p'), ('fps', 30.0)):
+            with self.subTest(field=field):
+                self.media_cache.get_video_stream.return_value = dict(MATCHING_STREAM, **{field: value})
+                self.assertTrue(self.agent.needs_video_transform("bg.mp4"))
+                cmd = self.agent.build_combine_command("bg.mp4", "voice.mp3", 12.5)
+                self.assertTrue(cmd[cmd.index("-vf") + 1].startswith(f"scale={config.video_width}:{config.video_height}"))
+                self.assertEqual(cmd[cmd.index("-c:v") + 1], "libx264")
+                self.assertIn("-shortest", cmd)
+                self.assertNotIn("-t", cmd)
+    
+    def test_background_shorter_than_audio_is_looped(self):
+        self.media_cache.get_duration.return_value = 5.0
+        cmd = self.agent.build_combine_command("bg.mp4", "voice.mp3", 12.5)
+        self.assertEqual(cmd[cmd.index("-stream_loop") + 1], "-1")
+        # The loop option applies to the background input, so it must precede it
+        self.assertLess(cmd.index("-stream_loop"), cmd.index("bg.mp4"))
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertEqual(cmd[cmd.index("-t") + 1], "12.5")
+    
+    def test_unprobed_background_trusts_library(self):
+        self.media_cache.get_video_stream.return_value = None
+        with patch.object(self.agent.background_library, 'is_normalized', return_value=True):
+            self.assertFalse(self.agent.needs_video_transform("bg.mp4"))
+        with patch.object(self.agent.background_library, 'is_normalized', return_value=False):
+            self.assertTrue(self.agent.needs_video_transform("bg.mp4"))
+
+class TestSinglePassCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmp.name, "reel.mp4")
+        self.agent = VideoAgent()
+        self.stream = dict(MATCHING_STREAM, width=1280, height=720)
+        self.video_duration = 20.0
+        patch.object(self.agent, 'probe_video_stream', side_effect=lambda path: self.stream).start()
+        patch.object(self.agent, 'get_video_duration', side_effect=lambda path: self.video_duration).start()
+        # No voiceover to align against: subtitles fall back to evenly paced chunks
+        patch('agents.video_agent.analyze_voiceover', return_value=None).start()
+        self.run = patch('agents.video_agent.subprocess.run').start()
+    
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+    
+    def render(self, profile='standard', duration=6.0):
+        self.agent.render_single_pass("bg.mp4", "voice.mp3", "One two three four five six seven eight",
+                                      self.output_path, duration, profile)
+        self.assertEqual(self.run.call_count, 1)
+        return self.run.call_args[0][0]
+    
+    def graph(self, cmd):
+        return cmd[cmd.index("-filter_complex") + 1]
+    
+    def test_graph_scales_and_draws_subtitles(self):
+        with patch.multiple('agents.video_agent.config', subtitle_enabled=True, subtitle_renderer='drawtext'):
+            cmd = self.render()
+        graph = self.graph(cmd)
+        self.assertTrue(graph.startswith(f"[0:v]scale={config.video_width}:{config.video_height}"))
+        self.assertTrue(graph.endswith("[v]"))
+        self.assertIn("drawtext=", graph)
+        # Scale/pad runs before the subtitles are drawn
+        self.assertLess(graph.index("pad="), graph.index("drawtext="))
+        self.assertEqual(cmd[cmd.index("-map") + 1], "[v]")
+        self.assertEqual(cmd[-2:], ["-shortest", self.output_path])
+        self.assertNotIn("-stream_loop", cmd)
+    
+    def test_ass_renderer_and_profile_scale(self):
+        with patch.multiple('agents.video_agent.config', subtitle_enabled=True, subtitle_renderer='ass'):
+            graph = self.graph(self.render(profile='draft'))
+        self.assertEqual(graph.count("ass=filename="), 1)
+        self.assertNotIn("drawtext=", graph)
+        self.assertTrue(graph.endswith(",scale=360:640[v]"))
+    
+    def test_matching_background_skips_scale(self):
+        self.stream = dict(MATCHING_STREAM)
+        with patch.multiple('agents.video_agent.config', subtitle_enabled=True, subtitle_renderer='drawtext'):
+            graph = self.graph(self.render())
+        self.assertTrue(graph.startswith("[0:v]drawtext="))
+    
+    def test_short_background_is_looped(self):
+        self.video_duration = 2.0
+        with patch.multiple('agents.video_agent.config', subtitle_enabled=True, subtitle_renderer='drawtext'):
+            cmd = self.render()
+        self.assertLess(cmd.index("-stream_loop"), cmd.index("bg.mp4"))
+        self.assertIn("-shortest", cmd)
+
+class TestSegmentPlanning(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.agent = VideoAgent()
+        self.video_duration = 5.0
+        self.keyframes = [0.0, 2.5]
+        patch.object(self.agent, 'get_video_duration', side_effect=lambda path: self.video_duration).start()
+        patch.object(self.agent, 'get_background_keyframes', side_effect=lambda path: self.keyframes).start()
+        patch.multiple('agents.video_agent.config', parallel_min_segment_duration=4.0).start()
+    
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+    
+    def assert_covers(self, segments, duration):
+        fps = config.video_fps
+        self.assertEqual(segments[0][0], 0)
+        self.assertEqual(segments[-1][1], int(math.ceil(duration * fps)))
+        for (_, end, _), (start, _, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+        for start, end, _ in segments:
+            self.assertLess(start, end)
+    
+    def test_boundaries_land_on_keyframes(self):
+        # Even split points (5.25s, 10.5s, 15.75s) snap to the nearest keyframes
+        segments = self.agent.plan_segments("bg.mp4", 21.0, 4)
+        self.assertEqual([start / config.video_fps for start, _, _ in segments], [0.0, 5.0, 10.0, 15.0])
+        self.assert_covers(segments, 21.0)
+        for start, _, source_offset in segments:
+            # Every segment starts on a background keyframe of the looped timeline
+            self.assertIn(source_offset, self.keyframes)
+            self.assertAlmostEqual(source_offset, (start / config.video_fps) % self.video_duration)
+    
+    def test_looped_source_offsets_wrap(self):
+        segments = self.agent.plan_segments("bg.mp4", 23.0, 3)
+        self.assert_covers(segments, 23.0)
+        starts = [start / config.video_fps for start, _, _ in segments]
+        offsets = [source_offset for _, _, source_offset in segments]
+        # Later segments start past the end of the background, so their offsets wrap around
+        self.assertTrue(any(start >= self.video_duration for start in starts))
+        self.assertTrue(all(0 <= offset < self.video_duration for offset in offsets))
+        self.assertEqual(offsets, [start % self.video_duration for start in starts])
+    
+    def test_short_reel_or_missing_keyframes_is_not_split(self):
+        self.assertEqual(self.agent.plan_segments("bg.mp4", 6.0, 4), [])
+        self.keyframes = None
+        self.assertEqual(self.agent.plan_segments("bg.mp4", 20.0, 4), [])
+    
+    def test_segment_input_starts_at_offset_and_loops(self):
+        list_path = os.path.join(self.tmp.name, "input.txt")
+        self.agent.write_segment_input("bg.mp4", list_path, 2.5, 8.0)
+        with open(list_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[1], "inpoint 2.500000")
+        entries = [line for line in lines if line.startswith("file ")]
+        # 2.5s left in the first play, then enough full loops for the rest of the 8s segment
+        self.assertGreaterEqual((len(entries) - 1) * self.video_duration + 2.5, 8.0)
+    
+    def test_concat_entries_escape_quotes(self):
+        list_path = os.path.join(self.tmp.name, "input.txt")
+        self.agent.write_segment_input("it's.mp4", list_path, 0.0, 4.0)
+        with open(list_path, encoding='utf-8') as f:
+            first = f.readline().rstrip('\n')
+        self.assertEqual(first, concat_list_entry("it's.mp4"))
+        self.assertTrue(first.endswith("it'\\''s.mp4'"))
+    
+    def test_segment_frame_counts_cover_reel(self):
+        run = patch('agents.video_agent.subprocess.run',
+                    return_value=subprocess.CompletedProcess([], 0, "", "")).start()
+        with patch.multiple('agents.video_agent.config', subtitle_enabled=False, parallel_workers=3):
+            self.agent.render_parallel("bg.mp4", "voice.mp3", "Some words", os.path.join(self.tmp.name, "reel.mp4"), 20.0)
+        commands = [call[0][0] for call in run.call_args_list]
+        segment_commands = [cmd for cmd in commands if "-frames:v" in cmd]
+        self.assertEqual(len(segment_commands), 3)
+        frames = [int(cmd[cmd.index("-frames:v") + 1]) for cmd in segment_commands]
+        self.assertEqual(sum(frames), int(math.ceil(20.0 * config.video_fps)))
+        # The final concat copies the segments and maps the voiceover
+        self.assertEqual(commands[-1][commands[-1].index("-c:v") + 1], "copy")
+
+class TestPipedTwoPass(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmp.name, "reel_with_subtitles.mp4")
+        self.agent = VideoAgent()
+        patch.object(self.agent, 'probe_video_stream', return_value=dict(MATCHING_STREAM)).start()
+        patch.object(self.agent, 'get_video_duration', return_value=20.0).start()
+        patch('agents.video_agent.analyze_voiceover', return_value=None).start()
+        patch.multiple('agents.video_agent.config', subtitle_enabled=True, subtitle_renderer='drawtext').start()
+        self.popen = patch('agents.video_agent.subprocess.Popen').start()
+        self.producer = self.popen.return_value
+        self.producer.returncode = 0
+        self.run = patch('agents.video_agent.subprocess.run',
+                         return_value=subprocess.CompletedProcess([], 0)).start()
+    
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+    
+    def render(self, intermediate_path=None):
+        self.agent.render_two_pass_piped("bg.mp4", "voice.mp3", "One two three four five six",
+                                         self.output_path, 6.0, 'standard', intermediate_path)
+        return self.popen.call_args[0][0], self.run.call_args[0][0]
+    
+    def test_plain_pipe_commands(self):
+        combine_cmd, subtitle_cmd = self.render()
+        self.assertEqual(combine_cmd[-3:], ["-f", "nut", "pipe:1"])
+        self.assertEqual(self.popen.call_args[1]['stdout'], subprocess.PIPE)
+        self.assertEqual(subtitle_cmd[:6], ["ffmpeg", "-y", "-f", "nut", "-i", "pipe:0"])
+        self.assertIs(self.run.call_args[1]['stdin'], self.producer.stdout)
+        self.assertIn("drawtext=", subtitle_cmd[subtitle_cmd.index("-vf") + 1])
+        self.assertEqual(subtitle_cmd[subtitle_cmd.index("-c:a") + 1], "copy")
+        self.assertEqual(subtitle_cmd[-1], self.output_path)
+        self.producer.stdout.close.assert_called_once()
+        self.producer.wait.assert_called_once()
+    
+    def test_keep_intermediate_tees_to_file(self):
+        intermediate = os.path.join(self.tmp.name, "reel.mp4")
+        combine_cmd, _ = self.render(intermediate)
+        self.assertEqual(combine_cmd[-3:], ["-f", "tee", f"[f=nut]pipe:1|[f=mp4]{intermediate}"])
+        # The tee muxer needs explicit stream maps
+        self.assertIn("-map", combine_cmd)
+    
+    def test_failed_producer_raises(self):
+        self.producer.returncode = 1
+        # The consumer sees a truncated stream; the producer's failure is what gets reported
+        self.run.return_value = subprocess.CompletedProcess([], 0)
+        with self.assertRaises(subprocess.CalledProcessError) as context:
+            self.render()
+        self.assertEqual(context.exception.cmd[-1], "pipe:1")
+        self.producer.stdout.close.assert_called_once()
+        self.producer.wait.assert_called_once()
+    
+    def test_failed_pipe_falls_back_to_file_two_pass(self):
+        self.producer.returncode = 1
+        self.run.return_value = subprocess.CompletedProcess([], 1)
+        voiceover = os.path.join(self.tmp.name, "voice.mp3")
+        open(voiceover, 'wb').close()
+        output_path = os.path.join(self.tmp.name, "reel.mp4")
+        patch.object(self.agent, 'get_audio_duration', return_value=6.0).start()
+        combine = patch.object(self.agent, 'combine_video_audio').start()
+        add_subtitles = patch.object(self.agent, 'add_subtitles').start()
+        with patch.multiple('agents.video_agent.config', render_mode='two_pass', pipe_two_pass=True,
+                            keep_intermediate=False):
+            result = self.agent.create_reel("One two three four five six", voiceover, output_path,
+                                            background_path="bg.mp4")
+        self.assertEqual(result, self.output_path)
+        self.assertEqual(self.popen.call_count, 1)
+        combine.assert_called_once_with("bg.mp4", voiceover, output_path, 6.0, None)
+        self.assertEqual(add_subtitles.call_args[0][2], self.output_path)
+
+class TestCombineCommand(unittest.TestCase):
+    def setUp(self):
+        self.agent = VideoAgent()
+        self.stream = dict(MATCHING_STREAM)
+        self.video_duration = 20.0
+        patch.object(self.agent, 'probe_video_stream', side_effect=lambda path: self.stream).start()
+        patch.object(self.agent, 'get_video_duration', side_effect=lambda path: self.video_duration).start()
+    
+    def tearDown(self):
+        patch.stopall()
+    
+    def combine(self, duration=10.0, profile='standard', final=False):
+        return self.agent.build_combine_command("bg.mp4", "voice.mp3", duration, profile, final)
+    
+    def test_final_standard_copies_matching_background(self):
+        cmd = self.combine(final=True)
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertNotIn("-vf", cmd)
+    
+    def test_final_draft_scales_down(self):
+        cmd = self.combine(profile='draft', final=True)
+        self.assertEqual(cmd[cmd.index("-vf") + 1], "scale=360:640")
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "libx264")
+        self.assertEqual(cmd[cmd.index("-preset") + 1], "ultrafast")
+    
+    def test_final_publish_keeps_rate_control(self):
+        cmd = self.combine(profile='publish', final=True)
+        self.assertNotIn("-vf", cmd)
+        self.assertEqual(cmd[cmd.index("-maxrate") + 1], "25M")
+        self.assertIn("+faststart", cmd)
+    
+    def test_intermediate_copies_for_any_profile(self):
+        # The subtitle stage re-encodes with the profile afterwards
+        cmd = self.combine(profile='draft')
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+class TestMuxOnlyRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.background = os.path.join(self.tmp.name, "bg.mp4")
+        self.voiceover = os.path.join(self.tmp.name, "voice.mp3")
+        subprocess.run([
+            "ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+            "-i", f"color=c=blue:s={config.video_width}x{config.video_height}:r={config.video_fps}:d=1",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", self.background
+        ], check=True)
+        subprocess.run([
+            "ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", "sine=f=300:d=1", self.voiceover
+        ], check=True)
+        self.agent = VideoAgent()
+        patch.object(self.agent, 'probe_video_stream', return_value=dict(MATCHING_STREAM)).start()
+        patch.object(self.agent, 'get_video_duration', return_value=1.0).start()
+        patch.multiple('agents.video_agent.config', subtitle_enabled=False, text_overlay_enabled=False).start()
+    
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+    
+    def test_draft_profile_output_dimensions(self):
+        output_path = os.path.join(self.tmp.name, "reel.mp4")
+        result = self.agent.create_reel("A short script.", self.voiceover, output_path,
+                                        profile='draft', background_path=self.background)
+        self.assertEqual(result, output_path)
+        probe = subprocess.run(["ffmpeg", "-hide_banner", "-i", output_path], capture_output=True, text=True)
+        self.assertRegex(probe.stderr, re.compile(r"Video: h264.*\b360x640\b"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+import wave
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.voice_aligner import (decode_pcm, detect_speech_segments, align_chunks, analyze_voiceover,
+                                 align_chunks_to_sentences, write_sentence_timings, load_sentence_timings)
+
+SAMPLE_RATE = 16000
+# Speech bursts (seconds) separated by pauses
+BURSTS = [(0.0, 1.6), (2.0, 3.2), (3.6, 5.5)]
+
+
+def write_voiceover(path):
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 0.002, int(6.0 * SAMPLE_RATE))
+    for start, end in BURSTS:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        samples[a:b] = rng.normal(0, 0.2, b - a)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+
+class TestVoiceAligner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "voiceover.wav")
+        write_voiceover(self.path)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_detects_speech_segments(self):
+        samples, sample_rate = decode_pcm(self.path)
+        segments = detect_speech_segments(samples, sample_rate)
+        self.assertEqual(len(segments), len(BURSTS))
+        for (start, end), (expected_start, expected_end) in zip(segments, BURSTS):
+            self.assertAlmostEqual(start, expected_start, delta=0.05)
+            self.assertAlmostEqual(end, expected_end, delta=0.05)
+    
+    def test_silence_is_one_segment(self):
+        segments = detect_speech_segments(np.zeros(SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE)
+        self.assertEqual(segments, [(0.0, 1.0)])
+    
+    def test_chunk_boundaries_snap_to_pauses(self):
+        analysis = analyze_voiceover(self.path)
+        self.assertEqual(len(analysis['pauses']), 2)
+        chunks = [["one", "two", "three", "four"], ["five", "six", "seven"], ["eight", "nine", "ten", "eleven"]]
+        timings = align_chunks(chunks, analysis['speech_segments'])
+        self.assertEqual(len(timings), 3)
+        for timing, (pause_start, pause_end) in zip(timings, analysis['pauses']):
+            self.assertEqual(timing['end_time'], pause_start)
+        for timing, (pause_start, pause_end) in zip(timings[1:], analysis['pauses']):
+            self.assertEqual(timing['start_time'], pause_end)
+        self.assertAlmostEqual(timings[-1]['end_time'], BURSTS[-1][1], delta=0.05)
+    
+    def test_chunks_follow_sentence_timings(self):
+        sentences = [
+            {'text': "one two three.", 'start_time': 0.0, 'end_time': 1.5},
+            {'text': "four five six.", 'start_time': 2.0, 'end_time': 3.0}
+        ]
+        chunks = [["one", "two"], ["three."], ["four", "five"], ["six."]]
+        timings = align_chunks_to_sentences(chunks, sentences)
+        self.assertEqual(timings[0]['start_time'], 0.0)
+        self.assertEqual(timings[1]['end_time'], 1.5)
+        self.assertEqual(timings[2]['start_time'], 2.0)
+        self.assertEqual(timings[3]['end_time'], 3.0)
+        for timing in timings:
+            self.assertLess(timing['start_time'], timing['end_time'])
+    
+    def test_sentence_timings_sidecar(self):
+        timings = write_sentence_timings(self.path, ["First one.", "Second one."], [1.25, 2.0])
+        self.assertEqual(timings[1]['start_time'], 1.25)
+        self.assertEqual(load_sentence_timings(self.path), timings)
+        
+        # A different voiceover at the same path invalidates the sidecar
+        with open(self.path, 'ab') as f:
+            f.write(b"\x00\x00")
+        self.assertIsNone(load_sentence_timings(self.path))
+    
+    def test_sentence_timings_reject_same_size_audio(self):
+        write_sentence_timings(self.path, ["First one.", "Second one."], [1.25, 2.0])
+        with open(self.path, 'r+b') as f:
+            data = bytearray(f.read())
+            data[-1] ^= 0xFF
+            f.seek(0)
+            f.write(data)
+        self.assertIsNone(load_sentence_timings(self.path))
+    
+    def test_missing_file(self):
+        self.assertIsNone(analyze_voiceover(os.path.join(self.tmp.name, "missing.mp3")))
+
+if __name__ == '__main__':
+    unittest.main()
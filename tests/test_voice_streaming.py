@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.voice_agent import VoiceAgent
+from utils.audio_cache import AudioCache
+
+CHUNKS = [b"ID3" + b"\x00" * 997, b"\xff\xfb" * 500, b"\xff\xfb" * 250]
+
+class StreamingTTSHandler(BaseHTTPRequestHandler):
+    """Stand-in for the streaming TTS endpoint: chunked audio, paused after the first chunk"""
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.paths.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, chunk in enumerate(CHUNKS):
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            if index == 0:
+                self.server.release.wait(5)
+            if self.server.truncate:
+                # Connection dropped mid-stream
+                self.close_connection = True
+                return
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def log_message(self, *args):
+        pass
+
+class TestStreamingVoiceover(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingTTSHandler)
+        self.server.paths = []
+        self.server.release = threading.Event()
+        self.server.truncate = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        
+        self.cache_patch = patch('agents.voice_agent.tts_cache', AudioCache(os.path.join(self.tmp.name, "tts")))
+        self.cache_patch.start()
+        self.voice_agent = VoiceAgent()
+        self.voice_agent.backend.api_key = "test-key"
+        self.voice_agent.backend.voice_id = "voice"
+        self.voice_agent.backend.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.output = os.path.join(self.tmp.name, "voiceover.mp3")
+    
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+    
+    def test_audio_is_written_while_streaming(self):
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.update(path=self.voice_agent.generate_voiceover("Hello there.", self.output))
+        )
+        worker.start()
+        
+        # The first chunk reaches the disk before the server sends the rest
+        partial = f"{self.output}.partial"
+        deadline = time.time() + 5
+        while time.time() < deadline and not (os.path.exists(partial) and os.path.getsize(partial) >= len(CHUNKS[0])):
+            time.sleep(0.01)
+        self.assertEqual(os.path.getsize(partial), len(CHUNKS[0]))
+        self.assertFalse(os.path.exists(self.output))
+        
+        self.server.release.set()
+        worker.join(5)
+        self.assertEqual(result['path'], self.output)
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read(), b"".join(CHUNKS))
+        self.assertFalse(os.path.exists(partial))
+        self.assertEqual(self.server.paths, ["/v1/text-to-speech/voice/stream"])
+    
+    def test_interrupted_stream_leaves_no_file(self):
+        self.server.truncate = True
+        self.server.release.set()
+        self.assertIsNone(self.voice_agent.generate_voiceover("Hello there.", self.output))
+        self.assertFalse(os.path.exists(self.output))
+        self.assertFalse(os.path.exists(f"{self.output}.partial"))
+
+if __name__ == '__main__':
+    unittest.main()
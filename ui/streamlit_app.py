@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +12,21 @@ from agents.voice_agent import VoiceAgent
 from agents.video_agent import VideoAgent
 from agents.instagram_agent import InstagramAgent
 from config import config
+from utils.job_workspace import JobWorkspace
+
+@st.cache_resource
+def get_render_executor():
+    """Background worker for full-quality renders (shared across reruns)"""
+    return ThreadPoolExecutor(max_workers=1)
+
+def render_full_quality(job, script, voiceover_path, background_path, metadata):
+    """Full-quality render on the background worker; publishes the job directory when done"""
+    video_path = VideoAgent().create_reel(script, voiceover_path, job.path("reel.mp4"), background_path=background_path)
+    if not video_path:
+        job.fail("full-quality render failed")
+        return None
+    job.commit(**metadata)
+    return job.final_path(video_path)
 
 # Page configuration
 st.set_page_config(
@@ -124,11 +140,15 @@ def main():
         
         st.write(f"🤖 Gemini API: {'✅' if gemini_key else '❌'}")
         st.write(f"🎙️ ElevenLabs API: {'✅' if elevenlabs_key else '❌'}")
+        # Offline TTS backends (espeak, synthetic) run without an ElevenLabs key
+        voice_ready = bool(elevenlabs_key) or config.tts_backend != 'elevenlabs'
+        if config.tts_backend != 'elevenlabs':
+            st.write(f"🔈 Offline TTS: {config.tts_backend}")
         st.write(f"📱 Instagram: {'✅' if ig_username else '❌'}")
         
         # Credential input forms
         # Configuration management
-        if not all([gemini_key, elevenlabs_key]):
+        if not all([gemini_key, voice_ready]):
             st.error("Please configure your API keys below")
             
             with st.expander("🔑 Configure API Keys", expanded=True):
@@ -242,12 +262,20 @@ def main():
                     else:
                         st.info("ℹ️ No changes to save")
         
-        if not all([gemini_key, elevenlabs_key]):
+        if not all([gemini_key, voice_ready]):
             st.stop()
         
         # Settings
         st.subheader("Settings")
         reel_duration = st.slider("Target Reel Duration (seconds)", 15, 30, 25)  # Target duration for script generation
+        config.subtitle_enabled = st.checkbox("Subtitles", value=config.subtitle_enabled)
+        config.text_overlay_enabled = st.checkbox(
+            "Whole-script text overlay",
+            value=config.text_overlay_enabled,
+            disabled=config.subtitle_enabled,
+            help="Burned in when subtitles are off. With both off, the background is muxed with the "
+                 "voiceover without re-encoding (fastest render)."
+        )
     
     # Main content area
     st.header("📚 What did you learn today?")
@@ -276,57 +304,86 @@ def main():
         status_text = st.empty()
         
         try:
-            # Step 1: Generate script
-            status_text.text("🧠 Generating script...")
+            # Step 1: Generate script (hashtags are requested alongside, they only need the content)
+            status_text.text("🧠 Generating script and hashtags...")
             progress_bar.progress(20)
             
-            script = content_agent.generate_script(learning_content, reel_duration)
+            # After "Regenerate", ask Gemini again instead of reusing the cached response
+            refresh = st.session_state.get('refresh_content', False)
+            script, hashtags_future, caption = content_agent.start_content(learning_content, reel_duration, refresh)
+            st.session_state.refresh_content = False
             
             if not script:
                 st.error("Failed to generate script")
                 return
             
-            # Step 2: Generate hashtags
-            status_text.text("🏷️ Generating hashtags...")
-            progress_bar.progress(40)
-            
-            hashtags = content_agent.generate_hashtags(learning_content)
-            
-            # Step 3: Generate voiceover
+            # Step 2: Generate voiceover as soon as the script is ready (each generation works in its own job directory)
             status_text.text("🎙️ Generating voiceover...")
-            progress_bar.progress(60)
+            progress_bar.progress(50)
             
-            voiceover_path = voice_agent.generate_voiceover(script)
+            job = JobWorkspace()
+            voiceover_path = voice_agent.generate_voiceover(script, job.path("voiceover.mp3"))
             
             if not voiceover_path:
+                job.fail("voiceover generation failed")
                 st.error("Failed to generate voiceover")
                 return
             
-            # Step 4: Create video
-            status_text.text("🎬 Creating video...")
+            hashtags = hashtags_future.result()
+            
+            # Step 3: Create a low-resolution preview, then the full render in the background
+            status_text.text("🎬 Creating preview...")
             progress_bar.progress(80)
             
-            video_path = video_agent.create_reel(script, voiceover_path)
+            background_path = video_agent.select_random_background()
+            video_path = video_agent.create_reel(
+                script, voiceover_path, job.temp_path("preview.mp4"), profile='draft', background_path=background_path
+            )
             
             if not video_path:
+                job.fail("preview render failed")
                 st.error("Failed to create video")
                 return
             
-            # Complete - Video is ready for preview
+            caption = caption or content_agent.default_caption(learning_content)
+            metadata = {'learning_content': learning_content, 'script': script, 'hashtags': hashtags, 'caption': caption}
+            full_render = get_render_executor().submit(
+                render_full_quality, job, script, voiceover_path, background_path, metadata
+            )
+            
+            # Complete - Preview is ready, full quality follows
             progress_bar.progress(100)
-            status_text.text("✅ Reel generated successfully! Preview below.")
+            status_text.text("✅ Preview ready! Full-quality render continues in the background.")
             
             # Store results in session state
             st.session_state.script = script
             st.session_state.hashtags = hashtags
+            st.session_state.caption = caption
             st.session_state.voiceover_path = voiceover_path
             st.session_state.video_path = video_path
+            st.session_state.full_render = full_render
+            st.session_state.job = job
+            st.session_state.render_failed = False
             st.session_state.learning_content = learning_content
             st.session_state.reel_duration = reel_duration
             
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
     
+    # Swap in the full-quality render once the background worker is done
+    full_render = getattr(st.session_state, 'full_render', None)
+    if full_render is not None and full_render.done():
+        delattr(st.session_state, 'full_render')
+        full_video_path = full_render.result()
+        if full_video_path:
+            # The job directory was renamed on completion
+            st.session_state.video_path = full_video_path
+            st.session_state.voiceover_path = st.session_state.job.final_path(st.session_state.voiceover_path)
+        else:
+            st.error("Full-quality render failed; showing the preview")
+            st.session_state.render_failed = True
+        full_render = None
+    
     # Preview & Actions section
     if hasattr(st.session_state, 'script'):
         st.header("📊 Preview & Actions")
@@ -349,17 +406,22 @@ def main():
         
         # Video player - This is the main preview
         if hasattr(st.session_state, 'video_path') and os.path.exists(st.session_state.video_path):
-            st.subheader("🎬 Final Video Preview")
+            if full_render is not None:
+                st.subheader("🎬 Quick Preview (360x640)")
+                st.info("⏳ Rendering full quality in the background; it will replace this preview when done.")
+            else:
+                st.subheader("🎬 Final Video Preview")
             st.video(st.session_state.video_path)
             
             # Action buttons
             st.subheader("🚀 Actions")
             
-            # Upload to Instagram button
-            if st.button("📤 Upload to Instagram", type="primary", use_container_width=True):
+            # Upload to Instagram button (only the full-quality render is uploaded)
+            upload_ready = full_render is None and not getattr(st.session_state, 'render_failed', False)
+            if st.button("📤 Upload to Instagram", type="primary", use_container_width=True, disabled=not upload_ready):
                 with st.spinner("Uploading to Instagram..."):
                     instagram_agent = InstagramAgent()
-                    caption = f"Today I learned: {st.session_state.learning_content[:100]}..."
+                    caption = st.session_state.caption
                     success = instagram_agent.upload_reel(
                         st.session_state.video_path, 
                         caption, 
@@ -374,9 +436,10 @@ def main():
             # Regenerate button
             if st.button("🔄 Regenerate Reel", use_container_width=True):
                 # Clear session state to allow regeneration
-                for key in ['script', 'hashtags', 'voiceover_path', 'video_path']:
+                for key in ['script', 'hashtags', 'caption', 'voiceover_path', 'video_path', 'full_render', 'render_failed', 'job']:
                     if hasattr(st.session_state, key):
                         delattr(st.session_state, key)
+                st.session_state.refresh_content = True
                 st.rerun()
     
     # Instructions
@@ -399,6 +462,11 @@ def main():
         - Customizable font size, color, and position
         - Adjustable timing for better readability
         """)
+    
+    # Poll the background render so the full-quality video swaps in without a click
+    if full_render is not None:
+        time.sleep(2)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Persistent TTS audio cache
+
+Synthesized audio files are stored under a content hash of everything that
+determines them (text, voice, model and voice settings), with a small JSON
+index tracking size and recency. The least recently used files are evicted
+once the cache grows beyond its byte budget, so re-renders of the same
+script never pay for speech synthesis again.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict
+
+from config import config
+
+INDEX_FILE = "index.json"
+
+
+class AudioCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_mb: Optional[float] = None):
+        self.cache_dir = cache_dir or config.tts_cache_dir
+        self.max_bytes = int((max_mb or config.tts_cache_max_mb) * 1024 * 1024)
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load the index (oldest first), dropping entries whose file is gone"""
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            entries = OrderedDict()
+        self.entries = OrderedDict(
+            (key, entry) for key, entry in entries.items() if os.path.exists(self.file_path(key, entry['ext']))
+        )
+
+    def _save(self) -> None:
+        """Write the index atomically"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error saving TTS cache index: {e}")
+
+    @staticmethod
+    def cache_key(*parts) -> str:
+        """Hash of the values that determine the audio"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def file_path(self, key: str, ext: str = ".mp3") -> str:
+        """Where the audio for a key is stored"""
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key: str, output_path: str) -> bool:
+        """Copy cached audio to output_path; False on a miss"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is not None:
+            try:
+                shutil.copyfile(self.file_path(key, entry['ext']), output_path)
+                with self._lock:
+                    self.hits += 1
+                return True
+            except OSError:
+                # File removed behind our back: forget it
+                with self._lock:
+                    self.entries.pop(key, None)
+        with self._lock:
+            self.misses += 1
+        return False
+
+    def put(self, key: str, path: str) -> None:
+        """Copy an audio file into the cache, evicting least recently used files over the budget"""
+        ext = os.path.splitext(path)[1] or ".mp3"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.file_path(key, ext)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, self.file_path(key, ext))
+        except OSError as e:
+            print(f"Error caching audio: {e}")
+            return
+        with self._lock:
+            self.entries[key] = {'ext': ext, 'size': os.path.getsize(self.file_path(key, ext))}
+            self.entries.move_to_end(key)
+            while len(self.entries) > 1 and self.total_bytes() > self.max_bytes:
+                old_key, old_entry = self.entries.popitem(last=False)
+                try:
+                    os.remove(self.file_path(old_key, old_entry['ext']))
+                except OSError:
+                    pass
+            self._save()
+
+    def total_bytes(self) -> int:
+        """Size of all cached files"""
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'bytes': self.total_bytes()}
+
+
+# Shared cache instance
+tts_cache = AudioCache()
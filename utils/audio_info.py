@@ -0,0 +1,188 @@
+"""
+In-process audio duration reading
+
+Parses MP3 (Xing/Info, VBRI or a frame scan) and WAV (RIFF) headers so
+the duration of a freshly written voiceover is known without spawning
+ffprobe.
+"""
+
+import os
+import struct
+from typing import Optional, Tuple
+
+# Bitrates in kbps, indexed by [version is MPEG1][layer][bitrate index]
+MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates indexed by version bits (0 = MPEG2.5, 2 = MPEG2, 3 = MPEG1)
+MP3_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+
+
+def parse_mp3_frame_header(header: bytes) -> Optional[Tuple[int, int, int, int, bool]]:
+    """Parse a 4-byte MPEG audio frame header.
+
+    Returns (frame_length, samples_per_frame, sample_rate, channels, is_mpeg1)
+    or None if the bytes are not a valid header.
+    """
+    if len(header) < 4:
+        return None
+    b0, b1, b2, b3 = header[0], header[1], header[2], header[3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    is_mpeg1 = version_bits == 3
+    layer = 4 - layer_bits
+    bitrate = MP3_BITRATES[(is_mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2:
+        samples_per_frame = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        samples_per_frame = 1152 if is_mpeg1 else 576
+        frame_length = (144 if is_mpeg1 else 72) * bitrate // sample_rate + padding
+
+    return frame_length, samples_per_frame, sample_rate, channels, is_mpeg1
+
+
+def skip_id3v2(data: bytes) -> int:
+    """Return the offset just past a leading ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def find_first_frame(data: bytes, offset: int) -> Optional[int]:
+    """Find the first frame sync that is followed by another valid frame"""
+    limit = len(data) - 4
+    while offset < limit:
+        offset = data.find(b'\xff', offset)
+        if offset == -1 or offset >= limit:
+            return None
+        parsed = parse_mp3_frame_header(data[offset:offset + 4])
+        if parsed:
+            next_offset = offset + parsed[0]
+            # Accept a lone frame at the end of the file, otherwise require a second sync
+            if next_offset >= limit or parse_mp3_frame_header(data[next_offset:next_offset + 4]):
+                return offset
+        offset += 1
+    return None
+
+
+def read_mp3_duration(path: str) -> Optional[float]:
+    """MP3 duration from the Xing/Info or VBRI header, falling back to a frame scan"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    offset = find_first_frame(data, skip_id3v2(data))
+    if offset is None:
+        return None
+    frame_length, samples_per_frame, sample_rate, channels, is_mpeg1 = parse_mp3_frame_header(data[offset:offset + 4])
+
+    # Xing/Info header sits right after the side information of the first frame
+    if is_mpeg1:
+        side_info = 32 if channels == 2 else 17
+    else:
+        side_info = 17 if channels == 2 else 9
+    xing_offset = offset + 4 + side_info
+    tag = data[xing_offset:xing_offset + 4]
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing_offset + 4:xing_offset + 8])[0]
+        if flags & 0x01:
+            frames = struct.unpack('>I', data[xing_offset + 8:xing_offset + 12])[0]
+            return frames * samples_per_frame / sample_rate
+
+    # VBRI header is always 32 bytes after the frame header
+    vbri_offset = offset + 4 + 32
+    if data[vbri_offset:vbri_offset + 4] == b'VBRI':
+        frames = struct.unpack('>I', data[vbri_offset + 14:vbri_offset + 18])[0]
+        return frames * samples_per_frame / sample_rate
+
+    # No VBR header: walk the frames and count samples
+    total_samples = 0
+    limit = len(data) - 4
+    while offset <= limit:
+        parsed = parse_mp3_frame_header(data[offset:offset + 4])
+        if not parsed:
+            break
+        frame_length, samples_per_frame, sample_rate = parsed[0], parsed[1], parsed[2]
+        total_samples += samples_per_frame
+        offset += frame_length
+    return total_samples / sample_rate if total_samples else None
+
+
+def read_wav_duration(path: str) -> Optional[float]:
+    """WAV duration from the RIFF fmt and data chunks"""
+    try:
+        with open(path, 'rb') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+                return None
+
+            byte_rate = None
+            while True:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    return None
+                chunk_id, chunk_size = chunk_header[:4], struct.unpack('<I', chunk_header[4:])[0]
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    byte_rate = struct.unpack('<I', fmt[8:12])[0]
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    if not byte_rate:
+                        return None
+                    # Streaming writers leave the size unset; use what is on disk
+                    remaining = os.path.getsize(path) - f.tell()
+                    if chunk_size == 0xFFFFFFFF or chunk_size > remaining:
+                        chunk_size = remaining
+                    return chunk_size / byte_rate
+                else:
+                    f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+def read_audio_duration(path: str) -> Optional[float]:
+    """Duration of an MP3 or WAV file without spawning a process (None if unsupported)"""
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(12)
+    except OSError:
+        return None
+
+    if magic[:4] == b'RIFF' and magic[8:12] == b'WAVE':
+        return read_wav_duration(path)
+    if magic[:3] == b'ID3' or (len(magic) >= 2 and magic[0] == 0xFF and (magic[1] & 0xE0) == 0xE0):
+        return read_mp3_duration(path)
+    if path.lower().endswith('.mp3'):
+        return read_mp3_duration(path)
+    return None
@@ -0,0 +1,178 @@
+"""
+Pre-normalized background clip library
+
+Each background in assets/ is transcoded once to the exact reel geometry,
+frame rate, pixel format and GOP so per-reel renders never need to scale.
+"""
+
+import os
+import json
+import random
+import hashlib
+import threading
+import subprocess
+from typing import Optional, List, Dict, Any
+
+from config import config
+
+MANIFEST_NAME = "manifest.json"
+
+# Per-path locks shared by every library instance (pipelined video workers,
+# concurrent Streamlit sessions), so a clip is normalized once and manifest
+# updates do not overwrite each other
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def path_lock(path: str) -> threading.Lock:
+    """Lock guarding a cache file path"""
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash file contents in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackgroundLibrary:
+    def __init__(self, assets_dir: str = "assets", cache_dir: Optional[str] = None):
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir or config.background_cache_dir
+        self.manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the source -> normalized clip manifest"""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Persist the manifest atomically (caller holds the manifest lock)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _record(self, source_path: str, entry: Dict[str, Any]) -> None:
+        """Add a manifest entry, merging entries other instances wrote meanwhile"""
+        with path_lock(self.manifest_path):
+            manifest = self._load_manifest()
+            manifest[source_path] = entry
+            self.manifest = manifest
+            self._save_manifest()
+
+    def source_paths(self) -> List[str]:
+        """List the background sources (assets/1.mp4 .. assets/20.mp4) that exist"""
+        paths = [os.path.join(self.assets_dir, f"{n}.mp4") for n in range(1, 21)]
+        return [p for p in paths if os.path.exists(p)]
+
+    def source_hash(self, source_path: str) -> str:
+        """Content hash of a source, reused from the manifest while mtime/size are unchanged"""
+        stat = os.stat(source_path)
+        entry = self.manifest.get(source_path)
+        if entry and entry.get('mtime') == stat.st_mtime and entry.get('size') == stat.st_size:
+            return entry['sha256']
+        return file_sha256(source_path)
+
+    def cache_key(self, source_path: str) -> str:
+        """Cache key from the source hash and the target reel geometry"""
+        digest = self.source_hash(source_path)[:16]
+        return f"{digest}_{config.video_width}x{config.video_height}_{config.video_fps}"
+
+    def normalized_path(self, source_path: str) -> str:
+        """Path of the normalized clip for a source"""
+        return os.path.join(self.cache_dir, f"{self.cache_key(source_path)}.mp4")
+
+    def is_normalized(self, video_path: str) -> bool:
+        """Check whether a path is a clip produced by this library"""
+        cache_dir = os.path.abspath(self.cache_dir)
+        return os.path.dirname(os.path.abspath(video_path)) == cache_dir and os.path.exists(video_path)
+
+    def build_normalize_command(self, source_path: str, output_path: str) -> List[str]:
+        """FFmpeg command that transcodes a source to the reel geometry/fps/pix_fmt/GOP"""
+        width, height, fps = config.video_width, config.video_height, config.video_fps
+        return [
+            "ffmpeg", "-y",
+            "-i", source_path,
+            "-vf", (
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+                f"setsar=1,fps={fps},format=yuv420p"
+            ),
+            "-c:v", "libx264",
+            "-crf", "18",  # Near-lossless so the per-reel re-encode does not compound artifacts
+            "-g", str(fps),  # Fixed one-second GOP
+            "-keyint_min", str(fps),
+            "-sc_threshold", "0",
+            "-an",
+            "-movflags", "+faststart",
+            output_path
+        ]
+
+    def normalize(self, source_path: str, force: bool = False) -> Optional[str]:
+        """Transcode a single background once, returning the normalized clip path"""
+        output_path = self.normalized_path(source_path)
+        if os.path.exists(output_path) and not force:
+            return output_path
+
+        with path_lock(output_path):
+            # Another caller may have finished the same clip while we waited
+            if os.path.exists(output_path) and not force:
+                return output_path
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = output_path.replace('.mp4', f'.{os.getpid()}.{threading.get_ident()}.partial.mp4')
+            try:
+                print(f"Normalizing background: {source_path} -> {output_path}")
+                subprocess.run(self.build_normalize_command(source_path, tmp_path),
+                               check=True, capture_output=True)
+                os.replace(tmp_path, output_path)
+
+                stat = os.stat(source_path)
+                self._record(source_path, {
+                    'sha256': self.source_hash(source_path),
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    'normalized': output_path,
+                    'width': config.video_width,
+                    'height': config.video_height,
+                    'fps': config.video_fps
+                })
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"Error normalizing background {source_path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                # The clip itself is usable even if the manifest could not be written
+                return output_path if os.path.exists(output_path) else None
+        return output_path
+
+    def ingest(self, force: bool = False) -> List[str]:
+        """Normalize every background source, skipping ones already cached"""
+        normalized = []
+        for source_path in self.source_paths():
+            path = self.normalize(source_path, force=force)
+            if path:
+                normalized.append(path)
+        return normalized
+
+    def select_random(self) -> Optional[str]:
+        """Pick a random background and return its normalized clip (normalizing on first use)"""
+        sources = self.source_paths()
+        if not sources:
+            return None
+        source_path = random.choice(sources)
+        print(f"Selected background video: {os.path.basename(source_path)}")
+        return self.normalize(source_path)
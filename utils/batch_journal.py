@@ -0,0 +1,134 @@
+"""
+Batch progress journal
+
+Append-only JSONL log of per-item stage checkpoints for batch reel
+generation. Every record is flushed and fsynced before the next stage
+starts, so after a crash the journal is replayed and each item resumes
+from its last completed stage. A torn final line is ignored.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Any, List
+
+# Stages in pipeline order; 'done' and 'failed' are terminal records
+STAGES = ('content', 'voiceover', 'video', 'upload', 'done')
+
+
+def item_id(item: Dict[str, Any]) -> str:
+    """Stable id of a queue item (its own id, or a hash of its content)"""
+    if item.get('id'):
+        return str(item['id'])
+    digest = hashlib.sha1(learning_content_of(item).encode('utf-8')).hexdigest()
+    return digest[:12]
+
+
+def learning_content_of(item: Dict[str, Any]) -> str:
+    """Learning content of a queue item ('learning_content', 'content' or 'body')"""
+    for key in ('learning_content', 'content', 'body'):
+        if item.get(key):
+            return str(item[key])
+    return ""
+
+
+def load_batch_items(path: str) -> List[Dict[str, Any]]:
+    """Read queue items from a JSONL file, skipping blank lines, items without content and repeated ids"""
+    items = []
+    seen = {}
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                print(f"[WARNING] Skipping invalid JSON on line {line_number} of {path}")
+                continue
+            if not learning_content_of(item).strip():
+                print(f"[WARNING] Skipping line {line_number}: no learning content")
+                continue
+            item['id'] = item_id(item)
+            if item['id'] in seen:
+                # Two items sharing an id would share one journal entry and one job directory
+                print(f"[WARNING] Skipping line {line_number}: duplicate id '{item['id']}' "
+                      f"(first seen on line {seen[item['id']]})")
+                continue
+            seen[item['id']] = line_number
+            items.append(item)
+    return items
+
+
+class BatchJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Replay the journal; later records for an item override earlier fields"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: the stage is simply redone
+                    continue
+                self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge a record into its item's state, keeping the set of completed stages"""
+        state = self.state.setdefault(record['id'], {'completed_stages': []})
+        state.update(record)
+        if record['stage'] in STAGES:
+            state.pop('error', None)
+            if record['stage'] not in state['completed_stages']:
+                state['completed_stages'].append(record['stage'])
+        return state
+
+    def record(self, item_id: str, stage: str, **data) -> Dict[str, Any]:
+        """Durably append a stage checkpoint and return the item's merged state"""
+        record = {'id': item_id, 'stage': stage, 'time': datetime.now().isoformat(), **data}
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            state = dict(self._apply(record))
+        state['completed_stages'] = list(state['completed_stages'])
+        return state
+
+    def get(self, item_id: str) -> Dict[str, Any]:
+        """Merged state of an item (empty if it has not started)"""
+        with self._lock:
+            state = dict(self.state.get(item_id, {}))
+        state['completed_stages'] = list(state.get('completed_stages', []))
+        return state
+
+    def completed(self, item_id: str, stage: str) -> bool:
+        """Whether an item has passed the given stage"""
+        return stage in self.get(item_id).get('completed_stages', [])
+
+    def summary(self) -> Dict[str, int]:
+        """Number of items per last recorded stage"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for state in self.state.values():
+                counts[state['stage']] = counts.get(state['stage'], 0) + 1
+        return counts
+
+
+def default_journal_path(items_path: str) -> str:
+    """Journal stored next to the queue file (<name>.progress.jsonl)"""
+    base, _ = os.path.splitext(items_path)
+    return f"{base}.progress.jsonl"
@@ -0,0 +1,204 @@
+"""
+Batch reel generation
+
+Runs Content -> Voice -> Video -> (optional) Instagram for every item of a
+JSONL queue with one set of agents per process. Each stage is checkpointed
+in a BatchJournal, so a rerun after a crash skips finished items and
+resumes unfinished ones from their last completed stage. Every item gets
+its own JobWorkspace holding its voiceover, reel and metadata.
+
+run() handles items one at a time; run_pipelined() overlaps the stages of
+different items (see utils.stage_scheduler).
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+from config import config
+from agents.content_agent import ContentAgent
+from agents.voice_agent import VoiceAgent
+from agents.video_agent import VideoAgent
+from agents.instagram_agent import InstagramAgent
+from utils.batch_journal import BatchJournal, learning_content_of
+from utils.job_workspace import JobWorkspace, load_job
+from utils.stage_scheduler import StagePipeline
+
+
+class StageError(Exception):
+    """A pipeline stage produced no result"""
+
+    def __init__(self, message: str, job_id: Optional[str] = None):
+        super().__init__(message)
+        # Job workspace the stage was working in (kept so a retry reuses it)
+        self.job_id = job_id
+
+
+class BatchRunner:
+    def __init__(self, journal: BatchJournal, upload: bool = False, duration: Optional[int] = None,
+                 refresh_content: bool = False):
+        self.journal = journal
+        self.upload = upload
+        self.refresh_content = refresh_content
+        self.duration = duration or config.default_reel_duration
+        # Agents are built once and reused for every item
+        self.content_agent = ContentAgent()
+        self.voice_agent = VoiceAgent()
+        self.video_agent = VideoAgent()
+        self.instagram_agent = InstagramAgent() if upload else None
+        self.pipeline = None
+
+    def stages(self) -> List[str]:
+        """Stages run for each item"""
+        stages = ['content', 'voiceover', 'video']
+        if self.upload:
+            stages.append('upload')
+        return stages
+
+    def pending_items(self, items: List[Dict[str, Any]], skip_failed: bool = False) -> List[Dict[str, Any]]:
+        """Items that still have stages to run"""
+        pending = []
+        for item in items:
+            state = self.journal.get(item['id'])
+            if 'done' in state['completed_stages']:
+                continue
+            if skip_failed and state.get('stage') == 'failed':
+                print(f"⏭️ {item['id']}: skipped (failed before)")
+                continue
+            pending.append(item)
+        return pending
+
+    def run(self, items: List[Dict[str, Any]], skip_failed: bool = False) -> Dict[str, int]:
+        """Process unfinished items one after another and return the journal summary"""
+        pending = self.pending_items(items, skip_failed)
+        for index, item in enumerate(pending, 1):
+            print(f"\n🎬 [{index}/{len(pending)}] {item['id']}")
+            self.process(item)
+        return self.journal.summary()
+
+    def run_pipelined(self, items: List[Dict[str, Any]], skip_failed: bool = False) -> Dict[str, int]:
+        """Process unfinished items through a StagePipeline so stages of different items overlap"""
+        pipeline = StagePipeline(
+            [(stage, self.stage_runner(stage), self.stage_workers(stage)) for stage in self.stages()],
+            queue_size=config.pipeline_queue_size
+        )
+        pipeline.run(self.pending_items(items, skip_failed), on_done=lambda item: self.journal.record(item['id'], 'done'))
+        self.pipeline = pipeline
+        return self.journal.summary()
+
+    def stage_workers(self, stage: str) -> int:
+        """Concurrency of a stage in pipelined mode"""
+        if stage == 'video':
+            # Each libx264 encode is already multi-threaded
+            return config.pipeline_video_workers or max(1, (os.cpu_count() or 1) // 4)
+        return getattr(config, f"pipeline_{stage}_workers")
+
+    def stage_runner(self, stage: str) -> Callable[[Dict[str, Any]], bool]:
+        """Stage function for the pipeline"""
+        return lambda item: self.run_stage(item, stage)
+
+    def process(self, item: Dict[str, Any]) -> bool:
+        """Run the remaining stages of one item"""
+        for stage in self.stages():
+            if not self.run_stage(item, stage):
+                return False
+        self.journal.record(item['id'], 'done')
+        return True
+
+    def run_stage(self, item: Dict[str, Any], stage: str) -> bool:
+        """Run one stage unless already checkpointed; failures are journaled, not raised"""
+        if self.journal.completed(item['id'], stage):
+            return True
+        try:
+            getattr(self, f"run_{stage}")(item)
+            return True
+        except Exception as e:
+            print(f"❌ {item['id']}: {stage} failed: {e}")
+            job_id = getattr(e, 'job_id', None)
+            self.journal.record(item['id'], 'failed', failed_stage=stage, error=str(e),
+                                **({'job_id': job_id} if job_id else {}))
+            return False
+
+    def run_content(self, item: Dict[str, Any]) -> None:
+        """Generate script and hashtags"""
+        learning_content = learning_content_of(item)
+        content = self.content_agent.generate_content(
+            learning_content, item.get('duration', self.duration), refresh=self.refresh_content
+        )
+        if not content['script']:
+            raise StageError("no script generated")
+        caption = content['caption'] or self.content_agent.default_caption(learning_content)
+        self.journal.record(item['id'], 'content', script=content['script'], hashtags=content['hashtags'], caption=caption)
+
+    def caption_of(self, item: Dict[str, Any], state: Dict[str, Any]) -> str:
+        """Caption from the content stage (journals written before captions existed have none)"""
+        return state.get('caption') or self.content_agent.default_caption(learning_content_of(item))
+
+    def open_job(self, item: Dict[str, Any]) -> JobWorkspace:
+        """The item's job workspace (reopened when resuming)"""
+        job_id = self.journal.get(item['id']).get('job_id')
+        if job_id:
+            return JobWorkspace(job_id=job_id, resume=True)
+        return JobWorkspace()
+
+    @contextmanager
+    def job_stage(self, item: Dict[str, Any], stage: str) -> Iterator[JobWorkspace]:
+        """The item's job workspace for a stage; on failure the job is marked failed (as in main.py)
+        and its id is journaled, so the retry resumes this staging directory instead of orphaning it"""
+        job = self.open_job(item)
+        try:
+            yield job
+        except Exception as e:
+            job.fail(f"{stage} failed: {e}")
+            if isinstance(e, StageError):
+                e.job_id = job.job_id
+                raise
+            raise StageError(str(e), job.job_id) from e
+
+    def run_voiceover(self, item: Dict[str, Any]) -> None:
+        """Generate the voiceover into the item's job workspace"""
+        state = self.journal.get(item['id'])
+        with self.job_stage(item, 'voiceover') as job:
+            voiceover_path = self.voice_agent.generate_voiceover(state['script'], job.path("voiceover.mp3"))
+            if not voiceover_path:
+                raise StageError("no voiceover generated")
+        self.journal.record(item['id'], 'voiceover', job_id=job.job_id, voiceover_path=voiceover_path)
+
+    def run_video(self, item: Dict[str, Any]) -> None:
+        """Render the reel and publish the job directory"""
+        state = self.journal.get(item['id'])
+        # A crash between commit and checkpoint leaves a finished job behind
+        committed = load_job(config.jobs_dir, state['job_id'])
+        if committed:
+            job_dir = os.path.join(config.jobs_dir, state['job_id'])
+            self.journal.record(
+                item['id'], 'video',
+                video_path=os.path.join(job_dir, committed['reel']),
+                voiceover_path=os.path.join(job_dir, os.path.basename(state['voiceover_path']))
+            )
+            return
+
+        with self.job_stage(item, 'video') as job:
+            video_path = self.video_agent.create_reel(state['script'], state['voiceover_path'], job.path("reel.mp4"))
+            if not video_path:
+                raise StageError("no video created")
+            job.commit(
+                item_id=item['id'],
+                learning_content=learning_content_of(item),
+                script=state['script'],
+                hashtags=state['hashtags'],
+                caption=self.caption_of(item, state),
+                reel=os.path.basename(video_path)
+            )
+        self.journal.record(
+            item['id'], 'video',
+            video_path=job.final_path(video_path),
+            voiceover_path=job.final_path(state['voiceover_path'])
+        )
+
+    def run_upload(self, item: Dict[str, Any]) -> None:
+        """Upload the reel to Instagram"""
+        state = self.journal.get(item['id'])
+        if not self.instagram_agent.upload_reel(state['video_path'], self.caption_of(item, state), state['hashtags']):
+            raise StageError("upload failed")
+        self.journal.record(item['id'], 'upload')
@@ -0,0 +1,121 @@
+"""
+Cached font metrics for subtitle layout
+
+The subtitle font is loaded once; advance widths for printable ASCII and
+Latin-1 glyphs (plus pair kerning from the font's layout engine) are
+precomputed into NumPy arrays so a string is measured with a vectorized
+lookup instead of a FreeType layout call.
+"""
+
+import struct
+import functools
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import ImageFont
+
+# Reference size for the precomputed tables; widths scale linearly with font size
+REFERENCE_SIZE = 1000
+
+# Codepoints held in the lookup tables (printable ASCII + Latin-1 supplement)
+TABLE_SIZE = 256
+FIRST_PRINTABLE = 32
+
+# Pairs nearly every kerned Latin font adjusts; if none change, the pair table is skipped
+KERNING_PROBE_PAIRS = ("AV", "AT", "To", "Te", "Wa", "Yo", "LT", "Va", "P.", "r.", "y.", "F,")
+
+
+class FontMetrics:
+    def __init__(self, font_path: str, kerning: bool = True):
+        self.font_path = font_path
+        self.font = ImageFont.truetype(font_path, REFERENCE_SIZE)
+
+        codepoints = range(FIRST_PRINTABLE, TABLE_SIZE)
+        self.advances = np.zeros(TABLE_SIZE, dtype=np.float64)
+        for code in codepoints:
+            self.advances[code] = self.font.getlength(chr(code))
+        self.fallback_advances: Dict[str, float] = {}
+
+        # Pair adjustments for the ASCII range (what layout adds beyond the two advances).
+        # Only built when layout kerns the usual pairs at all; with Pillow's basic layout
+        # and GPOS-only fonts every entry would be zero.
+        self.kerning = np.zeros((TABLE_SIZE, TABLE_SIZE), dtype=np.float64)
+        self.has_kerning = kerning and any(self._pair_adjustment(pair) for pair in KERNING_PROBE_PAIRS)
+        if self.has_kerning:
+            for left in range(FIRST_PRINTABLE, 127):
+                for right in range(FIRST_PRINTABLE, 127):
+                    self.kerning[left, right] = self._pair_adjustment(chr(left) + chr(right))
+            self.has_kerning = bool(np.any(self.kerning))
+
+    def _pair_adjustment(self, pair: str) -> float:
+        """Width layout adds to (or removes from) two glyphs set side by side"""
+        return self.font.getlength(pair) - self.advances[ord(pair[0])] - self.advances[ord(pair[1])]
+
+    def _fallback_advance(self, char: str) -> float:
+        """Advance of a glyph outside the lookup table (measured once, then memoized)"""
+        advance = self.fallback_advances.get(char)
+        if advance is None:
+            advance = self.font.getlength(char)
+            self.fallback_advances[char] = advance
+        return advance
+
+    def measure(self, text: str, font_size: float) -> float:
+        """Width of text in pixels at font_size"""
+        if not text:
+            return 0.0
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        in_table = codes < TABLE_SIZE
+        indices = np.where(in_table, codes, 0)
+
+        width = self.advances[indices].sum()
+        if not in_table.all():
+            width += sum(self._fallback_advance(char) for char, known in zip(text, in_table) if not known)
+        if self.has_kerning and len(indices) > 1:
+            width += self.kerning[indices[:-1], indices[1:]].sum()
+        return float(width) * font_size / REFERENCE_SIZE
+
+
+def read_sfnt_tables(font_path: str) -> Optional[Dict[bytes, bytes]]:
+    """Raw head/hhea/OS/2 tables of a TrueType/OpenType file (None for collections or unreadable files)"""
+    try:
+        with open(font_path, 'rb') as f:
+            data = f.read()
+        num_tables = struct.unpack('>H', data[4:6])[0]
+        tables = {}
+        for index in range(num_tables):
+            tag, _, offset, length = struct.unpack('>4sIII', data[12 + 16 * index:28 + 16 * index])
+            if tag in (b'head', b'hhea', b'OS/2'):
+                tables[tag] = data[offset:offset + length]
+        return tables if b'head' in tables else None
+    except (OSError, struct.error):
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def ass_font_scale(font_path: str) -> float:
+    """Factor turning a pixel (em) font size into an ASS Fontsize for this font.
+
+    drawtext and Pillow size a font by its em; libass sizes it so that the
+    ascent plus descent (OS/2 win metrics, else hhea) equals Fontsize.
+    """
+    tables = read_sfnt_tables(font_path)
+    if not tables:
+        return 1.0
+    units_per_em = struct.unpack('>H', tables[b'head'][18:20])[0]
+    height = 0
+    os2 = tables.get(b'OS/2', b'')
+    if len(os2) >= 78:
+        win_ascent, win_descent = struct.unpack('>HH', os2[74:78])
+        height = win_ascent + win_descent
+    if not height and len(tables.get(b'hhea', b'')) >= 8:
+        ascent, descent = struct.unpack('>hh', tables[b'hhea'][4:8])
+        height = ascent - descent
+    if not units_per_em or height <= 0:
+        return 1.0
+    return height / units_per_em
+
+
+@functools.lru_cache(maxsize=8)
+def get_font_metrics(font_path: str) -> FontMetrics:
+    """Shared FontMetrics per font file (built once per process)"""
+    return FontMetrics(font_path)
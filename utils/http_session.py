@@ -0,0 +1,58 @@
+"""
+Pooled HTTP sessions
+
+One requests.Session per process, shared by the agents, so API calls reuse
+keep-alive connections instead of paying a TCP/TLS handshake each time.
+Rate limits (429) and transient server errors are retried with exponential
+backoff, honoring the server's Retry-After header.
+"""
+
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import config
+
+# Statuses worth retrying: rate limiting and transient server/gateway errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size: Optional[int] = None, max_retries: Optional[int] = None,
+                   backoff_factor: Optional[float] = None) -> requests.Session:
+    """Session with a connection pool and retry policy (settings default to config)"""
+    retry = Retry(
+        total=config.http_max_retries if max_retries is None else max_retries,
+        backoff_factor=config.http_backoff_factor if backoff_factor is None else backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        # TTS requests are POSTs; re-sending them is safe (the audio is regenerated)
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        # Return the last response instead of raising, so callers see the real status
+        raise_on_status=False
+    )
+    pool_size = pool_size or config.http_pool_size
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Shared session, created on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def request_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout for API calls"""
+    return (config.http_connect_timeout, config.http_read_timeout)
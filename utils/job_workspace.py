@@ -0,0 +1,109 @@
+"""
+Per-job workspaces
+
+Each reel job gets its own directory so concurrent jobs never share file
+names. Files are produced in a staging directory (<jobs_dir>/.work/<job_id>)
+and the whole directory is renamed to <jobs_dir>/<job_id> on completion,
+so a finished job appears atomically with all its artifacts and metadata.
+"""
+
+import os
+import json
+import uuid
+import shutil
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from config import config
+
+METADATA_FILE = "metadata.json"
+
+
+def new_job_id() -> str:
+    """Sortable, collision-free job id (timestamp plus random suffix)"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+class JobWorkspace:
+    def __init__(self, jobs_dir: Optional[str] = None, job_id: Optional[str] = None, resume: bool = False):
+        self.jobs_dir = jobs_dir or config.jobs_dir
+        self.job_id = job_id or new_job_id()
+        self.work_dir = os.path.join(self.jobs_dir, ".work", self.job_id)
+        self.final_dir = os.path.join(self.jobs_dir, self.job_id)
+        self.temp_dir = os.path.join(self.work_dir, "tmp")
+        self.metadata: Dict[str, Any] = {
+            'job_id': self.job_id,
+            'status': 'running',
+            'created_at': datetime.now().isoformat(),
+            'artifacts': {}
+        }
+        if resume and os.path.exists(self.path(METADATA_FILE)):
+            # Pick up a job interrupted before completion
+            with open(self.path(METADATA_FILE)) as f:
+                self.metadata = json.load(f)
+            self.metadata['status'] = 'running'
+            os.makedirs(self.temp_dir, exist_ok=True)
+        else:
+            # exist_ok=False: a job id is never reused for a new job
+            os.makedirs(self.temp_dir)
+        self.write_metadata()
+
+    def path(self, name: str) -> str:
+        """Path of an artifact in the (staging) workspace"""
+        return os.path.join(self.work_dir, name)
+
+    def temp_path(self, name: str) -> str:
+        """Path of a scratch file, removed on commit"""
+        return os.path.join(self.temp_dir, name)
+
+    def final_path(self, path: Optional[str]) -> Optional[str]:
+        """Where a staging path ends up once the job is committed"""
+        if not path:
+            return path
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.work_dir))
+        if relative.startswith(os.pardir):
+            return path
+        return os.path.join(self.final_dir, relative)
+
+    def write_metadata(self) -> None:
+        """Write metadata.json atomically"""
+        metadata_path = self.path(METADATA_FILE)
+        partial_path = metadata_path + ".partial"
+        with open(partial_path, 'w') as f:
+            json.dump(self.metadata, f, indent=2, default=str)
+        os.replace(partial_path, metadata_path)
+
+    def commit(self, **metadata) -> str:
+        """Record metadata, drop scratch files and atomically publish the job directory"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        artifacts = {}
+        for name in sorted(os.listdir(self.work_dir)):
+            if name != METADATA_FILE:
+                artifacts[name] = os.path.getsize(self.path(name))
+        self.metadata.update(metadata)
+        self.metadata.update({
+            'status': 'completed',
+            'completed_at': datetime.now().isoformat(),
+            'artifacts': artifacts
+        })
+        self.write_metadata()
+        os.rename(self.work_dir, self.final_dir)
+        return self.final_dir
+
+    def fail(self, error: str) -> None:
+        """Mark the job failed; its staging directory is kept for inspection"""
+        self.metadata.update({'status': 'failed', 'error': error, 'failed_at': datetime.now().isoformat()})
+        self.write_metadata()
+
+    def discard(self) -> None:
+        """Delete the staging directory"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def load_job(jobs_dir: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """Metadata of a committed job (None if it does not exist)"""
+    try:
+        with open(os.path.join(jobs_dir, job_id, METADATA_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,88 @@
+"""
+Persistent LLM response cache
+
+Gemini responses are keyed by a hash of everything that determines them
+(prompt template version, model name, request kind and inputs) and kept in
+a small LRU store on disk with a time-to-live, so retries and reruns with
+the same learning content do not call the API again.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from config import config
+
+
+class LLMResponseCache:
+    def __init__(self, cache_file: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_hours: Optional[float] = None):
+        self.cache_file = cache_file or config.llm_cache_file
+        self.max_entries = max_entries or config.llm_cache_max_entries
+        self.ttl = (ttl_hours if ttl_hours is not None else config.llm_cache_ttl_hours) * 3600
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load persisted entries (oldest first)"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                self.entries = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+    def _save(self) -> None:
+        """Write entries to disk atomically"""
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Error saving LLM cache: {e}")
+
+    @staticmethod
+    def cache_key(*parts) -> str:
+        """Hash of the values that determine a response"""
+        return hashlib.sha256(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response, or None if missing or older than the TTL"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.time() - entry['created'] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a response, evicting least recently used ones over the limit"""
+        with self._lock:
+            self.entries[key] = {'value': value, 'created': time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+# Shared cache instance
+llm_cache = LLMResponseCache()
@@ -0,0 +1,199 @@
+"""
+Persistent media metadata cache
+
+ffprobe results (duration, streams, codec, resolution, fps, keyframe index)
+are keyed by path + mtime + size and kept in a small LRU store on disk, so
+repeated probes of the same file cost a dictionary lookup instead of a
+process spawn.
+"""
+
+import os
+import json
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from config import config
+
+
+def parse_frame_rate(rate: Optional[str]) -> float:
+    """Convert an ffprobe rational frame rate ("24/1") to a float"""
+    if not rate:
+        return 0.0
+    num, _, den = rate.partition('/')
+    try:
+        den_value = float(den) if den else 1.0
+        return float(num) / den_value if den_value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def summarize_stream(stream: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the ffprobe stream fields the pipeline cares about"""
+    summary = {
+        'index': stream.get('index'),
+        'type': stream.get('codec_type'),
+        'codec': stream.get('codec_name'),
+        'duration': float(stream['duration']) if stream.get('duration') else None
+    }
+    if stream.get('codec_type') == 'video':
+        summary.update({
+            'width': stream.get('width'),
+            'height': stream.get('height'),
+            'pix_fmt': stream.get('pix_fmt'),
+            'fps': parse_frame_rate(stream.get('r_frame_rate'))
+        })
+    elif stream.get('codec_type') == 'audio':
+        summary.update({
+            'sample_rate': int(stream['sample_rate']) if stream.get('sample_rate') else None,
+            'channels': stream.get('channels')
+        })
+    return summary
+
+
+class MediaMetadataCache:
+    def __init__(self, cache_file: Optional[str] = None, max_entries: Optional[int] = None):
+        self.cache_file = cache_file or config.media_cache_file
+        self.max_entries = max_entries or config.media_cache_max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load persisted entries (oldest first)"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                self.entries = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+    def _save(self) -> None:
+        """Write entries to disk atomically"""
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Error saving media cache: {e}")
+
+    @staticmethod
+    def cache_key(path: str) -> Optional[str]:
+        """Key a file by absolute path, mtime and size"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def _store(self, key: str, entry: Dict[str, Any]) -> None:
+        """Insert an entry, evicting least recently used ones over the limit"""
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def probe(self, path: str) -> Optional[Dict[str, Any]]:
+        """Run ffprobe for format and stream metadata"""
+        try:
+            cmd = [
+                "ffprobe", "-v", "quiet", "-show_format", "-show_streams",
+                "-of", "json", path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            data = json.loads(result.stdout)
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return None
+
+        fmt = data.get('format', {})
+        return {
+            'duration': float(fmt['duration']) if fmt.get('duration') else None,
+            'format': fmt.get('format_name'),
+            'streams': [summarize_stream(s) for s in data.get('streams', [])]
+        }
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata for a file, probing on a miss"""
+        key = self.cache_key(path)
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self.probe(path)
+        if entry is not None:
+            self._store(key, entry)
+        return entry
+
+    def put(self, path: str, **fields) -> None:
+        """Record metadata obtained without ffprobe (e.g. parsed headers)"""
+        key = self.cache_key(path)
+        if key is None:
+            return
+        with self._lock:
+            entry = dict(self.entries.get(key, {'streams': []}))
+        entry.update(fields)
+        self._store(key, entry)
+
+    def get_duration(self, path: str) -> Optional[float]:
+        """Container duration in seconds"""
+        entry = self.get(path)
+        return entry.get('duration') if entry else None
+
+    def get_video_stream(self, path: str) -> Optional[Dict[str, Any]]:
+        """First video stream summary (codec, width, height, pix_fmt, fps)"""
+        entry = self.get(path)
+        if not entry:
+            return None
+        for stream in entry.get('streams', []):
+            if stream.get('type') == 'video':
+                return stream
+        return None
+
+    def get_keyframes(self, path: str) -> Optional[List[float]]:
+        """Keyframe timestamps of the first video stream, read from packet flags (no decoding)"""
+        entry = self.get(path)
+        if entry is None:
+            return None
+        if 'keyframes' in entry:
+            return entry['keyframes']
+
+        try:
+            cmd = [
+                "ffprobe", "-v", "quiet", "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except (subprocess.CalledProcessError, OSError):
+            return None
+
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                keyframes.append(float(pts_time))
+        keyframes.sort()
+        self.put(path, keyframes=keyframes)
+        return keyframes
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+# Shared cache instance
+media_cache = MediaMetadataCache()
@@ -0,0 +1,107 @@
+"""
+Pipelined stage scheduler
+
+Runs items through a chain of stages connected by bounded queues. Every
+stage has its own pool of worker threads, so network-bound stages (LLM,
+TTS, upload) of some items overlap with the CPU-bound encode of others.
+A full queue blocks the stage feeding it (backpressure), which keeps the
+number of half-finished items bounded and lets throughput settle at the
+capacity of the slowest stage.
+"""
+
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Queue marker telling a worker that no more items will arrive
+_STOP = object()
+
+
+class StagePipeline:
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], bool], int]], queue_size: int = 2):
+        """stages: (name, function, workers) in pipeline order.
+
+        A stage function returns True to pass the item on to the next stage;
+        False (or an exception) drops the item from the pipeline.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.queue_size = max(1, queue_size)
+        self.stats: Dict[str, Dict[str, float]] = {
+            name: {'items': 0, 'failed': 0, 'busy': 0.0} for name, _, _ in self.stages
+        }
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable[Any], on_done: Optional[Callable[[Any], None]] = None) -> Dict[str, Dict[str, float]]:
+        """Push all items through the stages and block until every stage has drained"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        running = [workers for _, _, workers in self.stages]
+        threads = []
+        for index, (name, _, workers) in enumerate(self.stages):
+            for number in range(workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index, queues, running, on_done),
+                    name=f"{name}-{number}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        start = time.perf_counter()
+        for item in items:
+            # Blocks while the first stage is saturated
+            queues[0].put(item)
+        for _ in range(self.stages[0][2]):
+            queues[0].put(_STOP)
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def _worker(self, index: int, queues: List[queue.Queue], running: List[int],
+                on_done: Optional[Callable[[Any], None]]) -> None:
+        name, func, _ = self.stages[index]
+        last_stage = index == len(self.stages) - 1
+        while True:
+            item = queues[index].get()
+            if item is _STOP:
+                break
+            start = time.perf_counter()
+            try:
+                passed = func(item)
+            except Exception as e:
+                print(f"[ERROR] Stage {name} raised: {e}")
+                passed = False
+            with self._lock:
+                stats = self.stats[name]
+                stats['busy'] += time.perf_counter() - start
+                stats['items' if passed else 'failed'] += 1
+            if not passed:
+                continue
+            if not last_stage:
+                # Blocks while the next stage is saturated (backpressure)
+                queues[index + 1].put(item)
+            elif on_done:
+                try:
+                    on_done(item)
+                except Exception as e:
+                    print(f"[ERROR] Pipeline completion callback raised: {e}")
+
+        # The last worker of a stage to finish closes the next stage
+        with self._lock:
+            running[index] -= 1
+            closed = running[index] == 0
+        if closed and not last_stage:
+            for _ in range(self.stages[index + 1][2]):
+                queues[index + 1].put(_STOP)
+
+    def utilization(self) -> Dict[str, float]:
+        """Fraction of the wall-clock time each stage's workers were busy"""
+        if not self.elapsed:
+            return {}
+        return {
+            name: self.stats[name]['busy'] / (self.elapsed * workers)
+            for name, _, workers in self.stages
+        }
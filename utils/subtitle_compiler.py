@@ -0,0 +1,230 @@
+"""
+Subtitle compiler
+
+Turns timed subtitle chunks into a single FFmpeg filter instead of one
+drawtext filter per chunk:
+- 'sendcmd': one drawtext whose text is swapped by a sendcmd script
+- 'ass': an ASS subtitle file rendered by libass
+- 'overlay': one Pillow-rendered PNG sprite per chunk, composited with timed overlay filters
+"""
+
+import os
+import shutil
+import threading
+from typing import List, Dict, Any, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config import config
+from utils.font_metrics import ass_font_scale
+
+SUBTITLE_RENDERERS = ('drawtext', 'sendcmd', 'ass', 'overlay')
+
+
+def escape_filter_path(path: str) -> str:
+    """Escape a file path for use inside a quoted filter option value"""
+    return path.replace('\\', '/').replace(':', '\\:')
+
+
+def escape_option_value(text: str) -> str:
+    """Escape text for an av_set_options_string value (drawtext reinit argument)"""
+    for char in ('\\', "'", ':'):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def escape_sendcmd_arg(text: str) -> str:
+    """Escape a sendcmd command argument (terminated by whitespace, ',' or ';')"""
+    for char in ('\\', "'", ',', ';', ' ', '\t', '\r', '\n', '\f'):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def format_ass_time(seconds: float) -> str:
+    """Format seconds as an ASS timestamp (H:MM:SS.cc)"""
+    centiseconds = int(round(max(seconds, 0) * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+
+def escape_ass_text(text: str) -> str:
+    """Escape override braces and backslashes in ASS dialogue text"""
+    return text.replace('\\', '\\\\').replace('{', '\\{').replace('}', '\\}')
+
+
+def slice_cues(cues: List[Dict[str, Any]], start: float, end: float) -> List[Dict[str, Any]]:
+    """Cues overlapping [start, end), clipped to it and shifted so start becomes time 0"""
+    sliced = []
+    for cue in cues:
+        if cue['end_time'] <= start or cue['start_time'] >= end:
+            continue
+        sliced.append({
+            **cue,
+            'start_time': max(cue['start_time'], start) - start,
+            'end_time': min(cue['end_time'], end) - start
+        })
+    return sliced
+
+
+class SubtitleCompiler:
+    def __init__(self, font_path: str = "", width: Optional[int] = None, height: Optional[int] = None,
+                 fonts_dir: Optional[str] = None):
+        self.font_path = font_path
+        self.fonts_dir = fonts_dir or config.font_cache_dir
+        self.width = width or config.video_width
+        self.height = height or config.video_height
+        self.font_size = config.subtitle_font_size
+        self.line_spacing = 10
+
+    def build_sendcmd_script(self, cues: List[Dict[str, Any]]) -> str:
+        """sendcmd script that swaps the drawtext@subs text and toggles it per cue"""
+        commands = []
+        for cue in cues:
+            text = '\n'.join(cue['lines'])
+            arg = escape_sendcmd_arg(f"text={escape_option_value(text)}")
+            commands.append(
+                f"{cue['start_time']:.3f}-{cue['end_time']:.3f} "
+                f"[enter] drawtext@subs reinit {arg}, "
+                f"[enter] drawtext@subs enable 1, "
+                f"[leave] drawtext@subs enable 0;"
+            )
+        return '\n'.join(commands) + '\n'
+
+    def build_sendcmd_filter(self, cues: List[Dict[str, Any]], script_path: str) -> str:
+        """Single drawtext filter driven by a sendcmd script written to script_path"""
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(self.build_sendcmd_script(cues))
+
+        font_option = f"fontfile='{self.font_path}':" if self.font_path else ""
+        first_text = escape_option_value('\n'.join(cues[0]['lines']))
+        return (
+            f"sendcmd=f='{escape_filter_path(script_path)}',"
+            f"drawtext@subs={font_option}text='{first_text}':"
+            f"fontcolor=white:"
+            f"fontsize={self.font_size}:"
+            f"line_spacing={self.line_spacing}:"
+            f"x=(w-text_w)/2:"
+            f"y=h/4:"
+            f"borderw=2:bordercolor=black:"
+            f"enable=0"
+        )
+
+    def build_ass_document(self, cues: List[Dict[str, Any]]) -> str:
+        """ASS subtitle document matching the drawtext look (white, black border, top quarter)"""
+        font_name = "Montserrat SemiBold" if self.font_path else "Arial"
+        # libass sizes fonts by ascent+descent, drawtext/Pillow by the em: convert so text widths match
+        font_size = round(self.font_size * ass_font_scale(self.font_path), 2) if self.font_path else self.font_size
+        header = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {self.width}",
+            f"PlayResY: {self.height}",
+            "WrapStyle: 2",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+            "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+            "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            f"Style: Default,{font_name},{font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+            f"0,0,0,0,100,100,0,0,1,2,0,8,40,40,{self.height // 4},1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        events = []
+        for cue in cues:
+            text = '\\N'.join(escape_ass_text(line) for line in cue['lines'])
+            events.append(
+                f"Dialogue: 0,{format_ass_time(cue['start_time'])},{format_ass_time(cue['end_time'])},"
+                f"Default,,0,0,0,,{text}"
+            )
+        return '\n'.join(header + events) + '\n'
+
+    def build_ass_filter(self, cues: List[Dict[str, Any]], ass_path: str) -> str:
+        """libass filter for an ASS file written to ass_path"""
+        with open(ass_path, 'w', encoding='utf-8') as f:
+            f.write(self.build_ass_document(cues))
+
+        ass_filter = f"ass=filename='{escape_filter_path(ass_path)}'"
+        if self.font_path:
+            fonts_dir = self.stage_font()
+            ass_filter += f":fontsdir='{escape_filter_path(fonts_dir)}'"
+        return ass_filter
+
+    def stage_font(self) -> str:
+        """Copy the font into the shared fonts directory (once) and return that directory.
+
+        libass opens every file in fontsdir as a font; the font's own directory
+        (assets/) also holds the background clips, which it would try to load.
+        """
+        staged_path = os.path.join(self.fonts_dir, os.path.basename(self.font_path))
+        if not (os.path.exists(staged_path) and os.path.getsize(staged_path) == os.path.getsize(self.font_path)):
+            os.makedirs(self.fonts_dir, exist_ok=True)
+            tmp_path = f"{staged_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(self.font_path, tmp_path)
+            os.replace(tmp_path, staged_path)
+        return self.fonts_dir
+
+    def load_font(self):
+        """Load the subtitle font for Pillow (default font if none is configured)"""
+        if self.font_path:
+            return ImageFont.truetype(self.font_path, self.font_size)
+        return ImageFont.load_default(size=self.font_size)
+
+    def render_sprite(self, lines: List[str], font, sprite_path: str) -> None:
+        """Render the lines of one chunk (centered, white with a black border) to a transparent PNG"""
+        stroke = 2
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
+        widths = [font.getlength(line) for line in lines]
+        width = int(max(widths)) + 2 * stroke + 2
+        height = len(lines) * line_height + (len(lines) - 1) * self.line_spacing + 2 * stroke
+
+        sprite = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        for line_idx, (line, line_width) in enumerate(zip(lines, widths)):
+            x = (width - line_width) / 2
+            y = stroke + line_idx * (line_height + self.line_spacing)
+            draw.text((x, y), line, font=font, fill=(255, 255, 255, 255),
+                      stroke_width=stroke, stroke_fill=(0, 0, 0, 255))
+        sprite.save(sprite_path)
+
+    def build_overlay_graph(self, cues: List[Dict[str, Any]], sidecar_base: str) -> str:
+        """Graph fragment overlaying one pre-rendered sprite per cue during its time window.
+
+        The fragment starts with the label that closes the preceding chain, so it is
+        appended to that chain directly instead of with a comma.
+        """
+        font = self.load_font()
+        sources = []
+        overlays = []
+        previous = "subs_in"
+        for idx, cue in enumerate(cues):
+            sprite_path = f"{sidecar_base}_sub{idx:03d}.png"
+            self.render_sprite(cue['lines'], font, sprite_path)
+            sources.append(f"movie=filename='{escape_filter_path(sprite_path)}'[sprite{idx}]")
+            overlay = (
+                f"[{previous}][sprite{idx}]overlay=x=(W-w)/2:y=H/4:"
+                f"enable='between(t,{cue['start_time']},{cue['end_time']})'"
+            )
+            if idx < len(cues) - 1:
+                previous = f"subs{idx}"
+                overlay += f"[{previous}]"
+            overlays.append(overlay)
+        return "[subs_in];" + ";".join(sources + overlays)
+
+    def compile(self, cues: List[Dict[str, Any]], renderer: str, sidecar_base: str) -> str:
+        """Compile cues into one filter; sidecar files are written next to sidecar_base"""
+        cues = [cue for cue in cues if any(line.strip() for line in cue['lines'])]
+        if not cues:
+            return ""
+        if renderer == 'ass':
+            return self.build_ass_filter(cues, f"{sidecar_base}.ass")
+        if renderer == 'sendcmd':
+            return self.build_sendcmd_filter(cues, f"{sidecar_base}.cmd")
+        if renderer == 'overlay':
+            return self.build_overlay_graph(cues, sidecar_base)
+        raise ValueError(f"Unknown subtitle renderer: {renderer}")
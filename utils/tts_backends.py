@@ -0,0 +1,218 @@
+"""
+Text-to-speech backends
+
+VoiceAgent synthesizes through one of these, selected by config.tts_backend:
+
+- 'elevenlabs': the ElevenLabs API (streaming download over the pooled session)
+- 'espeak':     espeak-ng (or espeak) on the local CPU, no network
+- 'synthetic':  a deterministic speech-like signal (word bursts and sentence
+                pauses) for CI and load tests; needs nothing but ffmpeg
+
+Every backend writes an MP3 to the given path and raises on failure.
+"""
+
+import os
+import re
+import wave
+import shutil
+import subprocess
+from typing import Optional, Tuple, Any
+
+import numpy as np
+
+from config import config
+from utils.http_session import get_session, request_timeout
+
+MODEL_ID = "eleven_monolingual_v1"
+
+# Bytes read from the response per write when downloading audio
+STREAM_CHUNK_SIZE = 16384
+
+
+def encode_mp3(wav_path: str, output_path: str) -> None:
+    """Encode a WAV file to MP3 like the voiceovers the pipeline expects"""
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error", "-i", wav_path,
+        "-ar", "44100", "-ac", "1", "-b:a", "128k", output_path
+    ], check=True, capture_output=True)
+
+
+class TTSBackend:
+    """Interface of a speech synthesizer"""
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the backend can synthesize right now (credentials, binaries)"""
+        return True
+
+    def cache_identity(self) -> Tuple[Any, ...]:
+        """Everything besides the text that determines the audio (part of the TTS cache key)"""
+        raise NotImplementedError
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        """Write speech for text to output_path as MP3; raises on failure"""
+        raise NotImplementedError
+
+    def list_voices(self) -> Optional[Any]:
+        """Voices offered by the backend (None if it cannot tell)"""
+        return None
+
+
+class ElevenLabsBackend(TTSBackend):
+    name = "elevenlabs"
+
+    def __init__(self):
+        self.api_key = config.elevenlabs_api_key
+        self.voice_id = config.elevenlabs_voice_id
+        self.base_url = "https://api.elevenlabs.io/v1"
+        # Pooled keep-alive connections with retry/backoff, shared by all agents
+        self.session = get_session()
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def voice_settings(self):
+        """ElevenLabs voice settings from config"""
+        return {
+            "stability": config.voice_stability,
+            "similarity_boost": config.voice_similarity_boost,
+            "style": 0.0,
+            "use_speaker_boost": True
+        }
+
+    def cache_identity(self) -> Tuple[Any, ...]:
+        return (self.voice_id, MODEL_ID, self.voice_settings())
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        """Synthesize text to output_path, writing audio chunks as they arrive.
+
+        With config.tts_streaming the streaming endpoint is used, so the first
+        bytes arrive while the rest is still being synthesized. The audio goes to
+        a .partial file that is renamed once complete, so an interrupted download
+        never leaves a truncated voiceover behind. Raises RequestException on failure.
+        """
+        url = f"{self.base_url}/text-to-speech/{self.voice_id}"
+        if config.tts_streaming:
+            url += "/stream"
+
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        }
+
+        data = {
+            "text": text,
+            "model_id": MODEL_ID,
+            "voice_settings": self.voice_settings(),
+            "optimization_level": 0  # Faster generation, shorter output
+        }
+
+        partial_path = f"{output_path}.partial"
+        response = self.session.post(url, json=data, headers=headers, timeout=request_timeout(), stream=True)
+        try:
+            response.raise_for_status()
+            with open(partial_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+                    # Hand each chunk to the OS right away (memory stays flat, progress is visible)
+                    f.flush()
+            os.replace(partial_path, output_path)
+        finally:
+            response.close()
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def list_voices(self) -> Optional[Any]:
+        """Voices available to the account"""
+        url = f"{self.base_url}/voices"
+        headers = {"xi-api-key": self.api_key}
+        response = self.session.get(url, headers=headers, timeout=request_timeout())
+        response.raise_for_status()
+        return response.json()
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+
+    def __init__(self):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        self.voice = config.espeak_voice
+        self.words_per_minute = config.espeak_words_per_minute
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def cache_identity(self) -> Tuple[Any, ...]:
+        return (self.name, os.path.basename(self.binary or ""), self.voice, self.words_per_minute)
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        if not self.binary:
+            raise OSError("espeak-ng is not installed")
+        wav_path = f"{output_path}.partial.wav"
+        try:
+            # Text goes in on stdin so a script starting with '-' is not parsed as an option
+            subprocess.run([
+                self.binary, "-v", self.voice, "-s", str(self.words_per_minute), "-w", wav_path, "--stdin"
+            ], input=text.encode('utf-8'), check=True, capture_output=True)
+            encode_mp3(wav_path, output_path)
+        finally:
+            if os.path.exists(wav_path):
+                os.remove(wav_path)
+
+    def list_voices(self) -> Optional[Any]:
+        if not self.binary:
+            return None
+        result = subprocess.run([self.binary, "--voices"], capture_output=True, text=True, check=True)
+        return result.stdout.splitlines()[1:]
+
+
+class SyntheticBackend(TTSBackend):
+    """Speech-shaped placeholder audio: one tone burst per word, pauses after punctuation"""
+    name = "synthetic"
+    sample_rate = 22050
+    # Bump when the generated signal changes so cached audio is not reused
+    version = 1
+
+    def cache_identity(self) -> Tuple[Any, ...]:
+        return (self.name, self.version)
+
+    def render(self, text: str) -> np.ndarray:
+        """Samples in [-1, 1] for text (about 2.7 words per second, like a real voiceover)"""
+        rng = np.random.default_rng(len(text))
+        pieces = []
+        for word in text.split():
+            length = int((0.12 + 0.045 * len(word)) * self.sample_rate)
+            t = np.arange(length) / self.sample_rate
+            pitch = 140 + 20 * (len(word) % 5)
+            envelope = np.sin(np.pi * np.arange(length) / length)
+            pieces.append(0.5 * envelope * np.sin(2 * np.pi * pitch * t) + rng.normal(0, 0.02, length))
+            pause = 0.35 if re.search(r'[.!?]$', word) else 0.18 if re.search(r'[,;:]$', word) else 0.05
+            pieces.append(np.zeros(int(pause * self.sample_rate)))
+        return np.concatenate(pieces) if pieces else np.zeros(self.sample_rate // 2)
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        samples = self.render(text)
+        wav_path = f"{output_path}.partial.wav"
+        try:
+            with wave.open(wav_path, 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(self.sample_rate)
+                w.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+            encode_mp3(wav_path, output_path)
+        finally:
+            if os.path.exists(wav_path):
+                os.remove(wav_path)
+
+
+TTS_BACKENDS = {
+    ElevenLabsBackend.name: ElevenLabsBackend,
+    EspeakBackend.name: EspeakBackend,
+    SyntheticBackend.name: SyntheticBackend
+}
+
+
+def get_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """Backend instance by name (config.tts_backend by default)"""
+    return TTS_BACKENDS[name or config.tts_backend]()
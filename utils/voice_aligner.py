@@ -0,0 +1,244 @@
+"""
+Offline voiceover alignment
+
+Finds speech segments and pauses in the voiceover with a frame-energy
+voice activity detector (NumPy over PCM samples), spreads the script's
+words over the detected speech time and snaps subtitle chunk boundaries
+to the real pauses. Runs locally; MP3 decoding uses the local ffmpeg.
+"""
+
+import os
+import json
+import wave
+import hashlib
+import subprocess
+from typing import List, Tuple, Optional, Dict, Any
+
+import numpy as np
+
+ALIGN_SAMPLE_RATE = 16000
+
+# Sidecar with measured per-sentence timings, written next to voiceovers synthesized sentence by sentence
+SENTENCE_TIMINGS_SUFFIX = ".sentences.json"
+
+
+def decode_pcm(audio_path: str, sample_rate: int = ALIGN_SAMPLE_RATE) -> Optional[Tuple[np.ndarray, int]]:
+    """Decode audio to mono float32 samples in [-1, 1], returning (samples, sample_rate)"""
+    # 16-bit PCM WAV needs no decoder
+    try:
+        with wave.open(audio_path, 'rb') as w:
+            if w.getsampwidth() == 2:
+                channels = w.getnchannels()
+                samples = np.frombuffer(w.readframes(w.getnframes()), dtype='<i2').astype(np.float32)
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1)
+                return samples / 32768.0, w.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+
+    try:
+        cmd = [
+            "ffmpeg", "-v", "quiet", "-i", audio_path,
+            "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"
+        ]
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    samples = np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+    return samples, sample_rate
+
+
+def detect_speech_segments(samples: np.ndarray, sample_rate: int, frame_ms: float = 20.0,
+                           min_pause: float = 0.12, min_speech: float = 0.08) -> List[Tuple[float, float]]:
+    """Speech (start, end) segments from frame RMS energy with an adaptive threshold"""
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return []
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+    # Threshold between the noise floor and typical speech level
+    noise_floor = np.percentile(energy_db, 10)
+    speech_level = np.percentile(energy_db, 90)
+    if speech_level - noise_floor < 6:
+        # No usable contrast: treat the whole file as one segment
+        return [(0.0, frame_count * frame_length / sample_rate)]
+    threshold = noise_floor + 0.35 * (speech_level - noise_floor)
+    active = energy_db > threshold
+
+    # Run-length encode the activity mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+    frame_seconds = frame_length / sample_rate
+    segments = [(float(start * frame_seconds), float(end * frame_seconds)) for start, end in zip(edges[::2], edges[1::2])]
+
+    # Merge segments split by pauses that are too short to matter, then drop blips
+    merged = []
+    for start, end in segments:
+        if merged and start - merged[-1][1] < min_pause:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return [(start, end) for start, end in merged if end - start >= min_speech]
+
+
+def speech_to_real_time(speech_time: float, segments: List[Tuple[float, float]]) -> float:
+    """Map a position on the concatenated speech timeline back to audio time"""
+    elapsed = 0.0
+    for start, end in segments:
+        length = end - start
+        if speech_time <= elapsed + length:
+            return start + (speech_time - elapsed)
+        elapsed += length
+    return segments[-1][1]
+
+
+def align_chunks(chunk_words: List[List[str]], segments: List[Tuple[float, float]],
+                 snap_tolerance: float = 0.35) -> List[Dict[str, float]]:
+    """Start/end times per chunk, spreading words over speech time and snapping boundaries to pauses"""
+    words = [word for chunk in chunk_words for word in chunk]
+    if not words or not segments:
+        return []
+
+    # Speaking time is roughly proportional to word length
+    weights = np.array([len(word) + 1 for word in words], dtype=np.float64)
+    total_speech = sum(end - start for start, end in segments)
+    word_starts = np.concatenate(([0.0], np.cumsum(weights)[:-1])) / weights.sum() * total_speech
+    word_ends = np.cumsum(weights) / weights.sum() * total_speech
+
+    pauses = [(segments[i][1], segments[i + 1][0]) for i in range(len(segments) - 1)]
+
+    timings = []
+    word_index = 0
+    for chunk in chunk_words:
+        first, last = word_index, word_index + len(chunk) - 1
+        word_index += len(chunk)
+        timings.append({
+            'start_time': speech_to_real_time(float(word_starts[first]), segments),
+            'end_time': speech_to_real_time(float(word_ends[last]), segments)
+        })
+
+    # Snap each boundary between consecutive chunks to the nearest nearby pause
+    for i in range(len(timings) - 1):
+        boundary = timings[i]['end_time']
+        nearest = None
+        for pause_start, pause_end in pauses:
+            distance = 0.0 if pause_start <= boundary <= pause_end else min(
+                abs(boundary - pause_start), abs(boundary - pause_end))
+            if distance <= snap_tolerance and (nearest is None or distance < nearest[0]):
+                nearest = (distance, pause_start, pause_end)
+        if nearest:
+            _, pause_start, pause_end = nearest
+            if pause_start > timings[i]['start_time'] and pause_end < timings[i + 1]['end_time']:
+                timings[i]['end_time'] = pause_start
+                timings[i + 1]['start_time'] = pause_end
+
+    timings[0]['start_time'] = segments[0][0]
+    timings[-1]['end_time'] = segments[-1][1]
+    return timings
+
+
+def analyze_voiceover(audio_path: str) -> Optional[Dict[str, Any]]:
+    """Speech segments and pauses of a voiceover file"""
+    decoded = decode_pcm(audio_path)
+    if decoded is None:
+        return None
+    samples, sample_rate = decoded
+    segments = detect_speech_segments(samples, sample_rate)
+    return {
+        'duration': len(samples) / sample_rate,
+        'speech_segments': segments,
+        'pauses': [(segments[i][1], segments[i + 1][0]) for i in range(len(segments) - 1)]
+    }
+
+
+def sentence_timings_path(audio_path: str) -> str:
+    """Sidecar path holding a voiceover's sentence timings"""
+    return os.path.splitext(audio_path)[0] + SENTENCE_TIMINGS_SUFFIX
+
+
+def audio_digest(audio_path: str) -> str:
+    """Content hash of a voiceover file (ties a timings sidecar to the exact audio)"""
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_sentence_timings(audio_path: str, sentences: List[str], durations: List[float]) -> List[Dict[str, Any]]:
+    """Record where each sentence sits in a voiceover stitched from per-sentence audio"""
+    timings = []
+    start = 0.0
+    for text, duration in zip(sentences, durations):
+        timings.append({'text': text, 'start_time': start, 'end_time': start + duration})
+        start += duration
+    with open(sentence_timings_path(audio_path), 'w') as f:
+        json.dump({
+            'audio_size': os.path.getsize(audio_path),
+            'audio_sha256': audio_digest(audio_path),
+            'sentences': timings
+        }, f, indent=2)
+    return timings
+
+
+def load_sentence_timings(audio_path: str) -> Optional[List[Dict[str, Any]]]:
+    """Sentence timings of a voiceover (None if absent or written for a different file)"""
+    try:
+        with open(sentence_timings_path(audio_path)) as f:
+            data = json.load(f)
+        # Size is a cheap first check; equal-length CBR files are told apart by the hash
+        if data['audio_size'] != os.path.getsize(audio_path) or data['audio_sha256'] != audio_digest(audio_path):
+            return None
+        return data['sentences'] or None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def remove_sentence_timings(audio_path: str) -> None:
+    """Delete a voiceover's sentence timings sidecar, if any"""
+    try:
+        os.remove(sentence_timings_path(audio_path))
+    except FileNotFoundError:
+        pass
+
+
+def align_chunks_to_sentences(chunk_words: List[List[str]], sentences: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """Start/end times per chunk from measured sentence timings.
+    
+    Each sentence's share of the script (by word length) is mapped onto its
+    measured time span, so words never drift across sentence boundaries and the
+    gaps between sentences stay free of subtitles.
+    """
+    words = [word for chunk in chunk_words for word in chunk]
+    if not words or not sentences:
+        return []
+
+    weights = np.array([len(word) + 1 for word in words], dtype=np.float64)
+    word_starts = np.concatenate(([0.0], np.cumsum(weights)[:-1])) / weights.sum()
+    word_ends = np.cumsum(weights) / weights.sum()
+
+    # Script position (0..1) where each sentence starts, from the sentence texts
+    sentence_weights = np.array([sum(len(word) + 1 for word in s['text'].split()) or 1 for s in sentences],
+                                dtype=np.float64)
+    knots = np.concatenate(([0.0], np.cumsum(sentence_weights))) / sentence_weights.sum()
+
+    def to_time(position: float, side: str) -> float:
+        # side='right' puts a position on a sentence boundary into the next sentence
+        index = int(np.clip(np.searchsorted(knots, position, side=side) - 1, 0, len(sentences) - 1))
+        span = knots[index + 1] - knots[index]
+        local = (position - knots[index]) / span if span > 0 else 0.0
+        sentence = sentences[index]
+        return sentence['start_time'] + float(np.clip(local, 0.0, 1.0)) * (sentence['end_time'] - sentence['start_time'])
+
+    timings = []
+    word_index = 0
+    for chunk in chunk_words:
+        first, last = word_index, word_index + len(chunk) - 1
+        word_index += len(chunk)
+        timings.append({
+            'start_time': to_time(float(word_starts[first]), 'right'),
+            'end_time': to_time(float(word_ends[last]), 'left')
+        })
+    return timings